@@ -1,19 +1,47 @@
 import cherrypy
+import json
+import time
+from functools import wraps
 from pymongo import MongoClient
 from utils.logger import setup_logger
+from utils.metrics import Metrics
 from controller.booking_controller import BookingController
 
+
+def instrumented(endpoint):
+    """
+    Count the requests of an endpoint and record their latency.
+
+    Args:
+        endpoint (str): The endpoint label of the recorded series.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.metrics_registry.inc("http_requests_total", endpoint=endpoint)
+                self.metrics_registry.observe("http_request_duration_seconds", time.perf_counter() - started, endpoint=endpoint)
+        return wrapper
+    return decorator
+
+
 class BookingAPI:
 
     def __init__(self):
         """
         Initialize the BookingAPI instance.
 
-        Sets up the booking controller, MongoDB client, and logger.
+        Sets up the booking controller, MongoDB client, logger and metrics registry.
         """
         self.booking_controller = BookingController()
         self.client = MongoClient("mongodb://localhost:27017/")
         self.logger = setup_logger("booking_api.log")
+        self.metrics_registry = Metrics()
+        self.metrics_registry.describe("http_requests_total", "counter", "Requests served, by endpoint.")
+        self.metrics_registry.describe("http_request_duration_seconds", "histogram", "Request latency, by endpoint.")
 
     @cherrypy.expose
     @cherrypy.tools.json_out()
@@ -25,6 +53,7 @@ class BookingAPI:
     @cherrypy.expose
     @cherrypy.tools.json_out()
     @cherrypy.tools.json_in()
+    @instrumented("fetch_available")
     def fetch_available(self):
         """
         Fetch available halls based on the provided criteria.
@@ -50,11 +79,46 @@ class BookingAPI:
     @cherrypy.expose
     @cherrypy.tools.json_out()
     @cherrypy.tools.json_in()
+    @instrumented("find_free_slots")
+    def find_free_slots(self):
+        """
+        Find the earliest free slots of a given length across the halls.
+
+        Expects JSON input with keys: 'duration_minutes', 'capacity', 'start_time' and 'end_time'
+        (the search window) and an optional 'limit' (default 5).
+
+        Returns:
+            dict: The free slots ordered by start time, or an error message.
+        """
+        try:
+            data = cherrypy.request.json
+            start_time = data.get("start_time")
+            end_time = data.get("end_time")
+            duration = data.get("duration_minutes")
+            capacity = data.get("capacity", 0)
+            self.logger.info(f"Received find free slots request: Start: {start_time}, End: {end_time}, Duration: {duration}, Capacity: {capacity}")
+            slots = self.booking_controller.find_free_slots(duration, capacity, start_time, end_time, data.get("limit", 5))
+            return {"result": slots}
+        except Exception as e:
+            self.logger.error("Invalid Input for find free slots request")
+            return {"error": str(e)}
+
+
+    def _idempotency_key(self, data):
+        # the JSON field wins over the header
+        return data.get("idempotency_key") or cherrypy.request.headers.get("Idempotency-Key")
+
+
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_in()
+    @instrumented("book_hall")
     def book_hall(self):
         """
         Book a hall based on the provided criteria.
 
-        Expects JSON input with keys: 'hall_id', 'start_time', 'end_time', and 'capacity'.
+        Expects JSON input with keys: 'hall_id', 'start_time', 'end_time', and 'capacity'. An optional
+        'idempotency_key' (or Idempotency-Key header) makes retries return the first result.
 
         Returns:
             dict: A dictionary containing the result of the booking operation or an error message.
@@ -66,7 +130,8 @@ class BookingAPI:
             end_time = data.get("end_time")
             capacity = data.get("capacity")
             self.logger.info(f"Received booking request: Hall {hall_id}, Start: {start_time}, End: {end_time}, capcacity: {capacity}")
-            result = self.booking_controller.book_hall(hall_id, start_time, end_time, capacity)
+            result = self.booking_controller.book_hall(hall_id, start_time, end_time, capacity,
+                                                       idempotency_key=self._idempotency_key(data))
             return {"result": result}
         except:
             self.logger.error("Invalid Input for book hall request")
@@ -76,24 +141,22 @@ class BookingAPI:
     @cherrypy.expose
     @cherrypy.tools.json_out()
     @cherrypy.tools.json_in()
+    @instrumented("book_multiple")
     def book_multiple(self):
         """
         Book multiple halls based on the provided criteria.
 
-        Expects JSON input with a 'bookings' key containing a list of booking details.
+        Expects JSON input with a 'bookings' key containing a list of booking details, and an
+        optional 'atomic' flag to store either all of them or none.
 
         Returns:
             dict: A dictionary containing the results of each booking operation or an error message.
         """
         try:
             data = cherrypy.request.json
-            result = []
-            for booking_data in data['bookings']:
-                hall_id = booking_data.get("hall_id")
-                start_time = booking_data.get("start_time")
-                end_time = booking_data.get("end_time")
-                capacity = booking_data.get("capacity")
-                result.append(self.booking_controller.book_hall(hall_id, start_time, end_time, capacity))
+            atomic = bool(data.get("atomic", False))
+            self.logger.info(f"Received book multiple request: {len(data['bookings'])} bookings, atomic: {atomic}")
+            result = self.booking_controller.book_many(data['bookings'], atomic=atomic)
             return {"result": result}
         except:
             self.logger.error("Invalid Input for book multiple halls request")
@@ -103,30 +166,85 @@ class BookingAPI:
     @cherrypy.expose
     @cherrypy.tools.json_out()
     @cherrypy.tools.json_in()
+    @instrumented("book_recurring")
+    def book_recurring(self):
+        """
+        Book a hall for every occurrence of a recurring slot.
+
+        Expects JSON input with keys: 'hall_id', 'start_time', 'end_time' (the first occurrence),
+        'capacity' and 'rule', e.g. {"freq": "weekly", "byday": ["MO"], "until": "2024-12-20"}
+        or "FREQ=DAILY;COUNT=5", and an optional 'atomic' flag to book all occurrences or none.
+
+        Returns:
+            dict: The occurrences and one result per occurrence, or an error message.
+        """
+        try:
+            data = cherrypy.request.json
+            hall_id = data.get("hall_id")
+            start_time = data.get("start_time")
+            end_time = data.get("end_time")
+            rule = data["rule"]
+            atomic = bool(data.get("atomic", False))
+            self.logger.info(f"Received recurring booking request: Hall {hall_id}, Start: {start_time}, End: {end_time}, Rule: {rule}")
+            series = self.booking_controller.book_recurring(hall_id, start_time, end_time, data.get("capacity"), rule, atomic=atomic)
+            return {"result": series["results"], "occurrences": series["occurrences"]}
+        except Exception:
+            self.logger.error("Invalid Input for recurring booking request")
+            return {"error": "Invalid Input"}
+
+    @cherrypy.expose
+    @cherrypy.tools.json_in()
+    @cherrypy.config(**{'response.stream': True})
+    @instrumented("fetch_bookings")
     def fetch_bookings(self):
         """
         Fetch booking records based on the provided date range.
 
-        Expects JSON input with keys: 'start_date' and 'end_date'.
+        Expects JSON input with keys: 'start_date' and 'end_date'. Optional keys:
+        'limit' (positive, capped at MAX_PAGE_SIZE) returns a single page of at most that many bookings plus a 'next_cursor' to pass
+        as 'cursor' for the following page; 'stream': true streams every booking as one JSON
+        line (NDJSON) so the response never has to be held in memory.
 
         Returns:
-            dict: A dictionary containing the bookings or an error message.
+            bytes: JSON with the bookings or an error message, or an NDJSON stream.
         """
         try:
             data = cherrypy.request.json
             start_date = data.get("start_date")
             end_date = data.get("end_date")
             self.logger.info(f"Received fetch bookings request: Start: {start_date}, End: {end_date}")
-            bookings = self.booking_controller.fetch_bookings(start_date, end_date)
-            return {"bookings": bookings}
+            if data.get("stream"):
+                cherrypy.response.headers['Content-Type'] = 'application/x-ndjson'
+                return self._stream_bookings(start_date, end_date)
+            if data.get("limit") is not None:
+                page = self.booking_controller.fetch_bookings_page(start_date, end_date, int(data["limit"]), data.get("cursor"))
+                body = page if isinstance(page, dict) else {"error": page}
+            else:
+                body = {"bookings": self.booking_controller.fetch_bookings(start_date, end_date)}
         except:
             self.logger.error("Invalid Input for fetch bookings request")
+            body = {"error": "Invalid Input"}
 
-            return {"error": "Invalid Input"}
+        cherrypy.response.headers['Content-Type'] = 'application/json'
+        return json.dumps(body).encode()
+
+
+    def _stream_bookings(self, start_date, end_date):
+        """
+        Generate the NDJSON body of a streamed fetch_bookings response.
+        """
+        try:
+            for record in self.booking_controller.iter_bookings(start_date, end_date):
+                yield json.dumps(record).encode() + b"\n"
+        except Exception as e:
+            # the status line is already sent, report the failure as the last line
+            self.logger.error(f"Streaming bookings failed, Start: {start_date}, End: {end_date}: {e}")
+            yield json.dumps({"error": "Fetch bookings failed"}).encode() + b"\n"
 
     @cherrypy.expose
     @cherrypy.tools.json_out()
     @cherrypy.tools.json_in()
+    @instrumented("cancel_booking")
     def cancel_booking(self):
         """
         Cancel a booking based on the provided booking ID.
@@ -150,11 +268,13 @@ class BookingAPI:
     @cherrypy.expose
     @cherrypy.tools.json_out()
     @cherrypy.tools.json_in()
+    @instrumented("update_booking")
     def update_booking(self):
         """
         Update a booking based on the provided booking ID and new details.
 
-        Expects JSON input with keys: 'booking_id', 'new_start_time', 'new_end_time', and 'capacity'.
+        Expects JSON input with keys: 'booking_id', 'new_start_time', 'new_end_time', and 'capacity'. An
+        optional 'idempotency_key' (or Idempotency-Key header) makes retries return the first result.
 
         Returns:
             dict: A dictionary containing the result of the update operation or an error message.
@@ -166,12 +286,149 @@ class BookingAPI:
             new_end_time = data.get("new_end_time")
             capacity = data.get("capacity")
             self.logger.info(f'Received update request: Booking ID: {booking_id}, Start: {new_start_time}, End: {new_end_time}, Capacity: {capacity}')
-            result = self.booking_controller.update_booking(booking_id, new_start_time, new_end_time,capacity)
+            result = self.booking_controller.update_booking(booking_id, new_start_time, new_end_time,capacity,
+                                                            idempotency_key=self._idempotency_key(data))
             return {"result": result}
         except Exception as e:
             self.logger.error("Invalid Input for update booking request",e)
             return {"error": str(e)}
 
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    @instrumented("halls")
+    def halls(self, min_capacity=0):
+        """
+        List the halls, optionally only those with at least min_capacity seats.
+
+        Returns:
+            list | dict: The halls ordered by capacity, or an error message.
+        """
+        try:
+            return self.booking_controller.list_halls(int(min_capacity))
+        except Exception as e:
+            self.logger.error(f"Invalid Input for halls request: {e}")
+            return {"error": "Invalid Input"}
+
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    @instrumented("calendar")
+    def calendar(self, start_date, end_date, granularity=15, min_capacity=0):
+        """
+        Free/busy calendar of every hall, e.g. GET /calendar?start_date=2024-09-02&end_date=2024-09-08&granularity=30
+
+        Returns:
+            dict: By hall ID, a bitmap per day with one character per period ("1" busy, "0" free),
+                or an error message.
+        """
+        try:
+            result = self.booking_controller.calendar(start_date, end_date, int(granularity), int(min_capacity))
+            if isinstance(result, str):
+                return {"error": result}
+            return result
+        except Exception as e:
+            self.logger.error(f"Invalid Input for calendar request: {e}")
+            return {"error": "Invalid Input"}
+
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_in()
+    @instrumented("save_hall")
+    def save_hall(self):
+        """
+        Add a hall or change its capacity.
+
+        Expects JSON input with keys: 'hall_id' and 'capacity'.
+
+        Returns:
+            dict: A dictionary containing the result or an error message.
+        """
+        try:
+            data = cherrypy.request.json
+            self.logger.info(f"Received save hall request: Hall {data.get('hall_id')}, Capacity: {data.get('capacity')}")
+            return {"result": self.booking_controller.save_hall(data.get("hall_id"), data.get("capacity"))}
+        except Exception as e:
+            self.logger.error(f"Invalid Input for save hall request: {e}")
+            return {"error": "Invalid Input"}
+
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_in()
+    @instrumented("remove_hall")
+    def remove_hall(self):
+        """
+        Remove a hall from the catalog.
+
+        Expects JSON input with a 'hall_id' key.
+
+        Returns:
+            dict: A dictionary containing the result or an error message.
+        """
+        try:
+            data = cherrypy.request.json
+            self.logger.info(f"Received remove hall request: Hall {data.get('hall_id')}")
+            return {"result": self.booking_controller.remove_hall(data.get("hall_id"))}
+        except Exception as e:
+            self.logger.error(f"Invalid Input for remove hall request: {e}")
+            return {"error": "Invalid Input"}
+
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    @instrumented("reload_halls")
+    def reload_halls(self):
+        """
+        Reload the hall catalog from the database without restarting.
+
+        Returns:
+            dict: A dictionary containing the result or an error message.
+        """
+        try:
+            return {"result": self.booking_controller.reload_halls()}
+        except Exception as e:
+            self.logger.error(f"Reloading halls failed: {e}")
+            return {"error": str(e)}
+
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    @instrumented("lock_contention")
+    def lock_contention(self, limit=10):
+        """
+        List the most contended halls and time windows of the slot locks.
+
+        Args:
+            limit (int, optional): Number of halls and of windows returned. Default is 10.
+
+        Returns:
+            dict: The hall and window statistics, or an error message.
+        """
+        try:
+            return self.booking_controller.lock_service.contention(int(limit))
+        except Exception as e:
+            self.logger.error(f"Invalid Input for lock contention request: {e}")
+            return {"error": "Invalid Input"}
+
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    @instrumented("cache_stats")
+    def cache_stats(self):
+        """
+        Report the hit rate and size of the fetch_available response cache.
+
+        Returns:
+            dict: Hits, misses, stale and expired entries, evictions, size and hit rate.
+        """
+        return self.booking_controller.response_cache_stats()
+
+    @cherrypy.expose
+    def metrics(self):
+        """
+        Report request counts and latencies, Mongo command timings and booking outcomes.
+
+        Returns:
+            str: The metrics in the Prometheus text exposition format.
+        """
+        cherrypy.response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+        return self.metrics_registry.render()
+
 if __name__ == '__main__':
     cherrypy.config.update({
         'server.socket_host': '0.0.0.0',
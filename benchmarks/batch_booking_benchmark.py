@@ -0,0 +1,48 @@
+import argparse
+import json
+import logging
+from datetime import datetime, timedelta
+from benchmarks.common import timed, use_benchmark_database
+
+use_benchmark_database()
+from controller.booking_controller import BookingController
+
+
+BASE_TIME = datetime(2032, 1, 1)
+
+
+def batch(offset_days, size) -> list[dict]:
+    """
+    Build a batch of non-overlapping bookings spread over the halls, starting offset_days after BASE_TIME.
+    """
+    items = []
+    for i in range(size):
+        start = BASE_TIME + timedelta(days=offset_days, hours=i)
+        items.append({"hall_id": "ABCDEF"[i % 6], "start_time": start.isoformat(),
+                      "end_time": (start + timedelta(minutes=30)).isoformat(), "capacity": 10})
+    return items
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare book_many against looping over book_hall")
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger("booking_controller.log").setLevel(logging.ERROR)
+    logging.getLogger("lock_manager.log").setLevel(logging.ERROR)
+    controller = BookingController()
+    controller.delete_all_bookings()
+
+    runs = []
+    for run in range(args.repeat):
+        single = batch(run * 10, 1)[0]
+        looped = batch(run * 10 + 1, args.size)
+        runs.append({
+            "single_book_hall_ms": timed(lambda: controller.book_hall(single["hall_id"], single["start_time"], single["end_time"], single["capacity"])),
+            "book_hall_loop_ms": timed(lambda: [controller.book_hall(item["hall_id"], item["start_time"], item["end_time"], item["capacity"]) for item in looped]),
+            "book_many_best_effort_ms": timed(lambda: controller.book_many(batch(run * 10 + 2, args.size))),
+            "book_many_atomic_ms": timed(lambda: controller.book_many(batch(run * 10 + 3, args.size), atomic=True)),
+        })
+    controller.delete_all_bookings()
+    print(json.dumps({"batch_size": args.size, "runs": runs}, indent=2))
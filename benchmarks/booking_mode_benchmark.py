@@ -0,0 +1,106 @@
+import argparse
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from benchmarks.common import latency_summary, use_benchmark_database
+
+use_benchmark_database()
+from controller.booking_controller import BookingController
+
+
+BASE_TIME = datetime(2031, 1, 1, 6)
+
+
+def run_round(controller, round_id, threads) -> tuple[list, int]:
+    """
+    Run one round shaped like tests/multithreading_unittest.py: half the threads book distinct
+    slots of hall A, the other half all race for the same slot of hall F.
+
+    Args:
+        controller (BookingController): The controller under test.
+        round_id (int): Round number, used to give every round fresh slots.
+        threads (int): Number of concurrent book_hall calls.
+
+    Returns:
+        tuple[list, int]: book_hall latencies in seconds and the number of successful bookings.
+    """
+    day = BASE_TIME + timedelta(days=round_id)
+    latencies = []
+    successes = 0
+    results_lock = threading.Lock()
+
+    def book(hall_id, start, capacity):
+        nonlocal successes
+        started = time.perf_counter()
+        result = controller.book_hall(hall_id, start.isoformat(), (start + timedelta(hours=1)).isoformat(), capacity)
+        elapsed = time.perf_counter() - started
+        with results_lock:
+            latencies.append(elapsed)
+            successes += "successful" in result
+
+    workers = []
+    for i in range(threads):
+        if i % 2:
+            workers.append(threading.Thread(target=book, args=("F", day, 300)))
+        else:
+            workers.append(threading.Thread(target=book, args=("A", day + timedelta(hours=i), 10)))
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies, successes
+
+
+def run(controller, mode, rounds, threads) -> dict:
+    """
+    Benchmark book_hall in one booking mode.
+
+    Args:
+        controller (BookingController): The controller under test.
+        mode (str): "locked" or "optimistic".
+        rounds (int): Number of rounds.
+        threads (int): Concurrent book_hall calls per round.
+
+    Returns:
+        dict: Throughput, latency percentiles and the number of successful bookings.
+    """
+    controller.booking_mode = mode
+    controller.delete_all_bookings()
+    latencies = []
+    successes = 0
+    started = time.perf_counter()
+    for round_id in range(rounds):
+        round_latencies, round_successes = run_round(controller, round_id, threads)
+        latencies += round_latencies
+        successes += round_successes
+    elapsed = time.perf_counter() - started
+
+    # every round has threads // 2 distinct A slots and exactly one winner for the F slot
+    expected = rounds * ((threads + 1) // 2 + (1 if threads > 1 else 0))
+    return {
+        "mode": mode,
+        "threads": threads,
+        "calls": len(latencies),
+        "bookings_per_second": round(len(latencies) / elapsed, 1),
+        "successful": successes,
+        "expected_successful": expected,
+        **latency_summary(latencies),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare locked and optimistic book_hall under concurrency")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--threads", default="6,32")
+    args = parser.parse_args()
+
+    logging.getLogger("booking_controller.log").setLevel(logging.ERROR)
+    logging.getLogger("lock_manager.log").setLevel(logging.ERROR)
+    controller = BookingController()
+
+    results = [run(controller, mode, args.rounds, int(threads))
+               for threads in args.threads.split(",") for mode in ("locked", "optimistic")]
+    controller.delete_all_bookings()
+    print(json.dumps(results, indent=2))
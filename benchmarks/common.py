@@ -0,0 +1,58 @@
+import os
+import time
+
+
+# benchmarks write to their own database unless told otherwise, never to the application's one
+BENCHMARK_DB_NAME = "seminar_hall_booking_bench"
+
+
+def use_benchmark_database() -> None:
+    """
+    Point BookingDatabase at the benchmark database. Must run before BookingDatabase is first created.
+    """
+    os.environ.setdefault("MONGO_DB_NAME", BENCHMARK_DB_NAME)
+
+
+def timed(function) -> float:
+    """
+    Run a function once and return its wall time in milliseconds.
+    """
+    started = time.perf_counter()
+    function()
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+def percentile(samples, fraction) -> float:
+    """
+    Nearest-rank percentile of a list of samples.
+
+    Args:
+        samples (list[float]): The measured values.
+        fraction (float): The percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        float: The sample at the requested rank, 0 for an empty list.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def latency_summary(samples, prefix="") -> dict:
+    """
+    Summarise latency samples given in seconds as milliseconds percentiles.
+
+    Args:
+        samples (list[float]): Latencies in seconds.
+        prefix (str, optional): Prefix for the result keys, e.g. "acquire_". Default is "".
+
+    Returns:
+        dict: p50, p95, p99 and max latency in milliseconds.
+    """
+    return {
+        f"{prefix}p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        f"{prefix}p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        f"{prefix}p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        f"{prefix}max_ms": round(max(samples, default=0) * 1000, 3),
+    }
@@ -0,0 +1,115 @@
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from benchmarks.common import latency_summary, use_benchmark_database
+
+use_benchmark_database()
+from database.db_module import BookingDatabase
+from controller.booking_controller import BookingController
+from models.booking import Booking, to_datetime
+from models.halls import halls
+
+
+BASE_TIME = datetime(2030, 1, 1)
+
+
+def seed(db, count, span_days=3650, batch_size=10000) -> None:
+    """
+    Replace the benchmark bookings with randomly placed ones.
+
+    Args:
+        db (BookingDatabase): The benchmark database.
+        count (int): Number of bookings to insert.
+        span_days (int, optional): Number of days the bookings are spread over. Default is 3650.
+        batch_size (int, optional): Documents per insert_many call. Default is 10000.
+    """
+    db.delete_database()
+    rng = random.Random(42)
+    hall_ids = [hall.name for hall in halls]
+    batch = []
+    for _ in range(count):
+        start = BASE_TIME + timedelta(minutes=15 * rng.randrange(span_days * 96))
+        end = start + timedelta(minutes=15 * rng.randint(1, 16))
+        batch.append(Booking(rng.choice(hall_ids), start.isoformat(), end.isoformat(), 10).__dict__)
+        if len(batch) == batch_size:
+            db.bookings.insert_many(batch)
+            batch = []
+    if batch:
+        db.bookings.insert_many(batch)
+
+
+def legacy_fetch_available(db, start_time, end_time, capacity) -> list[dict]:
+    """
+    The previous implementation: full documents, a list membership test per hall, and an $or
+    which misses bookings containing the whole window.
+    """
+    start_time, end_time = to_datetime(start_time), to_datetime(end_time)
+    bookings = db.find({
+        "$or": [
+            {"start_time": {"$lte": end_time, "$gte": start_time}},
+            {"end_time": {"$lte": end_time, "$gte": start_time}}
+        ]})
+    booked_halls = [booking['hall_id'] for booking in bookings]
+    return [{'hall_id': hall.name, 'capacity': hall.value} for hall in halls if (hall.name not in booked_halls and hall.value >= capacity)]
+
+
+def windows(count, span_days=3650, hours=2) -> list[tuple[str, str]]:
+    """
+    Build reproducible random query windows spread over the seeded range.
+
+    Args:
+        count (int): Number of windows.
+        span_days (int, optional): Number of days the windows are spread over. Default is 3650.
+        hours (int, optional): Length of each window in hours. Default is 2.
+
+    Returns:
+        list[tuple[str, str]]: ISO formatted start and end time of each window.
+    """
+    rng = random.Random(7)
+    result = []
+    for _ in range(count):
+        start = BASE_TIME + timedelta(hours=rng.randrange(span_days * 24))
+        result.append((start.isoformat(), (start + timedelta(hours=hours)).isoformat()))
+    return result
+
+
+def measure(function, queries) -> dict:
+    """
+    Time a fetch function over every query window.
+
+    Args:
+        function (callable): Called with the start and end time of each window.
+        queries (list[tuple[str, str]]): The query windows.
+
+    Returns:
+        dict: Number of queries and latency percentiles.
+    """
+    latencies = []
+    for start_time, end_time in queries:
+        started = time.perf_counter()
+        function(start_time, end_time)
+        latencies.append(time.perf_counter() - started)
+    return {"queries": len(queries), **latency_summary(latencies)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark fetch_available_halls against a large bookings collection")
+    parser.add_argument("--bookings", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the bookings already in the benchmark database")
+    args = parser.parse_args()
+
+    db = BookingDatabase()
+    controller = BookingController()
+    if not args.skip_seed:
+        seed(db, args.bookings)
+
+    queries = windows(args.queries)
+    print(json.dumps({
+        "bookings": db.bookings.estimated_document_count(),
+        "indexes": list(db.bookings.index_information()),
+        "legacy": measure(lambda start, end: legacy_fetch_available(db, start, end, 0), queries),
+        "current": measure(lambda start, end: controller.fetch_available_halls(start, end, 0), queries),
+    }, indent=2))
@@ -0,0 +1,74 @@
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from benchmarks.common import latency_summary, use_benchmark_database
+
+use_benchmark_database()
+from database.db_module import BookingDatabase
+from controller.booking_controller import BookingController
+from benchmarks.fetch_available_benchmark import BASE_TIME, seed
+
+
+def probe(controller, start_time, end_time, duration_minutes, capacity, limit, step_minutes=15) -> tuple[list, int]:
+    """
+    What clients did before find_free_slots: shift a fetch_available_halls window until enough halls are free.
+
+    Returns:
+        tuple[list, int]: The (hall_id, start_time) candidates found and the number of fetch calls made.
+    """
+    candidates, calls = [], 0
+    slot = datetime.fromisoformat(start_time)
+    window_end = datetime.fromisoformat(end_time)
+    duration = timedelta(minutes=duration_minutes)
+    while len(candidates) < limit and slot + duration <= window_end:
+        calls += 1
+        for hall in controller.fetch_available_halls(slot.isoformat(), (slot + duration).isoformat(), capacity):
+            candidates.append((hall["hall_id"], slot.isoformat()))
+        slot += timedelta(minutes=step_minutes)
+    return candidates[:limit], calls
+
+
+def measure(function, queries) -> dict:
+    """
+    Time a search function over every query window.
+    """
+    latencies = []
+    for start_time, end_time in queries:
+        started = time.perf_counter()
+        function(start_time, end_time)
+        latencies.append(time.perf_counter() - started)
+    return {"queries": len(queries), **latency_summary(latencies)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare find_free_slots against probing fetch_available_halls with shifted windows")
+    parser.add_argument("--bookings", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--duration", type=int, default=120, help="slot length in minutes")
+    parser.add_argument("--capacity", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--span-days", type=int, default=365, help="days the bookings are spread over, fewer is denser")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the bookings already in the benchmark database")
+    args = parser.parse_args()
+
+    db = BookingDatabase()
+    if not args.skip_seed:
+        seed(db, args.bookings, span_days=args.span_days)
+    controller = BookingController()
+    controller.booking_cache and controller.booking_cache.reload()
+
+    rng = random.Random(7)
+    queries = []
+    for _ in range(args.queries):
+        start = BASE_TIME + timedelta(hours=rng.randrange(args.span_days * 24))
+        queries.append((start.isoformat(), (start + timedelta(days=2)).isoformat()))
+    calls = [probe(controller, start, end, args.duration, args.capacity, args.limit)[1] for start, end in queries[:10]]
+
+    print(json.dumps({
+        "bookings": db.bookings.estimated_document_count(),
+        "probe_fetch_calls_per_search": sum(calls) / len(calls),
+        "probe": measure(lambda start, end: probe(controller, start, end, args.duration, args.capacity, args.limit), queries),
+        "find_free_slots": measure(lambda start, end: controller.find_free_slots(args.duration, args.capacity, start, end, args.limit), queries),
+    }, indent=2))
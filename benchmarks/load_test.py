@@ -0,0 +1,368 @@
+import argparse
+import http.client
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from benchmarks.common import latency_summary, use_benchmark_database
+
+use_benchmark_database()
+from controller.booking_controller import BookingController, booking_outcome
+from models.halls import halls
+
+
+BASE_TIME = datetime(2033, 1, 1)
+BOOKING_ID = re.compile(r"Booking ID: (\w+)")
+DEFAULT_MIX = "book=60,fetch=30,update=5,cancel=5"
+
+
+class ControllerTarget:
+    """
+    Calls BookingController in-process.
+    """
+
+    name = "controller"
+
+    def __init__(self, controller):
+        self.controller = controller
+
+    def book(self, hall_id, start_time, end_time, capacity):
+        return self.controller.book_hall(hall_id, start_time, end_time, capacity)
+
+    def fetch(self, start_time, end_time, capacity):
+        return self.controller.fetch_available_halls(start_time, end_time, capacity)
+
+    def update(self, booking_id, start_time, end_time, capacity):
+        return self.controller.update_booking(booking_id, start_time, end_time, capacity)
+
+    def cancel(self, booking_id):
+        return self.controller.cancel_booking(booking_id)
+
+    def fetch_bookings(self, start_date, end_date):
+        return self.controller.fetch_bookings(start_date, end_date)
+
+    def reset(self):
+        self.controller.delete_all_bookings()
+
+
+class HttpTarget:
+    """
+    Calls BookingAPI over HTTP, one keep-alive connection per worker thread.
+    """
+
+    name = "api"
+
+    def __init__(self, url, controller=None):
+        """
+        Args:
+            url (str): Base URL of the API, e.g. http://localhost:8081.
+            controller (BookingController, optional): Used to clear the bookings between runs when
+                the API shares the benchmark database. Default leaves the data alone.
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.controller = controller
+        self.local = threading.local()
+
+    def _post(self, path, body):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            connection.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            payload = response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self.local.connection = None
+            raise
+        if response.status != 200:
+            return f"HTTP {response.status}"
+        data = json.loads(payload)
+        if isinstance(data, dict) and "error" in data:
+            return f"API error: {data['error']}"
+        return data["result"] if isinstance(data, dict) and "result" in data else data
+
+    def book(self, hall_id, start_time, end_time, capacity):
+        return self._post("/book_hall", {"hall_id": hall_id, "start_time": start_time, "end_time": end_time, "capacity": capacity})
+
+    def fetch(self, start_time, end_time, capacity):
+        return self._post("/fetch_available", {"start_time": start_time, "end_time": end_time, "capacity": capacity})
+
+    def update(self, booking_id, start_time, end_time, capacity):
+        return self._post("/update_booking", {"booking_id": booking_id, "new_start_time": start_time,
+                                              "new_end_time": end_time, "capacity": capacity})
+
+    def cancel(self, booking_id):
+        return self._post("/cancel_booking", {"booking_id": booking_id})
+
+    def fetch_bookings(self, start_date, end_date):
+        data = self._post("/fetch_bookings", {"start_date": start_date, "end_date": end_date})
+        return data["bookings"] if isinstance(data, dict) and "bookings" in data else data
+
+    def reset(self):
+        if self.controller is not None:
+            self.controller.delete_all_bookings()
+
+
+def start_api(port, thread_pool) -> str:
+    """
+    Serve BookingAPI from this process, sharing its controller with the benchmark.
+
+    Args:
+        port (int): The port to listen on.
+        thread_pool (int): Number of CherryPy worker threads.
+
+    Returns:
+        str: The base URL of the server.
+    """
+    import cherrypy
+    from api.cherrypy_api import BookingAPI
+
+    cherrypy.config.update({
+        'server.socket_host': '127.0.0.1',
+        'server.socket_port': port,
+        'server.thread_pool': thread_pool,
+        'log.screen': False,
+        'environment': 'production',
+    })
+    cherrypy.tree.mount(BookingAPI(), '/')
+    cherrypy.engine.start()
+    cherrypy.engine.wait(cherrypy.engine.states.STARTED)
+    return f"http://127.0.0.1:{port}"
+
+
+def outcome(operation, result) -> str:
+    """
+    Classify the result of one operation of any target.
+
+    Args:
+        operation (str): book, fetch, update, cancel or fetch_bookings.
+        result: What the target returned.
+
+    Returns:
+        str: The outcome, as counted by the controller metrics.
+    """
+    if operation in ("fetch", "fetch_bookings"):
+        return "success" if isinstance(result, list) else booking_outcome(result)
+    return booking_outcome(result)
+
+
+def parse_mix(mix) -> dict:
+    """
+    Parse an operation mix such as "book=60,fetch=30,update=5,cancel=5".
+
+    Returns:
+        dict: Operation name -> relative weight.
+    """
+    weights = {}
+    for part in mix.split(","):
+        operation, weight = part.split("=")
+        if operation not in ("book", "fetch", "update", "cancel"):
+            raise ValueError(f"Unknown operation: {operation}")
+        weights[operation] = float(weight)
+    return weights
+
+
+def hall_weights(hall_ids, skew) -> list[float]:
+    """
+    Zipf-like popularity of the halls: the n-th hall is picked with weight 1 / n ** skew.
+
+    Args:
+        hall_ids (list[str]): The halls, most popular first.
+        skew (float): 0 picks every hall equally often, larger values concentrate the load.
+    """
+    return [1 / (rank ** skew) for rank in range(1, len(hall_ids) + 1)]
+
+
+class BookingPool:
+    """
+    Bookings created during a run, the targets of update and cancel operations.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bookings = []
+
+    def add(self, booking_id, hall_id, capacity) -> None:
+        with self.lock:
+            self.bookings.append((booking_id, hall_id, capacity))
+
+    def pick(self, rng, remove=False):
+        with self.lock:
+            if not self.bookings:
+                return None
+            position = rng.randrange(len(self.bookings))
+            if remove:
+                self.bookings[position], self.bookings[-1] = self.bookings[-1], self.bookings[position]
+                return self.bookings.pop()
+            return self.bookings[position]
+
+
+class Workload:
+    """
+    Reproducible random operations over a configurable mix, hall skew and time range.
+    """
+
+    def __init__(self, mix=DEFAULT_MIX, skew=0.0, days=30):
+        """
+        Args:
+            mix (str, optional): Relative weights of the operations. Default is book=60,fetch=30,update=5,cancel=5.
+            skew (float, optional): Zipf exponent of the hall popularity. Default is 0 (uniform).
+            days (int, optional): Number of days the slots are spread over; fewer days mean more conflicts. Default is 30.
+        """
+        weights = parse_mix(mix)
+        self.operations = list(weights)
+        self.operation_weights = list(weights.values())
+        self.hall_ids = [hall.name for hall in halls]
+        self.hall_weights = hall_weights(self.hall_ids, skew)
+        self.days = days
+
+    def slot(self, rng) -> tuple[str, str]:
+        start = BASE_TIME + timedelta(hours=rng.randrange(self.days * 24))
+        end = start + timedelta(hours=rng.randint(1, 3))
+        return start.isoformat(), end.isoformat()
+
+    def hall(self, rng) -> tuple[str, int]:
+        hall_id = rng.choices(self.hall_ids, self.hall_weights)[0]
+        return hall_id, rng.randint(1, halls[hall_id].value)
+
+    def execute(self, target, pool, rng) -> tuple[str, object]:
+        """
+        Run one random operation against a target.
+
+        Returns:
+            tuple[str, object]: The operation actually run and its result. Updates and cancels
+                fall back to a booking while no booking exists yet.
+        """
+        operation = rng.choices(self.operations, self.operation_weights)[0]
+        if operation in ("update", "cancel"):
+            booking = pool.pick(rng, remove=operation == "cancel")
+            if booking is None:
+                operation = "book"
+        start_time, end_time = self.slot(rng)
+
+        if operation == "book":
+            hall_id, capacity = self.hall(rng)
+            result = target.book(hall_id, start_time, end_time, capacity)
+            match = BOOKING_ID.search(result) if isinstance(result, str) else None
+            if match:
+                pool.add(match.group(1), hall_id, capacity)
+        elif operation == "fetch":
+            result = target.fetch(start_time, end_time, self.hall(rng)[1])
+        elif operation == "update":
+            booking_id, _, capacity = booking
+            result = target.update(booking_id, start_time, end_time, capacity)
+        else:
+            result = target.cancel(booking[0])
+        return operation, result
+
+
+def summarize(samples, elapsed) -> dict:
+    """
+    Summarise (operation, outcome, seconds) samples.
+
+    Args:
+        samples (list[tuple]): One sample per operation.
+        elapsed (float): Wall clock duration of the run in seconds.
+
+    Returns:
+        dict: Throughput, overall latency percentiles and per operation counts, outcomes and latencies.
+    """
+    by_operation = defaultdict(list)
+    outcomes = defaultdict(Counter)
+    for operation, result, seconds in samples:
+        by_operation[operation].append(seconds)
+        outcomes[operation][result] += 1
+    return {
+        "operations": len(samples),
+        "seconds": round(elapsed, 3),
+        "ops_per_second": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        **latency_summary([seconds for _, _, seconds in samples]),
+        "by_operation": {
+            operation: {"count": len(latencies), "outcomes": dict(outcomes[operation]), **latency_summary(latencies)}
+            for operation, latencies in sorted(by_operation.items())
+        },
+    }
+
+
+def run(target, workload, concurrency, operations, seed=42) -> dict:
+    """
+    Run a fixed number of random operations split across concurrent workers.
+
+    Args:
+        target (ControllerTarget | HttpTarget): What the operations are sent to.
+        workload (Workload): The operation generator.
+        concurrency (int): Number of worker threads.
+        operations (int): Total number of operations.
+        seed (int, optional): Seed of the workers' random generators. Default is 42.
+
+    Returns:
+        dict: The summary of the run.
+    """
+    target.reset()
+    pool = BookingPool()
+    samples = []
+    samples_lock = threading.Lock()
+
+    def worker(worker_id):
+        rng = random.Random(seed * 1000 + worker_id)
+        local = []
+        for _ in range(worker_id, operations, concurrency):
+            started = time.perf_counter()
+            try:
+                operation, result = workload.execute(target, pool, rng)
+                result = outcome(operation, result)
+            except Exception:
+                operation, result = "error", "error"
+            local.append((operation, result, time.perf_counter() - started))
+        with samples_lock:
+            samples.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(worker_id,)) for worker_id in range(concurrency)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return {"target": target.name, "concurrency": concurrency, **summarize(samples, time.perf_counter() - started)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test BookingController and BookingAPI with a random operation mix")
+    parser.add_argument("--target", choices=("controller", "api"), default="controller")
+    parser.add_argument("--url", help="base URL of a running API, by default one is started in this process")
+    parser.add_argument("--port", type=int, default=8089, help="port of the API started in this process")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--operations", type=int, default=5000, help="operations per concurrency level")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--skew", type=float, default=0.0, help="Zipf exponent of hall popularity, 0 is uniform")
+    parser.add_argument("--days", type=int, default=30, help="days the slots are spread over, fewer means more conflicts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep-data", action="store_true", help="do not clear the benchmark bookings between runs")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    if args.target == "controller":
+        target = ControllerTarget(BookingController())
+    elif args.url:
+        # a separate server keeps its own booking cache, its data is never cleared from here
+        target = HttpTarget(args.url)
+    else:
+        target = HttpTarget(start_api(args.port, max(levels) + 2), BookingController())
+    if args.keep_data:
+        target.reset = lambda: None
+
+    workload = Workload(args.mix, args.skew, args.days)
+    results = [run(target, workload, level, args.operations, args.seed) for level in levels]
+    if not args.keep_data:
+        target.reset()
+    if args.target == "api" and not args.url:
+        import cherrypy
+        cherrypy.engine.exit()
+    print(json.dumps({"mix": args.mix, "skew": args.skew, "days": args.days, "results": results}, indent=2))
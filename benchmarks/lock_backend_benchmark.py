@@ -0,0 +1,72 @@
+import argparse
+import json
+import threading
+import time
+from datetime import datetime
+from utils.lock_backends import InMemoryLockBackend, MongoLeaseLockBackend
+from benchmarks.lock_manager_benchmark import slot
+from benchmarks.common import latency_summary, use_benchmark_database
+
+
+def run(backend, threads, cycles) -> dict:
+    """
+    Measure acquire and release latency of a lock backend with threads cycling over disjoint slots.
+
+    Args:
+        backend: The lock backend under test.
+        threads (int): Number of worker threads, each on its own hall.
+        cycles (int): Acquire/release cycles per thread.
+
+    Returns:
+        dict: Latency percentiles in milliseconds and overall throughput.
+    """
+    acquire_times = []
+    release_times = []
+    samples_lock = threading.Lock()
+
+    def worker(worker_id):
+        hall_id = f"bench-backend-{worker_id}"
+        acquired = []
+        released = []
+        for i in range(cycles):
+            start_time, end_time = (datetime.fromisoformat(value) for value in slot(i))
+            started = time.perf_counter()
+            backend.acquire(hall_id, start_time, end_time, time.monotonic() + 5)
+            acquired.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            backend.release(hall_id, start_time, end_time)
+            released.append(time.perf_counter() - started)
+        with samples_lock:
+            acquire_times.extend(acquired)
+            release_times.extend(released)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "backend": backend.name,
+        "threads": threads,
+        "cycles_per_second": round(len(acquire_times) / elapsed, 1),
+        **latency_summary(acquire_times, "acquire_"),
+        **latency_summary(release_times, "release_"),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare acquire latency of the in-memory and Mongo lease lock backends")
+    parser.add_argument("--threads", default="1,8")
+    parser.add_argument("--cycles", type=int, default=500)
+    args = parser.parse_args()
+
+    use_benchmark_database()
+    from database.db_module import BookingDatabase
+    backends = [InMemoryLockBackend(), MongoLeaseLockBackend(BookingDatabase().leases)]
+
+    results = [run(backend, int(threads), args.cycles)
+               for threads in args.threads.split(",") for backend in backends]
+    print(json.dumps(results, indent=2))
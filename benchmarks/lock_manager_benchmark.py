@@ -0,0 +1,127 @@
+import argparse
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from utils.lock_manager import LockManager
+from benchmarks.common import latency_summary
+
+
+BASE_TIME = datetime(2030, 1, 1)
+
+
+def slot(index, minutes=30) -> tuple[str, str]:
+    """
+    Build the ISO start and end times of the index-th non-overlapping slot.
+
+    Args:
+        index (int): Position of the slot.
+        minutes (int, optional): Length of each slot in minutes. Default is 30.
+
+    Returns:
+        tuple[str, str]: ISO formatted start and end time of the slot.
+    """
+    start = BASE_TIME + timedelta(minutes=index * minutes)
+    return start.isoformat(), (start + timedelta(minutes=minutes)).isoformat()
+
+
+def run(held_locks, iterations) -> dict:
+    """
+    Measure acquire/release throughput on a hall which already holds a number of slot locks.
+
+    Args:
+        held_locks (int): Number of locks held on the hall while measuring.
+        iterations (int): Number of acquire/release cycles to time.
+
+    Returns:
+        dict: The benchmark result for this lock table size.
+    """
+    manager = LockManager()
+    hall_id = f"bench-{held_locks}"
+
+    # every other slot is held, the free slots in between are the ones being cycled
+    for i in range(held_locks):
+        manager.acquire_lock(hall_id, *slot(2 * i))
+    free_slots = [slot(2 * i + 1) for i in range(max(held_locks, 1))]
+
+    started = time.perf_counter()
+    for i in range(iterations):
+        start_time, end_time = free_slots[i % len(free_slots)]
+        manager.acquire_lock(hall_id, start_time, end_time)
+        manager.release_lock(hall_id, start_time, end_time)
+    elapsed = time.perf_counter() - started
+
+    for i in range(held_locks):
+        manager.release_lock(hall_id, *slot(2 * i))
+
+    return {
+        "held_locks": held_locks,
+        "iterations": iterations,
+        "seconds": round(elapsed, 4),
+        "cycles_per_second": round(iterations / elapsed, 1),
+    }
+
+
+def run_contention(threads, cycles, hold_seconds) -> dict:
+    """
+    Measure lock wait latency and CPU usage while many threads contend for the same slot.
+
+    Args:
+        threads (int): Number of threads competing for the slot.
+        cycles (int): Number of acquire/release cycles per thread.
+        hold_seconds (float): How long each holder keeps the lock, standing in for the DB write.
+
+    Returns:
+        dict: The latency percentiles (ms) and CPU seconds consumed by the run.
+    """
+    manager = LockManager()
+    hall_id = f"bench-contention-{threads}"
+    start_time, end_time = slot(0)
+    waits = []
+    waits_lock = threading.Lock()
+
+    def worker():
+        for _ in range(cycles):
+            requested = time.perf_counter()
+            if manager.acquire_lock(hall_id, start_time, end_time, timeout=60):
+                waited = time.perf_counter() - requested
+                time.sleep(hold_seconds)
+                manager.release_lock(hall_id, start_time, end_time)
+                with waits_lock:
+                    waits.append(waited)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return {
+        "threads": threads,
+        "acquired": len(waits),
+        "seconds": round(time.perf_counter() - started, 4),
+        "cpu_seconds": round(time.process_time() - cpu_started, 4),
+        **latency_summary(waits, "wait_"),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="LockManager acquire/release micro-benchmark")
+    parser.add_argument("--sizes", default="0,10,100,1000,10000", help="comma separated numbers of held locks per hall")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--contention", default="", help="comma separated thread counts contending for one slot")
+    parser.add_argument("--cycles", type=int, default=50, help="acquire/release cycles per contending thread")
+    parser.add_argument("--hold-ms", type=float, default=1.0, help="lock hold time per cycle in milliseconds")
+    args = parser.parse_args()
+
+    # keep the per-call log lines out of the measurement
+    logging.getLogger("lock_manager.log").setLevel(logging.ERROR)
+
+    results = [run(int(size), args.iterations) for size in args.sizes.split(",")]
+    if args.contention:
+        results += [run_contention(int(threads), args.cycles, args.hold_ms / 1000)
+                    for threads in args.contention.split(",")]
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,48 @@
+import argparse
+import json
+import logging
+import time
+import tracemalloc
+from utils.lock_manager import LockManager
+from benchmarks.lock_manager_benchmark import slot
+
+
+def soak(manager, cycles, halls=50, slots=10000) -> None:
+    """
+    Run acquire/release cycles over many distinct halls and slots.
+
+    Args:
+        manager (LockManager): The lock manager under test.
+        cycles (int): Number of acquire/release cycles.
+        halls (int, optional): Number of distinct halls cycled through. Default is 50.
+        slots (int, optional): Number of distinct slots cycled through. Default is 10000.
+    """
+    for i in range(cycles):
+        hall_id = f"soak-{i % halls}"
+        start_time, end_time = slot(i % slots)
+        manager.acquire_lock(hall_id, start_time, end_time)
+        manager.release_lock(hall_id, start_time, end_time)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="LockManager memory soak test")
+    parser.add_argument("--cycles", type=int, default=1000000)
+    parser.add_argument("--rounds", type=int, default=5, help="number of memory samples taken over the run")
+    args = parser.parse_args()
+
+    logging.getLogger("lock_manager.log").setLevel(logging.ERROR)
+    manager = LockManager()
+
+    tracemalloc.start()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        soak(manager, args.cycles // args.rounds)
+        current, _ = tracemalloc.get_traced_memory()
+        samples.append({"traced_bytes": current, **manager.stats()})
+
+    print(json.dumps({
+        "cycles": args.cycles,
+        "seconds": round(time.perf_counter() - started, 2),
+        "samples": samples,
+    }, indent=2))
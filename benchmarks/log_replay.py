@@ -0,0 +1,209 @@
+import argparse
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.common import latency_summary
+from benchmarks.log_workload import parse_logs, read_workload, write_workload
+from benchmarks.load_test import BOOKING_ID, ControllerTarget, HttpTarget, outcome, start_api
+
+
+def parse_speed(value):
+    """
+    Parse the replay speed: "original", "max" or a factor such as 2 (twice as fast).
+
+    Returns:
+        float | None: The time scaling factor, None for max speed.
+    """
+    if value == "max":
+        return None
+    if value == "original":
+        return 1.0
+    speed = float(value)
+    if speed <= 0:
+        raise ValueError("speed must be positive")
+    return speed
+
+
+def execute(target, event, booking_id=None):
+    """
+    Send one workload event to a target.
+
+    Args:
+        target (ControllerTarget | HttpTarget): What the event is sent to.
+        event (dict): The workload event.
+        booking_id (str, optional): The booking the event refers to in this replay, for updates and cancels.
+
+    Returns:
+        The target's result.
+    """
+    operation = event["op"]
+    if operation == "book":
+        return target.book(event["hall_id"], event["start_time"], event["end_time"], event["capacity"])
+    if operation == "fetch":
+        return target.fetch(event["start_time"], event["end_time"], event["capacity"])
+    if operation == "update":
+        return target.update(booking_id, event["start_time"], event["end_time"], event.get("capacity", 1))
+    if operation == "cancel":
+        return target.cancel(booking_id)
+    return target.fetch_bookings(event["start_date"], event["end_date"])
+
+
+def replay(target, events, speed=None, parallelism=8) -> dict:
+    """
+    Replay workload events against a target.
+
+    Events are issued in log order, paced by their offsets divided by speed or as fast as the
+    workers take them. Updates and cancels of bookings created earlier in the workload are
+    sent for the booking created by this replay, waiting for it to be created first.
+
+    Args:
+        target (ControllerTarget | HttpTarget): What the events are sent to.
+        events (list[dict]): The workload events.
+        speed (float, optional): Time scaling factor, 1 replays at the original pace. Default None replays at max speed.
+        parallelism (int, optional): Number of requests in flight at once. Default is 8.
+
+    Returns:
+        dict: Wall clock duration, throughput and the (operation, outcome, seconds) samples.
+    """
+    # original booking id -> future of the replayed booking, resolving to its new id
+    created = {}
+    capacities = {}
+    samples = []
+    samples_lock = threading.Lock()
+
+    def run_event(event):
+        booking_id = event.get("booking_id")
+        if event["op"] in ("update", "cancel"):
+            future = created.get(booking_id)
+            if future is not None:
+                booking_id = future.result() or booking_id
+            event = {**event, "capacity": capacities.get(event.get("booking_id"), 1)}
+        started = time.perf_counter()
+        try:
+            result = execute(target, event, booking_id)
+            result_outcome = outcome(event["op"], result)
+        except Exception:
+            result, result_outcome = None, "error"
+        elapsed = time.perf_counter() - started
+        with samples_lock:
+            samples.append((event["op"], result_outcome, elapsed))
+        if event["op"] == "book" and isinstance(result, str):
+            match = BOOKING_ID.search(result)
+            return match.group(1) if match else None
+        return None
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        for event in events:
+            if speed is not None:
+                delay = started + event["t"] / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            future = executor.submit(run_event, event)
+            if event["op"] == "book" and "booking_id" in event:
+                created[event["booking_id"]] = future
+                capacities[event["booking_id"]] = event["capacity"]
+    elapsed = time.monotonic() - started
+    return {
+        "events": len(samples),
+        "seconds": round(elapsed, 3),
+        "ops_per_second": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "samples": samples,
+    }
+
+
+def compare(events, samples, baseline=None) -> dict:
+    """
+    Compare the outcomes and latencies recorded in the log with those of a replay.
+
+    Args:
+        events (list[dict]): The workload events, with the "recorded" results parsed from the log.
+        samples (list[tuple]): The (operation, outcome, seconds) samples of the replay.
+        baseline (dict, optional): A previous replay report, its latencies are compared as well.
+
+    Returns:
+        dict: Per operation: the recorded and replayed outcome counts and latency percentiles,
+            and the change of the replayed percentiles against the baseline.
+    """
+    recorded = defaultdict(list)
+    recorded_outcomes = defaultdict(Counter)
+    for event in events:
+        if "recorded" in event:
+            recorded[event["op"]].append(event["recorded"]["latency_ms"] / 1000)
+            recorded_outcomes[event["op"]][event["recorded"]["outcome"]] += 1
+    replayed = defaultdict(list)
+    replayed_outcomes = defaultdict(Counter)
+    for operation, result, seconds in samples:
+        replayed[operation].append(seconds)
+        replayed_outcomes[operation][result] += 1
+
+    report = {}
+    for operation in sorted(replayed):
+        report[operation] = {
+            "count": len(replayed[operation]),
+            "recorded": {"matched": len(recorded[operation]), "outcomes": dict(recorded_outcomes[operation]),
+                         **latency_summary(recorded[operation])},
+            "replayed": {"outcomes": dict(replayed_outcomes[operation]), **latency_summary(replayed[operation])},
+        }
+        previous = (baseline or {}).get("by_operation", {}).get(operation)
+        if previous:
+            report[operation]["vs_baseline"] = {
+                key: round(report[operation]["replayed"][key] - previous["replayed"][key], 3)
+                for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms")
+            }
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Turn booking_controller.log into a workload and replay it")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parse_command = commands.add_parser("parse", help="parse log files into a workload file")
+    parse_command.add_argument("logs", nargs="+", help="booking_controller.log files, oldest first")
+    parse_command.add_argument("--out", default="workload.jsonl")
+    parse_command.add_argument("--max-gap", type=float, default=1.0, help="longest pause kept between two requests, in seconds")
+
+    replay_command = commands.add_parser("replay", help="replay a workload file and compare it with the log")
+    replay_command.add_argument("workload")
+    replay_command.add_argument("--target", choices=("controller", "api"), default="controller")
+    replay_command.add_argument("--url", help="base URL of a running API, by default one is started in this process")
+    replay_command.add_argument("--port", type=int, default=8089)
+    replay_command.add_argument("--speed", default="max", help="original, max or a speed-up factor such as 10")
+    replay_command.add_argument("--parallelism", type=int, default=8)
+    replay_command.add_argument("--baseline", help="report of a previous replay to compare latencies with")
+    replay_command.add_argument("--keep-data", action="store_true", help="do not clear the benchmark bookings first")
+    args = parser.parse_args()
+
+    if args.command == "parse":
+        events = parse_logs(args.logs, args.max_gap)
+        write_workload(events, args.out)
+        print(json.dumps({"events": len(events), "operations": Counter(event["op"] for event in events),
+                          "duration_seconds": events[-1]["t"] if events else 0, "out": args.out}, indent=2))
+    else:
+        from controller.booking_controller import BookingController
+
+        events = read_workload(args.workload)
+        if args.target == "controller":
+            target = ControllerTarget(BookingController())
+        elif args.url:
+            target = HttpTarget(args.url)
+        else:
+            target = HttpTarget(start_api(args.port, args.parallelism + 2), BookingController())
+        if not args.keep_data:
+            target.reset()
+
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        result = replay(target, events, parse_speed(args.speed), args.parallelism)
+        samples = result.pop("samples")
+        report = {"workload": args.workload, "target": target.name, "speed": args.speed,
+                  "parallelism": args.parallelism, **result, "by_operation": compare(events, samples, baseline)}
+        if args.target == "api" and not args.url:
+            import cherrypy
+            cherrypy.engine.exit()
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,195 @@
+import json
+import re
+from collections import deque
+from datetime import datetime
+
+
+LINE = re.compile(r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) - (\w+) - (.*)$")
+
+# request lines of booking_controller.log, one workload event each
+REQUESTS = {
+    "book": re.compile(r"^Received booking request: Hall (\S+), Start: (\S+), End: ([^,\s]+)(?:, capacity: (\d+))?"),
+    "fetch": re.compile(r"^Received fetch available hall request: Start: (\S+), End: ([^,\s]+)"),
+    "update": re.compile(r"^Received update request: Booking ID: (.*?), New Start: (\S+), New End: ([^,\s]+)"),
+    "cancel": re.compile(r"^Received cancellation request: Booking ID: ?(.*)$"),
+    "fetch_bookings": re.compile(r"^Received fetch bookings request: Start: (\S+), End: ([^,\s]+)"),
+}
+
+# result lines, matched back to the oldest pending request they belong to
+BOOKED = re.compile(r"^Booking successful for hall (\S+)\. Booking ID: (\w+)")
+BOOK_CONFLICT = re.compile(r"^Booking Unsuccessful for hall (\S+)\.")
+BOOK_LOCK_TIMEOUT = re.compile(r"^(?:Book: Lock aquire failed!|Timeout! Lock aquired failed,) Hall (\S+), Start: (\S+), End: ([^,\s]+)")
+BOOK_ERROR = re.compile(r"^Book hall failed! Hall (\S+),")
+UPDATE_RESULTS = (
+    (re.compile(r"^Update success, Booking ID: (\w+)"), "success"),
+    (re.compile(r"^Update failed, slot already booked: Booking ID: (\w+)"), "conflict"),
+    (re.compile(r"^Update: Lock aquire failed, Booking ID: (\w+)"), "lock_timeout"),
+    (re.compile(r"^Update: too many concurrent writes, Booking ID: (\w+)"), "lock_timeout"),
+    (re.compile(r"^Update failed! Booking ID: (\w+)"), "error"),
+)
+FETCH_BOOKINGS_RESULTS = (
+    (re.compile(r"^Fetch bookings success: Start: (\S+), End: ([^,\s]+)"), "success"),
+    (re.compile(r"^Fetch bookings failed,\s+Start: (\S+), End: ([^,\s:]+)"), "error"),
+)
+
+
+def parse_timestamp(value) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S,%f")
+
+
+class LogParser:
+    """
+    Turn booking_controller.log lines into workload events.
+
+    Every request line becomes an event with its offset from the first request. When a later
+    line reports the result of a request, its outcome and the time between both lines are
+    recorded on the event: bookings are matched per hall in arrival order, updates by booking
+    ID and fetch_bookings by date range. Fetch available and cancel requests log no result.
+    Requests without a result line within match_window seconds are left unmatched. Idle gaps
+    longer than max_gap seconds, e.g. between two test sessions, are shortened to max_gap so
+    replaying at original speed does not sleep for days.
+    """
+
+    def __init__(self, max_gap=1.0, match_window=30.0):
+        """
+        Args:
+            max_gap (float, optional): Longest pause kept between two requests, in seconds. Default is 1.
+            match_window (float, optional): Longest time between a request and its result line, in seconds. Default is 30.
+        """
+        self.max_gap = max_gap
+        self.match_window = match_window
+        self.events = []
+        self.offset = 0.0
+        self.last_request = None
+        self.pending_books = {}
+        self.pending_updates = {}
+        self.pending_fetch_bookings = {}
+
+
+    def _pending(self, table, key) -> deque:
+        return table.setdefault(key, deque())
+
+
+    def _record(self, table, key, outcome, at, booking_id=None) -> None:
+        """
+        Attach an outcome to the oldest pending request of a key.
+        """
+        queue = table.get(key)
+        # requests whose result was never logged, e.g. rejected by validation
+        while queue and (at - queue[0][1]).total_seconds() > self.match_window:
+            queue.popleft()
+        if not queue:
+            return
+        event, requested_at = queue.popleft()
+        event["recorded"] = {"outcome": outcome, "latency_ms": round((at - requested_at).total_seconds() * 1000, 3)}
+        if booking_id is not None:
+            event["booking_id"] = booking_id
+
+
+    def _request(self, operation, match, at) -> None:
+        if self.last_request is not None:
+            self.offset += min(max((at - self.last_request).total_seconds(), 0.0), self.max_gap)
+        self.last_request = at
+        event = {"t": round(self.offset, 6), "op": operation}
+
+        if operation == "book":
+            hall_id, start_time, end_time, capacity = match.groups()
+            event.update(hall_id=hall_id, start_time=start_time, end_time=end_time, capacity=int(capacity or 1))
+            self._pending(self.pending_books, hall_id).append((event, at))
+        elif operation == "fetch":
+            event.update(start_time=match.group(1), end_time=match.group(2), capacity=0)
+        elif operation == "update":
+            booking_id, start_time, end_time = match.groups()
+            event.update(booking_id=booking_id, start_time=start_time, end_time=end_time)
+            self._pending(self.pending_updates, booking_id).append((event, at))
+        elif operation == "cancel":
+            event.update(booking_id=match.group(1))
+        else:
+            event.update(start_date=match.group(1), end_date=match.group(2))
+            self._pending(self.pending_fetch_bookings, match.groups()).append((event, at))
+        self.events.append(event)
+
+
+    def _result(self, message, at) -> None:
+        match = BOOKED.match(message)
+        if match:
+            self._record(self.pending_books, match.group(1), "success", at, booking_id=match.group(2))
+            return
+        match = BOOK_CONFLICT.match(message)
+        if match:
+            self._record(self.pending_books, match.group(1), "conflict", at)
+            return
+        match = BOOK_LOCK_TIMEOUT.match(message)
+        if match:
+            self._record(self.pending_books, match.group(1), "lock_timeout", at)
+            return
+        match = BOOK_ERROR.match(message)
+        if match:
+            self._record(self.pending_books, match.group(1), "error", at)
+            return
+        for pattern, outcome in UPDATE_RESULTS:
+            match = pattern.match(message)
+            if match:
+                self._record(self.pending_updates, match.group(1), outcome, at)
+                return
+        for pattern, outcome in FETCH_BOOKINGS_RESULTS:
+            match = pattern.match(message)
+            if match:
+                self._record(self.pending_fetch_bookings, match.groups(), outcome, at)
+                return
+
+
+    def feed(self, line) -> None:
+        """
+        Parse one log line, lines of other formats are ignored.
+
+        Args:
+            line (str): A line of booking_controller.log.
+        """
+        match = LINE.match(line.rstrip("\n"))
+        if not match:
+            return
+        at = parse_timestamp(match.group(1))
+        message = match.group(3)
+        for operation, pattern in REQUESTS.items():
+            request = pattern.match(message)
+            if request:
+                self._request(operation, request, at)
+                return
+        self._result(message, at)
+
+
+def parse_logs(paths, max_gap=1.0) -> list[dict]:
+    """
+    Parse log files, in the given order, into workload events.
+
+    Args:
+        paths (list[str]): booking_controller.log files, oldest first.
+        max_gap (float, optional): Longest pause kept between two requests, in seconds. Default is 1.
+
+    Returns:
+        list[dict]: The events ordered by their offset "t" in seconds.
+    """
+    parser = LogParser(max_gap)
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as log_file:
+            for line in log_file:
+                parser.feed(line)
+    return parser.events
+
+
+def write_workload(events, path) -> None:
+    """
+    Write workload events as JSON lines.
+    """
+    with open(path, "w") as workload_file:
+        for event in events:
+            workload_file.write(json.dumps(event) + "\n")
+
+
+def read_workload(path) -> list[dict]:
+    """
+    Read workload events written by write_workload.
+    """
+    with open(path) as workload_file:
+        return [json.loads(line) for line in workload_file if line.strip()]
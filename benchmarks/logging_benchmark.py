@@ -0,0 +1,99 @@
+import argparse
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from benchmarks.common import latency_summary, use_benchmark_database
+
+use_benchmark_database()
+from controller.booking_controller import BookingController
+from utils.logger import SamplingFilter, shutdown_logging
+
+
+BASE_TIME = datetime(2032, 1, 1, 6)
+LOGGERS = ("booking_controller.log", "lock_manager.log")
+
+# level and hot path sample rate of every configuration
+CONFIGURATIONS = {
+    "off": (logging.ERROR, 1.0),
+    "on": (logging.INFO, 1.0),
+    "sampled": (logging.INFO, 0.01),
+}
+
+
+def configure_logging(level, sample_rate) -> None:
+    """
+    Reconfigure the controller and lock manager loggers in place.
+
+    Args:
+        level (int): The logging level.
+        sample_rate (float): Fraction of hot path INFO records kept.
+    """
+    for name in LOGGERS:
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        for handler in logger.handlers:
+            for log_filter in handler.filters:
+                if isinstance(log_filter, SamplingFilter):
+                    log_filter.rate = sample_rate
+
+
+def run(controller, configuration, bookings, threads) -> dict:
+    """
+    Benchmark book_hall throughput under one logging configuration. Every call books a distinct
+    slot, so the numbers measure the write path and not conflict handling.
+
+    Args:
+        controller (BookingController): The controller under test.
+        configuration (str): A key of CONFIGURATIONS.
+        bookings (int): Number of book_hall calls.
+        threads (int): Number of threads issuing them.
+
+    Returns:
+        dict: Throughput and latency percentiles.
+    """
+    configure_logging(*CONFIGURATIONS[configuration])
+    controller.delete_all_bookings()
+    latencies = []
+    results_lock = threading.Lock()
+
+    def worker(offset):
+        local = []
+        for i in range(offset, bookings, threads):
+            start = BASE_TIME + timedelta(hours=i)
+            started = time.perf_counter()
+            controller.book_hall("A", start.isoformat(), (start + timedelta(hours=1)).isoformat(), 10)
+            local.append(time.perf_counter() - started)
+        with results_lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(offset,)) for offset in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "logging": configuration,
+        "threads": threads,
+        "calls": len(latencies),
+        "bookings_per_second": round(len(latencies) / elapsed, 1),
+        **latency_summary(latencies),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare book_hall throughput with logging off, on and sampled")
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--threads", default="1,16")
+    args = parser.parse_args()
+
+    controller = BookingController()
+    results = [run(controller, configuration, args.bookings, int(threads))
+               for threads in args.threads.split(",") for configuration in CONFIGURATIONS]
+    controller.delete_all_bookings()
+    shutdown_logging()
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,42 @@
+import argparse
+import json
+import logging
+from datetime import datetime, timedelta
+from benchmarks.common import timed, use_benchmark_database
+
+use_benchmark_database()
+from controller.booking_controller import BookingController
+
+
+BASE_TIME = datetime(2033, 1, 3, 10)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare book_recurring against one book_hall per occurrence")
+    parser.add_argument("--occurrences", type=int, default=52)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger("booking_controller.log").setLevel(logging.ERROR)
+    logging.getLogger("lock_manager.log").setLevel(logging.ERROR)
+    controller = BookingController()
+    controller.delete_all_bookings()
+
+    runs = []
+    for run in range(args.repeat):
+        # every run books weekly series on its own hours, so nothing conflicts
+        first = BASE_TIME + timedelta(hours=run * 3)
+        looped = [first + timedelta(weeks=week) for week in range(args.occurrences)]
+        series = first + timedelta(hours=1)
+        runs.append({
+            "single_book_hall_ms": timed(lambda: controller.book_hall("A", (first - timedelta(days=1)).isoformat(),
+                                                                      (first - timedelta(days=1, minutes=-30)).isoformat(), 10)),
+            "book_hall_loop_ms": timed(lambda: [controller.book_hall("A", start.isoformat(), (start + timedelta(minutes=30)).isoformat(), 10)
+                                                for start in looped]),
+            "book_recurring_ms": timed(lambda: controller.book_recurring("A", series.isoformat(), (series + timedelta(minutes=30)).isoformat(), 10,
+                                                                         {"freq": "weekly", "count": args.occurrences})),
+            "book_recurring_atomic_ms": timed(lambda: controller.book_recurring("B", series.isoformat(), (series + timedelta(minutes=30)).isoformat(), 10,
+                                                                                {"freq": "weekly", "count": args.occurrences}, atomic=True)),
+        })
+    controller.delete_all_bookings()
+    print(json.dumps({"occurrences": args.occurrences, "runs": runs}, indent=2))
@@ -0,0 +1,87 @@
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from benchmarks.common import latency_summary, use_benchmark_database
+
+use_benchmark_database()
+# every read has to reach Mongo to show the queries saved
+os.environ.setdefault("BOOKING_CACHE", "off")
+os.environ.setdefault("FETCH_CACHE", "off")
+from database.db_module import BookingDatabase
+from controller.booking_controller import BookingController
+from benchmarks.fetch_available_benchmark import seed
+from utils.metrics import Metrics
+from utils.single_flight import SingleFlight
+
+
+READ_COMMANDS = ("find", "distinct", "getMore")
+
+
+def read_commands() -> int:
+    """
+    Count the Mongo read commands sent so far, from the command timer histograms.
+    """
+    histograms = Metrics().snapshot()["histograms"]
+    return sum(count for (name, labels), (count, _) in histograms.items()
+               if name == "mongo_command_duration_seconds" and dict(labels).get("command") in READ_COMMANDS)
+
+
+def burst(controller, operation, concurrency, rounds) -> dict:
+    """
+    Send rounds of identical concurrent reads, released together by a barrier.
+
+    Returns:
+        dict: Requests, Mongo read commands per request and latency percentiles.
+    """
+    barrier = threading.Barrier(concurrency)
+    latencies = []
+    guard = threading.Lock()
+
+    def worker():
+        for step in range(rounds):
+            barrier.wait()
+            started = time.perf_counter()
+            operation(step)
+            elapsed = time.perf_counter() - started
+            with guard:
+                latencies.append(elapsed)
+
+    commands = read_commands()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    queries = read_commands() - commands
+    return {"concurrency": concurrency, "requests": len(latencies), "db_queries": queries,
+            "db_queries_per_request": round(queries / len(latencies), 3), **latency_summary(latencies)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure how coalescing identical concurrent reads reduces Mongo load")
+    parser.add_argument("--bookings", type=int, default=100000)
+    parser.add_argument("--concurrency", default="1,16,128")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the bookings already in the benchmark database")
+    args = parser.parse_args()
+
+    logging.getLogger("booking_controller.log").setLevel(logging.ERROR)
+    if not args.skip_seed:
+        seed(BookingDatabase(), args.bookings)
+    controller = BookingController()
+    operations = {
+        # a new window every round, so only the requests of one round are identical
+        "fetch_available": lambda step: controller.fetch_available_halls(f"2030-03-{step % 28 + 1:02d}T10:00:00",
+                                                                          f"2030-03-{step % 28 + 1:02d}T12:00:00", 0),
+        "fetch_bookings": lambda step: controller.fetch_bookings(f"2030-04-{step % 28 + 1:02d}", f"2030-04-{step % 28 + 1:02d}"),
+    }
+
+    report = {}
+    for mode, single_flight in (("separate", None), ("coalesced", SingleFlight())):
+        controller.single_flight = single_flight
+        report[mode] = {name: [burst(controller, operation, int(concurrency), args.rounds) for concurrency in args.concurrency.split(",")]
+                        for name, operation in operations.items()}
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,88 @@
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from benchmarks.common import latency_summary, use_benchmark_database
+
+use_benchmark_database()
+from database.db_module import BookingDatabase
+
+
+BASE_TIME = datetime(2030, 1, 1)
+
+
+def seed(collection, count, as_string, batch_size=10000) -> None:
+    """
+    Fill a collection with the same pseudo-random bookings, storing times as ISO strings or datetimes.
+
+    Args:
+        collection (Collection): The collection to fill, emptied first.
+        count (int): Number of bookings.
+        as_string (bool): Store times as ISO strings (the old format) instead of datetimes.
+        batch_size (int, optional): Documents per insert_many call. Default is 10000.
+    """
+    collection.drop()
+    for name, keys in BookingDatabase.BOOKING_INDEXES.items():
+        collection.create_index(keys, name=name)
+
+    rng = random.Random(42)
+    batch = []
+    for _ in range(count):
+        start = BASE_TIME + timedelta(minutes=15 * rng.randrange(3650 * 96))
+        end = start + timedelta(minutes=15 * rng.randint(1, 16))
+        if as_string:
+            start, end = start.isoformat(), end.isoformat()
+        batch.append({"hall_id": rng.choice("ABCDEF"), "start_time": start, "end_time": end, "seats_booked": 10})
+        if len(batch) == batch_size:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+
+
+def measure(collection, as_string, queries) -> dict:
+    """
+    Report index sizes and the latency of the fetch_available_halls overlap query on a collection.
+
+    Args:
+        collection (Collection): The seeded collection.
+        as_string (bool): Whether the collection stores ISO strings.
+        queries (int): Number of random query windows.
+
+    Returns:
+        dict: Index sizes in bytes and query latency percentiles.
+    """
+    stats = collection.database.command("collStats", collection.name)
+    rng = random.Random(7)
+    latencies = []
+    for _ in range(queries):
+        start = BASE_TIME + timedelta(hours=rng.randrange(3650 * 24))
+        end = start + timedelta(hours=2)
+        if as_string:
+            start, end = start.isoformat(), end.isoformat()
+        query = {"$and": [{"start_time": {"$lt": end}}, {"end_time": {"$gt": start}}]}
+        started = time.perf_counter()
+        collection.distinct("hall_id", query)
+        latencies.append(time.perf_counter() - started)
+    return {
+        "format": "iso string" if as_string else "datetime",
+        "total_index_bytes": stats["totalIndexSize"],
+        "index_bytes": stats["indexSizes"],
+        **latency_summary(latencies),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare ISO string and datetime booking times: index size and range query latency")
+    parser.add_argument("--bookings", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    db = BookingDatabase().db
+    results = []
+    for as_string, name in ((True, "bookings_iso_times"), (False, "bookings_datetime_times")):
+        seed(db[name], args.bookings, as_string)
+        results.append(measure(db[name], as_string, args.queries))
+        db[name].drop()
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,105 @@
+import argparse
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from benchmarks.common import latency_summary, use_benchmark_database
+
+use_benchmark_database()
+from controller.booking_controller import BookingController
+from models.booking import to_datetime
+
+
+BASE_TIME = datetime(2034, 1, 1, 8)
+
+
+def legacy_update_booking(controller, booking_id, new_start_time, new_end_time, new_capacity) -> str:
+    """
+    The previous locked update: read the booking, lock both slots one after the other (the
+    overlapping case with the wrong min(old_end, new_end) window), query for conflicts, then write.
+    """
+    new_start_time, new_end_time = to_datetime(new_start_time), to_datetime(new_end_time)
+    booking = controller.db.find_one({'_id': ObjectId(booking_id)})
+    if not booking:
+        return f"Booking with ID {booking_id} not found."
+    hall_id = booking['hall_id']
+    old_start_time, old_end_time = booking['start_time'], booking['end_time']
+    lock = controller.lock_service
+    lock_conflict = not (new_end_time < old_start_time or new_start_time > old_end_time)
+    if lock_conflict:
+        ranges = [(min(old_start_time, new_start_time), min(old_end_time, new_end_time))]
+        acquired = lock.acquire_lock(hall_id, *ranges[0])
+    else:
+        ranges = [(old_start_time, old_end_time), (new_start_time, new_end_time)]
+        acquired = lock.acquire_lock(hall_id, *ranges[0]) and lock.acquire_lock(hall_id, *ranges[1])
+    if not acquired:
+        return "Could not acquire lock for the given time slot"
+    try:
+        if controller.db.find_one(controller._conflict_query(hall_id, new_start_time, new_end_time, ObjectId(booking_id))):
+            return "The new time slot is not available for the selected hall."
+        update_query = {'$set': {'start_time': new_start_time, 'end_time': new_end_time, 'seats_booked': new_capacity}}
+        controller.db.update_one({'_id': ObjectId(booking_id)}, update_query)
+        controller._on_updated(booking, new_start_time, new_end_time)
+        return f"Booking with ID {booking_id} has been updated successfully."
+    finally:
+        for start_time, end_time in ranges:
+            lock.release_lock(hall_id, start_time, end_time)
+
+
+def run(update, controller, threads, updates) -> dict:
+    """
+    Let every thread move its own booking back and forth by 15 minutes in one hall.
+
+    Bookings are 30 minutes long and 40 minutes apart, so the lock windows of neighbouring
+    updates overlap and some moves conflict with a neighbour.
+
+    Returns:
+        dict: Throughput, latency percentiles and result counts.
+    """
+    controller.delete_all_bookings()
+    slots = [BASE_TIME + timedelta(minutes=40 * i) for i in range(threads)]
+    booking_ids = [controller.book_hall("A", start.isoformat(), (start + timedelta(minutes=30)).isoformat(), 10)[-24:] for start in slots]
+    latencies, outcomes = [], Counter()
+    guard = threading.Lock()
+
+    def worker(booking_id, start):
+        for step in range(updates):
+            shifted = start + timedelta(minutes=15 * ((step + 1) % 2))
+            started = time.perf_counter()
+            result = update(controller, booking_id, shifted.isoformat(), (shifted + timedelta(minutes=30)).isoformat(), 10)
+            elapsed = time.perf_counter() - started
+            outcome = "success" if "successful" in result else "conflict" if "not available" in result else "lock_timeout" if "lock" in result else "other"
+            with guard:
+                latencies.append(elapsed)
+                outcomes[outcome] += 1
+
+    workers = [threading.Thread(target=worker, args=(booking_id, start)) for booking_id, start in zip(booking_ids, slots)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {"threads": threads, "updates": len(latencies), "throughput_per_s": round(len(latencies) / elapsed, 1),
+            **latency_summary(latencies), "outcomes": dict(outcomes)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure update_booking latency under contention, before and after the guarded update")
+    parser.add_argument("--threads", default="1,8,32")
+    parser.add_argument("--updates", type=int, default=200, help="updates per thread")
+    args = parser.parse_args()
+
+    logging.getLogger("booking_controller.log").setLevel(logging.ERROR)
+    logging.getLogger("lock_manager.log").setLevel(logging.ERROR)
+    controller = BookingController()
+
+    report = {"legacy": [], "current": []}
+    for threads in [int(value) for value in args.threads.split(",")]:
+        report["legacy"].append(run(legacy_update_booking, controller, threads, args.updates))
+        report["current"].append(run(lambda controller, *update: controller.update_booking(*update), controller, threads, args.updates))
+    controller.delete_all_bookings()
+    print(json.dumps(report, indent=2))
@@ -1,11 +1,107 @@
 from database.db_module import BookingDatabase
-from models.booking import Booking
-from utils.logger import setup_logger
+from database.migrate_times import migrate
+from models.booking import Booking, to_datetime, to_iso
+from models.recurrence import expand
+from utils.logger import setup_logger, HOT_PATH
 from utils.lock_manager import LockManager
-from datetime import datetime
-from models.halls import halls
+from utils.booking_cache import BookingCache
+from utils.hall_registry import HallRegistry
+from utils.metrics import Metrics
+from utils.free_slots import earliest_free_slots
+from utils.occupancy import OccupancyCalendar
+from utils.response_cache import ResponseCache, MISS
+from utils.single_flight import SingleFlight
+from utils.idempotency import IdempotencyStore
+from datetime import date, datetime, timedelta
 from threading import Lock
 from bson.objectid import ObjectId
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+from bisect import bisect_left
+from collections import defaultdict
+from pymongo import ASCENDING
+from functools import wraps
+import base64
+import itertools
+import os
+import time
+
+
+# result message fragments and the outcome they are counted as, the first match wins
+OUTCOMES = (
+    ("successful", "success"),
+    ("already booked", "conflict"),
+    ("not available", "conflict"),
+    ("Could not acquire lock", "lock_timeout"),
+    ("concurrent bookings", "lock_timeout"),
+    ("Error:", "invalid"),
+    ("not found", "invalid"),
+    ("Not booked", "aborted"),
+)
+
+
+def booking_outcome(result) -> str:
+    """
+    Classify a result message of the controller.
+
+    Args:
+        result (str): The message returned for a single booking operation.
+
+    Returns:
+        str: success, conflict, lock_timeout, invalid, aborted or error.
+    """
+    for fragment, outcome in OUTCOMES:
+        if isinstance(result, str) and fragment in result:
+            return outcome
+    return "error"
+
+
+def counts_outcomes(operation):
+    """
+    Count the outcome of every call of a controller method, or of every item of a batch.
+
+    Args:
+        operation (str): The operation label of the counted series.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                result = method(self, *args, **kwargs)
+            except Exception:
+                self.metrics.inc("booking_outcomes_total", operation=operation, outcome="error")
+                raise
+            items = result["results"] if isinstance(result, dict) else result if isinstance(result, list) else [result]
+            for item in items:
+                self.metrics.inc("booking_outcomes_total", operation=operation, outcome=booking_outcome(item))
+            return result
+        return wrapper
+    return decorator
+
+
+# outcomes which do not change when the request is repeated, only these are stored for idempotency keys
+FINAL_OUTCOMES = ("success", "conflict", "invalid")
+
+
+def idempotent(operation):
+    """
+    Let a controller method take an idempotency_key: a repeated call with the same key and
+    arguments returns the result of the first call instead of running again.
+
+    Args:
+        operation (str): The operation the keys are used with, part of the request fingerprint.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, idempotency_key=None, **kwargs):
+            if idempotency_key is None or self.idempotency is None:
+                return method(self, *args, **kwargs)
+            fingerprint = repr((operation, args, sorted(kwargs.items())))
+            return self.idempotency.run(str(idempotency_key), operation, fingerprint,
+                                        lambda: method(self, *args, **kwargs),
+                                        lambda result: booking_outcome(result) in FINAL_OUTCOMES)
+        return wrapper
+    return decorator
 
 
 class BookingController:
@@ -13,6 +109,11 @@ class BookingController:
     _instance = None
     _lock = Lock()
 
+    # fields of a booking returned by fetch_bookings, nothing else is read from Mongo
+    BOOKING_FIELDS = {"hall_id": 1, "start_time": 1, "end_time": 1, "seats_booked": 1}
+    # keyset order of fetch_bookings, matched by the start_id_end index
+    BOOKING_ORDER = [("start_time", ASCENDING), ("_id", ASCENDING)]
+
     def __new__(cls, *args, **kwargs):
         """
         Ensure that only one instance of the BookingController class exists.
@@ -35,8 +136,335 @@ class BookingController:
         self.db = BookingDatabase()
         self.lock_service = LockManager()
         self.logger = setup_logger("booking_controller.log")
+        self.metrics = Metrics()
+        self.metrics.describe("booking_outcomes_total", "counter", "Results of booking operations by outcome.")
+        self.metrics.describe("fetch_cache_lookups_total", "counter", "fetch_available_halls response cache lookups by result.")
+        self.metrics.describe("coalesced_reads_total", "counter", "Reads served by an identical read already in flight.")
         if self.db is None:
             self.logger.error("Connection with DB Failed!")
+        else:
+            self._migrate_legacy_bookings()
+
+        # "locked" serialises overlapping writes with slot locks, "optimistic" skips the locks
+        # and detects concurrent writes through per-hall version documents instead
+        self.booking_mode = os.getenv("BOOKING_MODE", "locked")
+        if self.booking_mode not in ("locked", "optimistic"):
+            raise ValueError(f"Unknown booking mode: {self.booking_mode}")
+        self.optimistic_retries = int(os.getenv("OPTIMISTIC_RETRIES", "10"))
+
+        # the bookable halls, loaded from Mongo and kept ordered by capacity
+        self.hall_registry = HallRegistry(self.db, self.logger, float(os.getenv("HALL_REFRESH", "60")))
+        try:
+            self.hall_registry.reload()
+        except Exception as e:
+            # loaded again on first use
+            self.logger.error(f"Loading hall registry failed: {e}")
+
+        # in-memory copy of the stored bookings, used to reject conflicts and answer availability
+        # without a DB round-trip
+        self.booking_cache = None
+        if os.getenv("BOOKING_CACHE", "on") == "on":
+            self.booking_cache = BookingCache(self.db, self.logger, float(os.getenv("BOOKING_CACHE_REFRESH", "60")))
+            try:
+                self.booking_cache.reload()
+            except Exception as e:
+                # loaded again on first use
+                self.logger.error(f"Loading booking cache failed: {e}")
+
+        # recent fetch_available_halls responses, invalidated by every write to one of their halls
+        self.response_cache = None
+        if os.getenv("FETCH_CACHE", "on") == "on":
+            self.response_cache = ResponseCache(int(os.getenv("FETCH_CACHE_SIZE", "1024")), float(os.getenv("FETCH_CACHE_TTL", "5")))
+
+        # identical concurrent reads share one query; the write sequence is part of their key, so a
+        # read issued after a write never joins a query started before it
+        self.single_flight = SingleFlight() if os.getenv("SINGLE_FLIGHT", "on") == "on" else None
+        self.write_counter = itertools.count(1)
+        self.write_sequence = 0
+
+        # results of writes sent with an idempotency key, so a retried request is answered without
+        # taking locks or writing again
+        self.idempotency = None
+        if os.getenv("IDEMPOTENCY", "on") == "on":
+            self.idempotency = IdempotencyStore(self.db, self.logger, float(os.getenv("IDEMPOTENCY_TTL", "86400")),
+                                                int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000")))
+
+        # per-day slot occupancy of every hall for the calendar, days are loaded on first request
+        self.occupancy = OccupancyCalendar(self.db, self.logger, int(os.getenv("CALENDAR_SLOT_MINUTES", "5")),
+                                           float(os.getenv("CALENDAR_REFRESH", "60")), int(os.getenv("CALENDAR_CACHE_DAYS", "400")))
+        self.calendar_max_days = int(os.getenv("CALENDAR_MAX_DAYS", "31"))
+        # larger fetch_bookings pages are cut to this size, the cursor still leads to the rest
+        self.max_page_size = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+
+    def _migrate_legacy_bookings(self) -> None:
+        """
+        Convert bookings stored with ISO string times by older versions to BSON datetimes.
+
+        Conflict and overlap queries compare datetimes, which never match strings, so a booking
+        left unconverted could be double-booked. The conversion is guarded and idempotent, so
+        processes starting together do not interfere.
+        """
+        try:
+            if not self.db.count_legacy_bookings():
+                return
+            summary = migrate(self.db)
+            self.logger.warning(f"Converted bookings with ISO string times to datetimes: {summary}")
+            remaining = self.db.count_legacy_bookings() - summary["invalid"]
+            if remaining > 0:
+                self.logger.error(f"{remaining} bookings still store ISO string times, run python -m database.migrate_times")
+        except Exception as e:
+            # converted by the next start, or by running database.migrate_times
+            self.logger.error(f"Converting legacy booking times failed: {e}")
+
+
+    def _cached_conflict(self, hall_id, start_time, end_time, exclude_id=None):
+        """
+        Ask the booking cache whether a hall has bookings overlapping a time range.
+
+        A conflict reported by the cache is confirmed in the database before a request is rejected
+        for it, as another process may have cancelled or moved the booking since the cache saw it.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the range.
+            end_time (datetime): The end of the range.
+            exclude_id (ObjectId, optional): A booking to ignore, e.g. the one being updated.
+
+        Returns:
+            bool: The cache's answer, or None if the cache is disabled, cannot answer or was wrong.
+        """
+        if self.booking_cache is None:
+            return None
+        conflict = self.booking_cache.has_conflict(hall_id, start_time, end_time, exclude_id)
+        if conflict and self.db.find_one(self._conflict_query(hall_id, start_time, end_time, exclude_id)) is None:
+            self._on_drift(hall_id)
+            return None
+        return conflict
+
+
+    def _invalidate_responses(self, hall_id=None) -> None:
+        """
+        Stop serving cached responses depending on a hall, or on any hall. Called after every write,
+        once the booking cache and the occupancy maps have it: a read between the version bump and
+        those updates would cache a response without the write under the new version.
+        """
+        # reads started from here on use a new coalescing key, so they cannot join a read which
+        # may have seen the caches without this write
+        self.write_sequence = next(self.write_counter)
+        if self.response_cache is not None:
+            self.response_cache.bump(hall_id)
+
+
+    def _coalesced(self, operation, key, function):
+        """
+        Run a read, or share the result of the identical read already in flight.
+
+        Args:
+            operation (str): The read, e.g. "fetch_available".
+            key (tuple): Its parameters.
+            function (callable): Runs the read.
+
+        Returns:
+            The read's result, which may be shared with other callers and must not be modified.
+        """
+        if self.single_flight is None:
+            return function()
+        result, shared = self.single_flight.do((operation, self.write_sequence) + key, function)
+        if shared:
+            self.metrics.inc("coalesced_reads_total", operation=operation)
+        return result
+
+
+    def _on_drift(self, hall_id) -> None:
+        """
+        Called when the database reports a conflict the booking cache did not know about.
+        """
+        self.occupancy.invalidate()
+        if self.booking_cache is not None:
+            self.booking_cache.report_drift(hall_id)
+        self._invalidate_responses(hall_id)
+
+
+    def _on_booked(self, hall_id, start_time, end_time, booking_id) -> None:
+        """
+        Called after a booking has been stored.
+        """
+        self.occupancy.add(hall_id, start_time, end_time)
+        if self.booking_cache is not None:
+            self.booking_cache.add(hall_id, start_time, end_time, booking_id)
+        self._invalidate_responses(hall_id)
+
+
+    def _on_cancelled(self, booking) -> None:
+        """
+        Called after a booking has been deleted, with the deleted document.
+        """
+        self.occupancy.remove(booking['hall_id'], to_datetime(booking['start_time']), to_datetime(booking['end_time']))
+        if self.booking_cache is not None:
+            self.booking_cache.remove(booking['hall_id'], to_datetime(booking['start_time']),
+                                      to_datetime(booking['end_time']), booking['_id'])
+        self._invalidate_responses(booking['hall_id'])
+
+
+    def _on_updated(self, booking, new_start_time, new_end_time) -> None:
+        """
+        Called after a booking has been moved, with the document as it was before the update.
+        """
+        self.occupancy.move(booking['hall_id'], to_datetime(booking['start_time']), to_datetime(booking['end_time']),
+                            new_start_time, new_end_time)
+        if self.booking_cache is not None:
+            self.booking_cache.move(booking['hall_id'], to_datetime(booking['start_time']), to_datetime(booking['end_time']),
+                                    new_start_time, new_end_time, booking['_id'])
+        self._invalidate_responses(booking['hall_id'])
+
+
+    def _overlap_query(self, start_time, end_time) -> dict:
+        """
+        Build the query matching bookings of any hall which overlap the given time range.
+
+        Args:
+            start_time (datetime): The start of the range.
+            end_time (datetime): The end of the range.
+
+        Returns:
+            dict: The Mongo query.
+        """
+        return {
+            "$and": [
+                {"start_time": {"$lt": end_time}},
+                {"end_time": {"$gt": start_time}}
+            ]}
+
+
+    def _bookings_in_range_query(self, start_time, end_time, after=None) -> dict:
+        """
+        Build the query of fetch_bookings: bookings touching the range, without pending update claims.
+
+        Args:
+            start_time (datetime): The start of the range.
+            end_time (datetime): The end of the range.
+            after (tuple[datetime, ObjectId], optional): Keyset position, only bookings sorting
+                after this (start_time, _id) are matched.
+
+        Returns:
+            dict: The Mongo query.
+        """
+        query = {
+            "pending_update": {"$exists": False},
+            "$and": [
+                {"start_time": {"$lte": end_time}},
+                {"end_time": {"$gte": start_time}}
+            ]}
+        if after is not None:
+            after_start, after_id = after
+            query["$or"] = [
+                {"start_time": {"$gt": after_start}},
+                {"start_time": after_start, "_id": {"$gt": after_id}}
+            ]
+        return query
+
+
+    def _encode_cursor(self, booking) -> str:
+        """
+        Encode the keyset position after a booking as an opaque cursor string.
+        """
+        position = f"{to_iso(booking['start_time'])}|{booking['_id']}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+    def _decode_cursor(self, cursor) -> tuple:
+        """
+        Decode a cursor returned by fetch_bookings_page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        try:
+            start_time, booking_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return to_datetime(start_time), ObjectId(booking_id)
+        except Exception:
+            raise ValueError("invalid cursor")
+
+
+    def _conflict_query(self, hall_id, start_time, end_time, exclude_id=None) -> dict:
+        """
+        Build the query matching bookings of a hall which overlap the given time range.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the range.
+            end_time (datetime): The end of the range.
+            exclude_id (ObjectId, optional): A booking to leave out, e.g. the one being updated.
+
+        Returns:
+            dict: The Mongo query.
+        """
+        query = {"hall_id": hall_id, **self._overlap_query(start_time, end_time)}
+        if exclude_id is not None:
+            query["_id"] = {"$ne": exclude_id}
+        return query
+
+
+    def _spans_query(self, spans) -> dict:
+        """
+        Build the query matching bookings which overlap the time span given for their hall.
+
+        Args:
+            spans (dict): (start, end) of the span by hall ID.
+
+        Returns:
+            dict: The Mongo query, one branch per hall.
+        """
+        return {"$or": [{"hall_id": hall_id, **self._overlap_query(start_time, end_time)}
+                        for hall_id, (start_time, end_time) in spans.items()]}
+
+
+    def _halls_overlap_query(self, hall_ids, start_time, end_time) -> dict:
+        """
+        Build the query matching bookings of some halls which overlap the given time range.
+
+        Args:
+            hall_ids (list[str]): The IDs of the halls.
+            start_time (datetime): The start of the range.
+            end_time (datetime): The end of the range.
+
+        Returns:
+            dict: The Mongo query.
+        """
+        return {"hall_id": {"$in": hall_ids}, **self._overlap_query(start_time, end_time)}
+
+
+    def _insert_optimistic(self, hall_id, document, exclude_id=None):
+        """
+        Insert a booking document without slot locks.
+
+        The hall's version is read before checking for conflicts and bumped conditionally after the
+        insert. If the bump fails another write was committed on the hall in between, so the insert
+        is rolled back and the whole sequence retried against the new state. Removing a document can
+        never create a conflict, which keeps the rollback safe.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            document (dict): The document to insert, with hall_id, start_time and end_time set.
+            exclude_id (ObjectId, optional): A booking allowed to overlap, e.g. the one being updated.
+
+        Returns:
+            tuple[str, ObjectId]: ("inserted", id), ("conflict", None) or ("retries exhausted", None).
+        """
+        conflict_query = self._conflict_query(hall_id, document["start_time"], document["end_time"], exclude_id)
+        for _ in range(self.optimistic_retries):
+            version = self.db.get_hall_version(hall_id)
+            if self.db.find_one(conflict_query):
+                return "conflict", None
+
+            inserted_id = self.db.insert_one(dict(document)).inserted_id
+            if self.db.bump_hall_version(hall_id, version):
+                return "inserted", inserted_id
+
+            self.db.delete_one({"_id": inserted_id})
+            self.logger.info(f"Optimistic write on hall {hall_id} lost a race, retrying")
+        return "retries exhausted", None
 
 
     def verify_time_range(self, start, end) -> bool:  
@@ -65,6 +493,34 @@ class BookingController:
             raise Exception(f"date format invalid")
 
 
+    def _validate_booking(self, hall_id, start_time, end_time, capacity) -> str:
+        """
+        Check a booking request before any lock or write.
+
+        Args:
+            hall_id (str): The ID of the hall to be booked.
+            start_time (str): ISO 8601 formatted start time string.
+            end_time (str): ISO 8601 formatted end time string.
+            capacity (int): The number of seats to book.
+
+        Returns:
+            str: The error message to return, or None if the request is valid.
+
+        Raises:
+            Exception: If the date format is invalid.
+            KeyError: If the hall does not exist.
+        """
+        if not self.verify_time_range(start_time, end_time):
+            return "Error: End time must be after start time. Please try again."
+        
+        hall_capacity = self.hall_registry.capacity(hall_id)
+        if hall_capacity is None:
+            raise KeyError(hall_id)
+        if not hall_capacity >= capacity:
+            return "Error: This hall does not have required capacity"
+        return None
+
+
     def delete_all_bookings(self) -> str:
         """
         Delete all bookings from the database.
@@ -73,9 +529,13 @@ class BookingController:
             str: A message indicating how many bookings were deleted.
         """
         result = self.db.delete_database()
+        self.occupancy.invalidate()
+        self._invalidate_responses()
         return f"Deleted {result.deleted_count} bookings from the database."
     
 
+    @idempotent("book_hall")
+    @counts_outcomes("book_hall")
     def book_hall(self, hall_id, start_time, end_time, capacity) -> str:
         """
         Attempt to book a hall for the given time range. Handles concurrency using a lock.
@@ -88,14 +548,21 @@ class BookingController:
         Returns:
             str: A message indicating whether the booking was successful or an error occurred.
         """
-        self.logger.info(f"Received booking request: Hall {hall_id}, Start: {start_time}, End: {end_time}, capacity: {capacity}")
+        self.logger.info(f"Received booking request: Hall {hall_id}, Start: {start_time}, End: {end_time}, capacity: {capacity}", extra=HOT_PATH)
 
-        if not self.verify_time_range(start_time, end_time):
-            return "Error: End time must be after start time. Please try again."
-        
-        if not halls[hall_id].value >= capacity:
-            return "Error: This hall does not have required capacity"
+        error = self._validate_booking(hall_id, start_time, end_time, capacity)
+        if error:
+            return error
+
+        start_time, end_time = to_datetime(start_time), to_datetime(end_time)
+
+        cached_conflict = self._cached_conflict(hall_id, start_time, end_time)
+        if cached_conflict:
+            self.logger.info(f"Booking Unsuccessful for hall {hall_id}. Hall already booked!")
+            return "Hall already booked for this slot"
         
+        if self.booking_mode == "optimistic":
+            return self._book_hall_optimistic(hall_id, start_time, end_time, capacity, cached_conflict)
         
         if self.lock_service.acquire_lock(hall_id, start_time, end_time):
             try:
@@ -103,12 +570,7 @@ class BookingController:
                 booking = Booking(hall_id, start_time, end_time, capacity)
 
                 # query to search for conflicting bookings
-                search_query = {
-                    "hall_id": hall_id,
-                    "$and": [
-                        {"start_time": {"$lt": end_time}}, 
-                        {"end_time": {"$gt": start_time}}
-                    ]}
+                search_query = self._conflict_query(hall_id, start_time, end_time)
                 # query to insert Booking object in DB
                 update_query = {
                     "$setOnInsert": booking.__dict__
@@ -118,11 +580,14 @@ class BookingController:
 
                 if result.matched_count > 0:
                     self.logger.info(f"Booking Unsuccessful for hall {hall_id}. Hall already booked!")
+                    if cached_conflict is False:
+                        self._on_drift(hall_id)
                     return "Hall already booked for this slot"
                 else:
                     # booking successful
+                    self._on_booked(hall_id, start_time, end_time, result.upserted_id)
                     booking_id = str(result.upserted_id)
-                    self.logger.info(f"Booking successful for hall {hall_id}. Booking ID: {booking_id}")
+                    self.logger.info(f"Booking successful for hall {hall_id}. Booking ID: {booking_id}", extra=HOT_PATH)
 
                     return f"Booking successful for hall {hall_id}. Booking ID: {booking_id}"
                 
@@ -136,6 +601,345 @@ class BookingController:
             return "Could not acquire lock for the given time slot"
 
 
+    def _book_hall_optimistic(self, hall_id, start_time, end_time, capacity, cached_conflict=None) -> str:
+        """
+        Book a hall without taking a slot lock, relying on the hall's version document to detect
+        concurrent bookings.
+
+        Args:
+            hall_id (str): The ID of the hall to be booked.
+            start_time (datetime): The start of the booking.
+            end_time (datetime): The end of the booking.
+            capacity (int): The number of seats booked.
+            cached_conflict (bool, optional): What the booking cache answered for this slot.
+
+        Returns:
+            str: A message indicating whether the booking was successful or an error occurred.
+        """
+        booking = Booking(hall_id, start_time, end_time, capacity)
+        try:
+            outcome, booking_id = self._insert_optimistic(hall_id, booking.__dict__)
+        except Exception as e:
+            self.logger.error(f"Book hall failed! Hall {hall_id}, Start: {start_time}, End: {end_time}, Error: {e}")
+            return "Booking failed, please try again"
+
+        if outcome == "conflict":
+            self.logger.info(f"Booking Unsuccessful for hall {hall_id}. Hall already booked!")
+            if cached_conflict is False:
+                self._on_drift(hall_id)
+            return "Hall already booked for this slot"
+        if outcome == "retries exhausted":
+            self.logger.error(f"Book: too many concurrent writes! Hall {hall_id}, Start: {start_time}, End: {end_time}")
+            return "Could not book the hall due to concurrent bookings, please try again"
+
+        self._on_booked(hall_id, start_time, end_time, booking_id)
+        self.logger.info(f"Booking successful for hall {hall_id}. Booking ID: {booking_id}", extra=HOT_PATH)
+        return f"Booking successful for hall {hall_id}. Booking ID: {booking_id}"
+
+
+    @counts_outcomes("book_many")
+    def book_many(self, bookings, atomic=False, timeout=5) -> list[str]:
+        """
+        Book several halls with one lock pass, one conflict query and one bulk write.
+
+        Slot locks are taken in a canonical (hall, start, end) order under a single deadline so
+        concurrent batches cannot deadlock each other. In atomic mode nothing is stored unless
+        every booking can be; otherwise each booking succeeds or fails on its own, like calling
+        book_hall for each of them.
+
+        Args:
+            bookings (list[dict]): Items with 'hall_id', 'start_time', 'end_time' and 'capacity'.
+            atomic (bool, optional): All-or-nothing instead of best-effort. Default is False.
+            timeout (float, optional): Seconds to wait for all slot locks together. Default is 5.
+
+        Returns:
+            list[str]: One result message per requested booking, in request order.
+        """
+        self.logger.info(f"Received batch booking request: {len(bookings)} bookings, atomic: {atomic}")
+        return self._book_batch(bookings, atomic, timeout)
+
+
+    @counts_outcomes("book_recurring")
+    def book_recurring(self, hall_id, start_time, end_time, capacity, rule, atomic=False, timeout=5) -> dict:
+        """
+        Book a hall for every occurrence of a recurring slot, e.g. every Monday of a semester.
+
+        The series is expanded in memory and stored like a book_many batch: every occurrence is
+        checked against the stored bookings with a single range query for the hall, and the
+        free ones are inserted with a single bulk write.
+
+        Args:
+            hall_id (str): The ID of the hall to be booked.
+            start_time (str): ISO 8601 formatted start of the first occurrence.
+            end_time (str): ISO 8601 formatted end of the first occurrence.
+            capacity (int): The number of seats to book.
+            rule (dict | str): The recurrence, see models.recurrence.expand, e.g.
+                {"freq": "weekly", "byday": ["MO"], "until": "2024-12-20"} or "FREQ=DAILY;COUNT=5".
+            atomic (bool, optional): Book every occurrence or none of them. Default is False.
+            timeout (float, optional): Seconds to wait for all slot locks together. Default is 5.
+
+        Returns:
+            dict: 'occurrences' with the start_time and end_time of every occurrence in chronological
+                order and 'results' with one result message per occurrence.
+        """
+        self.logger.info(f"Received recurring booking request: Hall {hall_id}, Start: {start_time}, End: {end_time}, Rule: {rule}, atomic: {atomic}")
+        try:
+            occurrences = expand(start_time, end_time, rule)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.logger.error(f"Invalid recurrence: {rule}: {e}")
+            return {"occurrences": [], "results": [f"Error: Invalid recurrence: {e}"]}
+        occurrences = [{"start_time": start.isoformat(), "end_time": end.isoformat()} for start, end in occurrences]
+        bookings = [{"hall_id": hall_id, "capacity": capacity, **occurrence} for occurrence in occurrences]
+        return {"occurrences": occurrences, "results": self._book_batch(bookings, atomic, timeout)}
+
+
+    def _book_batch(self, bookings, atomic, timeout) -> list[str]:
+        """
+        Validate, check and store a batch of bookings, see book_many.
+        """
+        results = [None] * len(bookings)
+        items = []
+        for position, item in enumerate(bookings):
+            try:
+                error = self._validate_booking(item['hall_id'], item['start_time'], item['end_time'], item['capacity'])
+            except Exception:
+                error = "Error: Invalid Input"
+            if error:
+                results[position] = error
+            else:
+                items.append((position, Booking(item['hall_id'], item['start_time'], item['end_time'], item['capacity'])))
+
+        items = self._drop_batch_conflicts(items, results)
+        if atomic and not self._batch_can_continue(results):
+            return self._fail_batch(results)
+
+        if self.booking_mode == "optimistic":
+            self._write_batch_optimistic(items, results, atomic)
+        else:
+            self._write_batch_locked(items, results, atomic, timeout)
+
+        if atomic and not self._batch_can_continue(results):
+            return self._fail_batch(results)
+        return results
+
+
+    def _batch_can_continue(self, results) -> bool:
+        """
+        Check that no booking of a batch has failed so far.
+        """
+        return all(result is None or result.startswith("Booking successful") for result in results)
+
+
+    def _fail_batch(self, results) -> list[str]:
+        """
+        Turn every booking of an atomic batch which did not fail itself into a batch failure.
+        """
+        return [result if result and not result.startswith("Booking successful")
+                else "Not booked: another booking in the batch failed" for result in results]
+
+
+    def _drop_batch_conflicts(self, items, results) -> list[tuple]:
+        """
+        Reject bookings overlapping an earlier booking of the same batch or one the cache knows about.
+
+        Args:
+            items (list[tuple[int, Booking]]): Valid bookings with their request position.
+            results (list): Result messages, updated in place for rejected bookings.
+
+        Returns:
+            list[tuple[int, Booking]]: The remaining bookings in canonical (hall, start, end) order.
+        """
+        accepted = []
+        hall_end = {}
+        for position, booking in sorted(items, key=lambda item: (item[1].hall_id, item[1].start_time, item[1].end_time)):
+            previous_end = hall_end.get(booking.hall_id)
+            if (previous_end is not None and booking.start_time < previous_end) or \
+                    self._cached_conflict(booking.hall_id, booking.start_time, booking.end_time):
+                results[position] = "Hall already booked for this slot"
+                continue
+            accepted.append((position, booking))
+            hall_end[booking.hall_id] = max(booking.end_time, previous_end or booking.end_time)
+        return accepted
+
+
+    def _find_batch_conflicts(self, items) -> set:
+        """
+        Find the bookings of a batch which overlap stored bookings, with one query covering the
+        span of each hall's bookings and the exact checks done in memory.
+
+        Args:
+            items (list[tuple[int, Booking]]): Bookings with their request position.
+
+        Returns:
+            set: Request positions of the conflicting bookings.
+        """
+        by_hall = defaultdict(list)
+        for position, booking in items:
+            by_hall[booking.hall_id].append((position, booking))
+        if not by_hall:
+            return set()
+
+        query = self._spans_query({hall_id: (min(booking.start_time for _, booking in entries),
+                                             max(booking.end_time for _, booking in entries))
+                                   for hall_id, entries in by_hall.items()})
+        stored = defaultdict(list)
+        for existing in self.db.find(query, {"hall_id": 1, "start_time": 1, "end_time": 1}):
+            stored[existing['hall_id']].append((existing['start_time'], existing['end_time']))
+
+        conflicts = set()
+        for hall_id, entries in by_hall.items():
+            existing = sorted(stored[hall_id])
+            starts = [start for start, _ in existing]
+            # latest end among the stored bookings starting before each position
+            latest_ends = []
+            for _, end in existing:
+                latest_ends.append(max(end, latest_ends[-1]) if latest_ends else end)
+            for position, booking in entries:
+                candidates = bisect_left(starts, booking.end_time)
+                if candidates and latest_ends[candidates - 1] > booking.start_time:
+                    conflicts.add(position)
+        return conflicts
+
+
+    def _insert_batch(self, items, results) -> list[tuple]:
+        """
+        Insert bookings with a single unordered bulk write.
+
+        Args:
+            items (list[tuple[int, Booking]]): Bookings with their request position.
+            results (list): Result messages, updated in place for failed inserts.
+
+        Returns:
+            list[tuple[int, Booking, ObjectId]]: The inserted bookings with their new IDs.
+        """
+        documents = [dict(booking.__dict__, _id=ObjectId()) for _, booking in items]
+        failed = set()
+        if documents:
+            try:
+                self.db.bulk_write([InsertOne(document) for document in documents], ordered=False)
+            except BulkWriteError as e:
+                failed = {error['index'] for error in e.details.get('writeErrors', [])}
+                self.logger.error(f"Batch insert failed for {len(failed)} bookings: {e}")
+
+        inserted = []
+        for index, (position, booking) in enumerate(items):
+            if index in failed:
+                results[position] = "Booking failed, please try again"
+            else:
+                inserted.append((position, booking, documents[index]['_id']))
+        return inserted
+
+
+    def _commit_batch(self, inserted, results) -> None:
+        """
+        Report the stored bookings of a batch as successful and record them in the booking cache.
+        """
+        for position, booking, booking_id in inserted:
+            self._on_booked(booking.hall_id, booking.start_time, booking.end_time, booking_id)
+            results[position] = f"Booking successful for hall {booking.hall_id}. Booking ID: {booking_id}"
+        if inserted:
+            self.logger.info(f"Batch booking stored {len(inserted)} bookings")
+
+
+    def _write_batch_locked(self, items, results, atomic, timeout) -> None:
+        """
+        Lock the slots of the batch, all or none of them for an atomic batch, then check and insert them together.
+
+        Args:
+            items (list[tuple[int, Booking]]): Bookings in canonical order with their request position.
+            results (list): Result messages, filled in place.
+            atomic (bool): Store nothing unless every booking can be stored.
+            timeout (float): Seconds to wait for all slot locks together.
+        """
+        held = []
+        try:
+            if atomic:
+                # all slots or none, a batch holding some of its locks could only wait for the rest
+                if not self.lock_service.acquire_locks([(booking.hall_id, booking.start_time, booking.end_time) for _, booking in items], timeout):
+                    self.logger.error(f"Batch: Lock aquire failed! {len(items)} bookings")
+                    for position, _ in items:
+                        results[position] = "Could not acquire lock for the given time slot"
+                    return
+                held = list(items)
+            else:
+                deadline = time.monotonic() + timeout
+                for position, booking in items:
+                    remaining = max(0, deadline - time.monotonic())
+                    if self.lock_service.acquire_lock(booking.hall_id, booking.start_time, booking.end_time, timeout=remaining):
+                        held.append((position, booking))
+                    else:
+                        self.logger.error(f"Batch: Lock aquire failed! Hall {booking.hall_id}, Start: {booking.start_time}, End: {booking.end_time}")
+                        results[position] = "Could not acquire lock for the given time slot"
+
+            conflicts = self._find_batch_conflicts(held)
+            for position in conflicts:
+                results[position] = "Hall already booked for this slot"
+            if atomic and conflicts:
+                return
+
+            writable = [(position, booking) for position, booking in held if position not in conflicts]
+            inserted = self._insert_batch(writable, results)
+            if atomic and len(inserted) < len(writable):
+                self.db.delete_many({"_id": {"$in": [booking_id for _, _, booking_id in inserted]}})
+                return
+            self._commit_batch(inserted, results)
+        except Exception as e:
+            self.logger.error(f"Batch booking failed: {e}")
+            for position, _ in items:
+                if results[position] is None:
+                    results[position] = "Booking failed, please try again"
+        finally:
+            self.lock_service.release_locks([(booking.hall_id, booking.start_time, booking.end_time) for _, booking in held])
+
+
+    def _write_batch_optimistic(self, items, results, atomic) -> None:
+        """
+        Store a batch without slot locks, using the per-hall versions like _insert_optimistic:
+        versions are read before the conflict query and bumped after the bulk insert. The bookings
+        of a hall whose bump fails are deleted again and retried (every booking in atomic mode).
+
+        Args:
+            items (list[tuple[int, Booking]]): Bookings with their request position.
+            results (list): Result messages, filled in place.
+            atomic (bool): Store nothing unless every booking can be stored.
+        """
+        pending = items
+        committed = []
+        for _ in range(self.optimistic_retries):
+            if not pending:
+                break
+            versions = self.db.get_hall_versions({booking.hall_id for _, booking in pending})
+            conflicts = self._find_batch_conflicts(pending)
+            for position in conflicts:
+                results[position] = "Hall already booked for this slot"
+            if atomic and conflicts:
+                break
+
+            writable = [(position, booking) for position, booking in pending if position not in conflicts]
+            inserted = self._insert_batch(writable, results)
+            if atomic and len(inserted) < len(writable):
+                self.db.delete_many({"_id": {"$in": [booking_id for _, _, booking_id in inserted]}})
+                break
+
+            lost = {hall_id for hall_id in versions if not self.db.bump_hall_version(hall_id, versions[hall_id])}
+            if atomic and lost:
+                # committed halls are rolled back too, deleting bookings never creates a conflict
+                self.db.delete_many({"_id": {"$in": [booking_id for _, _, booking_id in inserted]}})
+                continue
+            if lost:
+                self.db.delete_many({"_id": {"$in": [booking_id for _, booking, booking_id in inserted if booking.hall_id in lost]}})
+            committed += [entry for entry in inserted if entry[1].hall_id not in lost]
+            pending = [(position, booking) for position, booking, _ in inserted if booking.hall_id in lost]
+        else:
+            for position, booking in pending:
+                results[position] = "Could not book the hall due to concurrent bookings, please try again"
+
+        if atomic and not self._batch_can_continue(results):
+            self.db.delete_many({"_id": {"$in": [booking_id for _, _, booking_id in committed]}})
+            return
+        self._commit_batch(committed, results)
+
+
     def fetch_available_halls(self, start_time, end_time, capacity) -> list[dict]:
         """
         Fetch all available halls for the given time range.
@@ -148,26 +952,277 @@ class BookingController:
             list[dict]: A list of dictionaries with available hall information.
         """
         try:
-            self.logger.info(f"Received fetch available hall request: Start: {start_time}, End: {end_time}")
+            self.logger.info(f"Received fetch available hall request: Start: {start_time}, End: {end_time}", extra=HOT_PATH)
             if not self.verify_time_range(start_time, end_time):
                 return "Error: End time must be after start time. Please try again."
         except:
             self.logger.info(f"Fetch available hall failed!: Start: {start_time}, End: {end_time}")
             raise
-        # query to find all halls available for a time slot
-        fetch_query = {
-            "$or": [
-                {"start_time": {"$lte": end_time, "$gte": start_time}},
-                {"end_time": {"$lte": end_time, "$gte": start_time}}
-            ]}
-        bookings = self.db.find(fetch_query)
-        booked_halls = [booking['hall_id'] for booking in bookings]
-        # showing only those halls which have capacity greater than or equal to required capacity
-        available_halls = [{'hall_id': hall.name, 'capacity': hall.value} for hall in halls if (hall.name not in booked_halls and hall.value >= capacity)]
-        
-        return available_halls
+        start_time, end_time = to_datetime(start_time), to_datetime(end_time)
+        eligible = self.hall_registry.with_capacity(capacity)
+
+        hall_ids = [hall_id for hall_id, _ in eligible]
+        if self.response_cache is not None:
+            cached = self.response_cache.get((start_time, end_time, capacity), hall_ids)
+            self.metrics.inc("fetch_cache_lookups_total", result="miss" if cached is MISS else "hit")
+            if cached is not MISS:
+                return [dict(hall) for hall in cached]
+
+        def available():
+            # taken before reading, a write racing with the read makes the cache entry stale
+            snapshot = self.response_cache.snapshot(hall_ids) if self.response_cache is not None else None
+            # halls with at least one booking overlapping the requested slot, only their ids are sent back
+            booked_halls = self.booking_cache.booked_halls(start_time, end_time) if self.booking_cache else None
+            if booked_halls is None:
+                booked_halls = set(self.db.distinct("hall_id", self._overlap_query(start_time, end_time)))
+            # showing only those halls which have capacity greater than or equal to required capacity
+            available_halls = [{'hall_id': hall_id, 'capacity': hall_capacity}
+                               for hall_id, hall_capacity in eligible if hall_id not in booked_halls]
+            if snapshot is not None:
+                self.response_cache.put((start_time, end_time, capacity), snapshot, available_halls)
+            return available_halls
+
+        return [dict(hall) for hall in self._coalesced("fetch_available", (start_time, end_time, capacity), available)]
+
+
+    def response_cache_stats(self) -> dict:
+        """
+        Report the hit rate and size of the fetch_available_halls response cache.
+
+        Returns:
+            dict: The cache statistics, or {"enabled": False} when the cache is off.
+        """
+        if self.response_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.response_cache.stats()}
+
+
+    def find_free_slots(self, duration_minutes, capacity, start_time, end_time, limit=5) -> list[dict]:
+        """
+        Find the earliest free slots of a given length in halls with enough capacity.
+
+        Replaces probing fetch_available_halls with shifted windows: the bookings of the eligible
+        halls within the search window are read once, from the booking cache or with a single
+        query, and every hall is swept over its sorted bookings.
+
+        Args:
+            duration_minutes (int): The length of the slot in minutes.
+            capacity (int): The minimum capacity of the hall.
+            start_time (str): ISO 8601 formatted start of the search window.
+            end_time (str): ISO 8601 formatted end of the search window, slots end before it.
+            limit (int, optional): The maximum number of slots returned. Default is 5.
+
+        Returns:
+            list[dict]: hall_id, capacity, start_time and end_time of the earliest free slots, ordered
+                by start time (smaller halls first for equal starts), or an error message.
+        """
+        try:
+            self.logger.info(f"Received find free slots request: Start: {start_time}, End: {end_time}, "
+                             f"Duration: {duration_minutes}, capacity: {capacity}", extra=HOT_PATH)
+            if not self.verify_time_range(start_time, end_time):
+                return "Error: End time must be after start time. Please try again."
+        except:
+            self.logger.info(f"Find free slots failed!: Start: {start_time}, End: {end_time}")
+            raise
+        if not isinstance(duration_minutes, int) or duration_minutes <= 0 or not isinstance(limit, int) or limit <= 0:
+            return "Error: Duration and limit must be positive integers"
+        window_start, window_end = to_datetime(start_time), to_datetime(end_time)
+        duration = timedelta(minutes=duration_minutes)
+
+        halls = self.hall_registry.with_capacity(capacity)
+        hall_ids = [hall_id for hall_id, _ in halls]
+        busy = self.booking_cache.busy_intervals(hall_ids, window_start, window_end) if self.booking_cache else None
+        if busy is None:
+            busy = defaultdict(list)
+            query = self._halls_overlap_query(hall_ids, window_start, window_end)
+            for booking in self.db.find(query, {"hall_id": 1, "start_time": 1, "end_time": 1}):
+                busy[booking["hall_id"]].append((to_datetime(booking["start_time"]), to_datetime(booking["end_time"])))
+
+        return [{"hall_id": hall_id, "capacity": hall_capacity,
+                 "start_time": to_iso(start), "end_time": to_iso(start + duration)}
+                for start, hall_capacity, hall_id in earliest_free_slots(halls, busy, window_start, window_end, duration, limit)]
+
+
+    def calendar(self, start_date, end_date, granularity_minutes=15, min_capacity=0) -> dict:
+        """
+        Fetch the free/busy calendar of every hall for a date range, e.g. to render a week grid.
+
+        Answered from the per-day occupancy maps, so a whole grid costs at most one database query
+        for the days not cached yet.
+
+        Args:
+            start_date (str): ISO 8601 formatted first day.
+            end_date (str): ISO 8601 formatted last day, inclusive.
+            granularity_minutes (int, optional): Minutes per bit. Default is 15.
+            min_capacity (int, optional): Only include halls with at least this capacity. Default is 0.
+
+        Returns:
+            dict: The days, the granularity and, by hall ID, a bitmap per day with one character per
+                period ("1" busy, "0" free), or an error message.
+        """
+        self.logger.info(f"Received calendar request: Start: {start_date}, End: {end_date}, Granularity: {granularity_minutes}", extra=HOT_PATH)
+        first, last = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        if last < first:
+            return "Error: End date must not be before start date. Please try again."
+        if (last - first).days >= self.calendar_max_days:
+            return f"Error: A calendar covers at most {self.calendar_max_days} days"
+        days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+        hall_ids = [hall_id for hall_id, _ in self.hall_registry.with_capacity(min_capacity)]
+        try:
+            halls = self.occupancy.bitmaps(hall_ids, days, granularity_minutes)
+        except ValueError as e:
+            return f"Error: {e}"
+        return {"days": [day.isoformat() for day in days], "granularity_minutes": granularity_minutes, "halls": halls}
+
+
+    def list_halls(self, min_capacity=0) -> list[dict]:
+        """
+        List the halls of the catalog.
+
+        Args:
+            min_capacity (int, optional): Only list halls with at least this capacity. Default is 0.
+
+        Returns:
+            list[dict]: hall_id and capacity of every hall, ordered by capacity.
+        """
+        return [{'hall_id': hall_id, 'capacity': capacity} for hall_id, capacity in self.hall_registry.with_capacity(min_capacity)]
+
+
+    def save_hall(self, hall_id, capacity) -> str:
+        """
+        Add a hall to the catalog or change its capacity.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            capacity (int): The number of seats.
+
+        Returns:
+            str: A message indicating the result.
+        """
+        if not isinstance(hall_id, str) or not hall_id or not isinstance(capacity, int) or capacity <= 0:
+            return "Error: A hall needs an ID and a positive capacity"
+        self.hall_registry.save(hall_id, capacity)
+        self._invalidate_responses(hall_id)
+        self.logger.info(f"Hall saved: {hall_id}, capacity: {capacity}")
+        return f"Hall {hall_id} saved with capacity {capacity}."
+
+
+    def remove_hall(self, hall_id) -> str:
+        """
+        Remove a hall from the catalog. Existing bookings of the hall are kept.
+
+        Args:
+            hall_id (str): The ID of the hall.
+
+        Returns:
+            str: A message indicating the result.
+        """
+        if not self.hall_registry.remove(hall_id):
+            return f"Hall {hall_id} not found."
+        self._invalidate_responses(hall_id)
+        self.logger.info(f"Hall removed: {hall_id}")
+        return f"Hall {hall_id} has been removed."
+
+
+    def reload_halls(self) -> str:
+        """
+        Reload the hall catalog from the database, e.g. after halls were edited directly in Mongo.
+
+        Returns:
+            str: A message with the number of halls loaded.
+        """
+        loaded = self.hall_registry.reload()
+        self._invalidate_responses()
+        return f"Loaded {loaded} halls."
 
     
+    def _booking_record(self, booking) -> dict:
+        """
+        Convert a stored booking into the record returned to clients.
+        """
+        return {
+            "_id": str(booking["_id"]),
+            "hall_id": booking["hall_id"],
+            "start_time": to_iso(booking["start_time"]),
+            "end_time": to_iso(booking["end_time"]),
+            "seats booked": booking["seats_booked"]
+        }
+
+
+    def _date_range(self, start_date, end_date) -> tuple:
+        """
+        Expand a date range to the first and last second of its days.
+        """
+        return to_datetime(start_date+"T00:00:00"), to_datetime(end_date+"T23:59:59")
+
+
+    def _fetch_page(self, start_time, end_time, limit, after=None) -> list:
+        """
+        Read one keyset page of bookings, projected to the returned fields.
+        """
+        query = self._bookings_in_range_query(start_time, end_time, after)
+        return self._coalesced("fetch_bookings", (start_time, end_time, limit, after),
+                               lambda: list(self.db.find(query, self.BOOKING_FIELDS).sort(self.BOOKING_ORDER).limit(limit)))
+
+
+    def fetch_bookings_page(self, start_date, end_date, limit=100, cursor=None) -> dict:
+        """
+        Fetch one page of the bookings within the specified date range, ordered by start time.
+
+        Args:
+            start_date (str): ISO 8601 formatted start date string.
+            end_date (str): ISO 8601 formatted end date string.
+            limit (int, optional): Maximum number of bookings in the page, at most max_page_size. Default is 100.
+            cursor (str, optional): The next_cursor of the previous page.
+
+        Returns:
+            dict: 'bookings' with the page's records and 'next_cursor', None on the last page.
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        self.logger.info(f"Received fetch bookings page request: Start: {start_date}, End: {end_date}, Limit: {limit}", extra=HOT_PATH)
+        start_time, end_time = self._date_range(start_date, end_date)
+        if end_time < start_time:
+            return "Error: End time must be after start time. Please try again."
+        # a negative limit would make Mongo return a single batch and end the paging early
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit <= 0:
+            return "Error: Limit must be a positive number of bookings."
+        limit = min(limit, self.max_page_size)
+
+        after = self._decode_cursor(cursor) if cursor else None
+        page = self._fetch_page(start_time, end_time, limit, after)
+        return {
+            "bookings": [self._booking_record(booking) for booking in page],
+            "next_cursor": self._encode_cursor(page[-1]) if len(page) == limit else None,
+        }
+
+
+    def iter_bookings(self, start_date, end_date, page_size=500):
+        """
+        Yield the bookings within the specified date range one by one, ordered by start time.
+
+        Bookings are read in keyset pages, so memory use does not depend on the width of the range.
+
+        Args:
+            start_date (str): ISO 8601 formatted start date string.
+            end_date (str): ISO 8601 formatted end date string.
+            page_size (int, optional): Number of bookings read per query. Default is 500.
+
+        Yields:
+            dict: Booking records, as returned by fetch_bookings.
+        """
+        start_time, end_time = self._date_range(start_date, end_date)
+        after = None
+        while True:
+            page = self._fetch_page(start_time, end_time, page_size, after)
+            for booking in page:
+                yield self._booking_record(booking)
+            if len(page) < page_size:
+                return
+            after = (page[-1]["start_time"], page[-1]["_id"])
+
+
     def fetch_bookings(self, start_date, end_date) -> list[dict]:
         """
         Fetch all bookings within the specified date range.
@@ -182,32 +1237,16 @@ class BookingController:
         Raises:
             ValueError: If the end date is before the start date.
         """
-        self.logger.info(f"Received fetch bookings request: Start: {start_date}, End: {end_date}")
+        self.logger.info(f"Received fetch bookings request: Start: {start_date}, End: {end_date}", extra=HOT_PATH)
 
-        start_time = start_date+"T00:00:00"
-        end_time = end_date+"T23:59:59"
+        start_time, end_time = self._date_range(start_date, end_date)
 
         if end_time < start_time:
             return "Error: End time must be after start time. Please try again."
 
         try:
-            
-            bookings = self.db.find({
-            "$and": [
-            {"start_time": {"$lte": end_time}},
-            {"end_time": {"$gte": start_time}}
-            ]})
-            booked_records = []
-            for booking in bookings:
-
-                booked_records.append({
-                    "_id": str(booking["_id"]),
-                    "hall_id": booking["hall_id"],
-                    "start_time": booking["start_time"],
-                    "end_time": booking["end_time"],
-                    "seats booked": booking["seats_booked"]
-                })
-            self.logger.info(f"Fetch bookings success: Start: {start_date}, End: {end_date}")
+            booked_records = list(self.iter_bookings(start_date, end_date))
+            self.logger.info(f"Fetch bookings success: Start: {start_date}, End: {end_date}", extra=HOT_PATH)
             return booked_records
         
         except Exception as e:
@@ -215,6 +1254,7 @@ class BookingController:
             return []
         
 
+    @counts_outcomes("cancel_booking")
     def cancel_booking(self, booking_id) -> str:
         """
         Cancel a booking by its booking ID.
@@ -230,11 +1270,14 @@ class BookingController:
         booking = self.db.find_one_and_delete({"_id": ObjectId(booking_id)})
 
         if booking:
+            self._on_cancelled(booking)
             return f"Booking with ID {booking_id} has been cancelled successfully."
         else:
             return f"Booking with ID {booking_id} not found."
 
 
+    @idempotent("update_booking")
+    @counts_outcomes("update_booking")
     def update_booking(self, booking_id, new_start_time, new_end_time, new_capacity) -> str:
         """
         Update the start and end times of an existing booking.
@@ -251,63 +1294,152 @@ class BookingController:
 
         if not self.verify_time_range(new_start_time, new_end_time):
             return "Error: End time must be after start time. Please try again."
-        
-        # checking if the booking to be updated exists or not
-        booking = self.db.find_one({'_id': ObjectId(booking_id)})
+        new_start_time, new_end_time = to_datetime(new_start_time), to_datetime(new_end_time)
+        booking_id = ObjectId(booking_id)
 
-        if not booking:
-            return f"Booking with ID {booking_id} not found."
+        # the booking cache knows where most bookings are, which saves reading the booking first;
+        # the guarded write below notices when that was out of date and the booking is read instead
+        booking = self._locate_booking(booking_id) if self.booking_mode == "locked" else None
+        for _ in range(2):
+            if booking is None:
+                booking = self.db.find_one({'_id': booking_id})
+                if not booking:
+                    return f"Booking with ID {booking_id} not found."
+
+            cached_conflict = self._cached_conflict(booking['hall_id'], new_start_time, new_end_time, booking_id)
+            if cached_conflict:
+                self.logger.info(f"Update failed, slot already booked: Booking ID: {booking_id}, New Start: {new_start_time}, New End: {new_end_time}")
+                return "The new time slot is not available for the selected hall."
+
+            if self.booking_mode == "optimistic":
+                return self._update_booking_optimistic(booking, new_start_time, new_end_time, new_capacity, cached_conflict)
+
+            result = self._update_booking_locked(booking, new_start_time, new_end_time, new_capacity, cached_conflict)
+            if result is not None:
+                return result
+            # the booking moved or was cancelled since it was located
+            booking = None
+        self.logger.info(f"Update failed, booking changed concurrently: Booking ID: {booking_id}")
+        return f"Booking with ID {booking_id} was changed by another request, please try again."
+
+
+    def _locate_booking(self, booking_id):
+        """
+        Find the hall and time range of a booking in the booking cache.
+
+        Returns:
+            dict: _id, hall_id, start_time and end_time, or None if the cache does not know the booking.
+        """
+        if self.booking_cache is None:
+            return None
+        slot = self.booking_cache.locate(booking_id)
+        if slot is None:
+            return None
+        hall_id, start_time, end_time = slot
+        return {'_id': booking_id, 'hall_id': hall_id, 'start_time': start_time, 'end_time': end_time}
+
+
+    def _update_booking_locked(self, booking, new_start_time, new_end_time, new_capacity, cached_conflict=None):
+        """
+        Move a booking to a new slot while holding the slot locks of the old and the new slot.
 
+        Takes one lock acquisition, one conflict query (none when the booking only shrinks, as no
+        other booking can be inside its own slot) and one write. The write is guarded by the
+        booking's old hall and times and returns the previous document, so it also tells whether
+        the booking was located correctly.
+
+        Args:
+            booking (dict): _id, hall_id, start_time and end_time of the booking being updated.
+            new_start_time (datetime): The new start time.
+            new_end_time (datetime): The new end time.
+            new_capacity (int): The new number of seats booked.
+            cached_conflict (bool, optional): What the booking cache answered for the new slot.
+
+        Returns:
+            str: A message indicating the result, or None if the booking no longer matches.
+        """
+        booking_id = booking['_id']
         hall_id = booking['hall_id']
-        old_start_time = booking['start_time']
-        old_end_time = booking['end_time']
+        old_start_time = to_datetime(booking['start_time'])
+        old_end_time = to_datetime(booking['end_time'])
 
-        lock_conflict = not (new_end_time < old_start_time or new_start_time > old_end_time)
-        lock_aquired = False
+        # the old slot is held too, so requests for it wait for the move instead of failing against
+        # a booking which is about to leave; overlapping slots are locked as their union
+        ranges = [(hall_id, old_start_time, old_end_time), (hall_id, new_start_time, new_end_time)]
+        with self.lock_service.locked(ranges) as acquired:
+            if not acquired:
+                self.logger.error(f'Update: Lock aquire failed, Booking ID: {booking_id}, Start: {new_start_time}, End: {new_end_time}')
+                return "Could not acquire lock for the given time slot"
 
-        # aquire lock for the combined slot if old slot and new slot overlaps
-        if lock_conflict:
-            lock_start_time = min(old_start_time,new_start_time)
-            lock_end_time = min(old_end_time,new_end_time)
-            if self.lock_service.acquire_lock(hall_id, lock_start_time, lock_end_time):
-                lock_aquired = True
+            shrinking = old_start_time <= new_start_time and new_end_time <= old_end_time
+            if not shrinking and self.db.find_one(self._conflict_query(hall_id, new_start_time, new_end_time, booking_id)):
+                self.logger.info(f"Update failed, slot already booked: Booking ID: {booking_id}, New Start: {new_start_time}, New End: {new_end_time}")
+                if cached_conflict is False:
+                    self._on_drift(hall_id)
+                return "The new time slot is not available for the selected hall."
 
-        # else aquire lock only for the new slot
-        elif(self.lock_service.acquire_lock(hall_id, old_start_time, old_end_time) and 
-            self.lock_service.acquire_lock(hall_id, new_start_time, new_end_time)):
-                lock_aquired = True
+            guard = {'_id': booking_id, 'hall_id': hall_id, 'start_time': booking['start_time'], 'end_time': booking['end_time']}
+            update_query = {'$set': {'start_time': new_start_time, 'end_time': new_end_time, 'seats_booked': new_capacity}}
+            previous = self.db.find_one_and_update(guard, update_query)
+            if previous is None:
+                return None
+            if (to_datetime(previous['start_time']), to_datetime(previous['end_time']), previous.get('seats_booked')) == \
+                    (new_start_time, new_end_time, new_capacity):
+                self.logger.info(f"Update failed! Booking ID: {booking_id}, New Start: {new_start_time}, New End: {new_end_time}")
+                return f"Failed to update or booking with ID {booking_id} has same updates."
+            self._on_updated(previous, new_start_time, new_end_time)
+            self.logger.info(f'Update success, Booking ID: {booking_id}, Start: {new_start_time}, End: {new_end_time}')
+            return f"Booking with ID {booking_id} has been updated successfully."
 
-        if lock_aquired:
-            try:
-                query_to_find_conflicts = {
-                "hall_id": hall_id,
-                "_id": {"$ne": ObjectId(booking_id)},  # Exclude the booking with this ID
-                "$and": [
-                    {"start_time": {"$lt": new_end_time}},
-                    {"end_time": {"$gt": new_start_time}}
-                ]}
-                # checking if no existing bookings are these for the new slot
-                if not self.db.find_one(query_to_find_conflicts):
-
-                    search_query = {'_id': ObjectId(booking_id)}
-                    update_query = {'$set': {'start_time': new_start_time, 'end_time': new_end_time, 'seats_booked':new_capacity}}
-                    result = self.db.update_one(search_query,update_query)
-                    if result.modified_count > 0:
-                        self.logger.info(f'Update success, Booking ID: {booking_id}, Start: {new_start_time}, End: {new_end_time}')
-                        return f"Booking with ID {booking_id} has been updated successfully."
-                    else:
-                        self.logger.info(f"Update failed! Booking ID: {booking_id}, New Start: {new_start_time}, New End: {new_end_time}")
-                        return f"Failed to update or booking with ID {booking_id} has same updates."
 
-                else:
-                    self.logger.info(f"Update failed, slot already booked: Booking ID: {booking_id}, New Start: {new_start_time}, New End: {new_end_time}")
-                    return "The new time slot is not available for the selected hall."
-            finally:
-                if not lock_conflict:
-                    self.lock_service.release_lock(hall_id, old_start_time, old_end_time)
-                    self.lock_service.release_lock(hall_id, new_start_time, new_end_time)
-                else:
-                    self.lock_service.release_lock(hall_id, lock_start_time, lock_end_time)
-        else:
-            self.logger.error(f'Update: Lock aquire failed, Booking ID: {booking_id}, Start: {new_start_time}, End: {new_end_time}')
-            return "Could not acquire lock for the given time slot"
+    def _update_booking_optimistic(self, booking, new_start_time, new_end_time, new_capacity, cached_conflict=None) -> str:
+        """
+        Move a booking to a new slot without slot locks.
+
+        Changing the booking in place could not be rolled back safely once its old slot was taken by
+        someone else, so the new slot is first reserved with a claim document inserted through the
+        same versioned protocol as a new booking. Once the claim is committed the booking is moved
+        and the claim removed.
+
+        Args:
+            booking (dict): The stored booking being updated.
+            new_start_time (datetime): The new start time.
+            new_end_time (datetime): The new end time.
+            new_capacity (int): The new number of seats booked.
+            cached_conflict (bool, optional): What the booking cache answered for the new slot.
+
+        Returns:
+            str: A message indicating whether the update was successful or an error occurred.
+        """
+        booking_id = booking['_id']
+        hall_id = booking['hall_id']
+        claim = {
+            'hall_id': hall_id,
+            'start_time': new_start_time,
+            'end_time': new_end_time,
+            'seats_booked': new_capacity,
+            'pending_update': booking_id,
+        }
+        outcome, claim_id = self._insert_optimistic(hall_id, claim, exclude_id=booking_id)
+
+        if outcome == "conflict":
+            self.logger.info(f"Update failed, slot already booked: Booking ID: {booking_id}, New Start: {new_start_time}, New End: {new_end_time}")
+            if cached_conflict is False:
+                self._on_drift(hall_id)
+            return "The new time slot is not available for the selected hall."
+        if outcome == "retries exhausted":
+            self.logger.error(f'Update: too many concurrent writes, Booking ID: {booking_id}, Start: {new_start_time}, End: {new_end_time}')
+            return "Could not update the booking due to concurrent bookings, please try again"
+
+        try:
+            update_query = {'$set': {'start_time': new_start_time, 'end_time': new_end_time, 'seats_booked': new_capacity}}
+            result = self.db.update_one({'_id': booking_id}, update_query)
+        finally:
+            self.db.delete_one({'_id': claim_id})
+
+        if result.modified_count > 0:
+            self._on_updated(booking, new_start_time, new_end_time)
+            self.logger.info(f'Update success, Booking ID: {booking_id}, Start: {new_start_time}, End: {new_end_time}')
+            return f"Booking with ID {booking_id} has been updated successfully."
+        self.logger.info(f"Update failed! Booking ID: {booking_id}, New Start: {new_start_time}, New End: {new_end_time}")
+        return f"Failed to update or booking with ID {booking_id} has same updates."
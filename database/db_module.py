@@ -1,11 +1,45 @@
-from pymongo import MongoClient,ReturnDocument
+from pymongo import MongoClient,ReturnDocument,ASCENDING,IndexModel,UpdateOne,monitoring
+from pymongo.errors import DuplicateKeyError
+from utils.metrics import Metrics
 from datetime import datetime, timezone
 import os
 
 
+class CommandTimer(monitoring.CommandListener):
+    """
+    Record the duration of every command sent to Mongo, by command name.
+    """
+
+    def __init__(self):
+        self.metrics = Metrics()
+        self.metrics.describe("mongo_command_duration_seconds", "histogram", "Duration of Mongo commands.")
+        self.metrics.describe("mongo_command_failures_total", "counter", "Mongo commands which returned an error.")
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        self.metrics.observe("mongo_command_duration_seconds", event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event) -> None:
+        self.metrics.observe("mongo_command_duration_seconds", event.duration_micros / 1e6, command=event.command_name)
+        self.metrics.inc("mongo_command_failures_total", command=event.command_name)
+
+
 class BookingDatabase:
     _instance = None
 
+    # indexes kept on the bookings collection, by name
+    BOOKING_INDEXES = {
+        # conflict checks of book_hall and update_booking: equality on hall, range on times
+        "hall_start_end": [("hall_id", ASCENDING), ("start_time", ASCENDING), ("end_time", ASCENDING)],
+        # overlap queries across all halls (fetch_bookings, fetch_available_halls), hall_id
+        # is included so distinct('hall_id') is answered from the index alone
+        "start_end_hall": [("start_time", ASCENDING), ("end_time", ASCENDING), ("hall_id", ASCENDING)],
+        # keyset pagination of fetch_bookings on (start_time, _id), end_time is filtered in the index
+        "start_id_end": [("start_time", ASCENDING), ("_id", ASCENDING), ("end_time", ASCENDING)],
+    }
+
     def __new__(cls):
         """
         Ensure that only one instance of the BookingDatabase class exists.
@@ -16,11 +50,49 @@ class BookingDatabase:
         if cls._instance is None:
             cls._instance = super(BookingDatabase, cls).__new__(cls)
             mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
-            cls._instance.client = MongoClient(mongo_uri)
-            cls._instance.db = cls._instance.client['seminar_hall_booking']
+            cls._instance.client = MongoClient(mongo_uri, event_listeners=[CommandTimer()])
+            cls._instance.db = cls._instance.client[os.getenv('MONGO_DB_NAME', 'seminar_hall_booking')]
             cls._instance.bookings = cls._instance.db.bookings
+            cls._instance.leases = cls._instance.db.slot_leases
+            cls._instance.hall_versions = cls._instance.db.hall_versions
+            cls._instance.halls = cls._instance.db.halls
+            cls._instance.idempotency_keys = cls._instance.db.idempotency_keys
+            cls._instance.ensure_indexes()
         return cls._instance
 
+    def ensure_indexes(self) -> list[str]:
+        """
+        Create the managed indexes of the bookings collection if they do not exist yet, and the
+        TTL index removing expired idempotency keys.
+
+        Returns:
+            list[str]: The names of the managed bookings indexes.
+        """
+        self.idempotency_keys.create_index("expires_at", name="expires_at_ttl", expireAfterSeconds=0)
+        models = [IndexModel(keys, name=name) for name, keys in self.BOOKING_INDEXES.items()]
+        return self.bookings.create_indexes(models)
+
+    def count_legacy_bookings(self) -> int:
+        """
+        Count bookings still storing their times as ISO strings (see database/migrate_times.py).
+
+        Returns:
+            int: The number of bookings which need migrating.
+        """
+        return self.bookings.count_documents({"$or": [{"start_time": {"$type": "string"}}, {"end_time": {"$type": "string"}}]})
+
+    def explain(self, command) -> dict:
+        """
+        Run the explain command for a find, distinct or update command on the bookings collection.
+
+        Args:
+            command (dict): The command document, e.g. {"find": "bookings", "filter": {...}}.
+
+        Returns:
+            dict: The explain output with the query planner's winning plan.
+        """
+        return self.db.command("explain", command, verbosity="queryPlanner")
+
     def delete_database(self) -> dict:
         """
         Deletes all documents in the bookings collection.
@@ -30,8 +102,11 @@ class BookingDatabase:
         """
         return self.bookings.delete_many({})
 
-    def find(self, query):
-        return self.bookings.find(query)
+    def find(self, query, projection=None):
+        return self.bookings.find(query, projection)
+
+    def distinct(self, key, query) -> list:
+        return self.bookings.distinct(key, query)
 
     def find_one(self,query):
         return self.bookings.find_one(query)
@@ -41,5 +116,126 @@ class BookingDatabase:
 
     def find_one_and_delete(self, query) -> dict:
         return self.bookings.find_one_and_delete(query)
-    
 
+    def find_one_and_update(self, query, update) -> dict:
+        # returns the document as it was before the update, or None if nothing matched
+        return self.bookings.find_one_and_update(query, update)
+
+    def insert_one(self, document):
+        return self.bookings.insert_one(document)
+
+    def delete_one(self, query):
+        return self.bookings.delete_one(query)
+
+    def delete_many(self, query):
+        return self.bookings.delete_many(query)
+
+    def bulk_write(self, requests, ordered=True):
+        return self.bookings.bulk_write(requests, ordered=ordered)
+
+    def find_halls(self) -> list[dict]:
+        """
+        Read the hall catalog.
+
+        Returns:
+            list[dict]: One document per hall, the hall ID as _id and its capacity.
+        """
+        return list(self.halls.find({}, {"capacity": 1}))
+
+    def seed_halls(self, defaults) -> None:
+        """
+        Insert the default halls when the catalog is empty. Safe to run from several processes at once.
+
+        Args:
+            defaults (dict): Capacity by hall ID.
+        """
+        if self.halls.estimated_document_count():
+            return
+        self.halls.bulk_write([UpdateOne({"_id": hall_id}, {"$setOnInsert": {"capacity": capacity}}, upsert=True)
+                               for hall_id, capacity in defaults.items()])
+
+    def save_hall(self, hall_id, capacity) -> None:
+        self.halls.update_one({"_id": hall_id}, {"$set": {"capacity": capacity}}, upsert=True)
+
+    def delete_hall(self, hall_id) -> bool:
+        return self.halls.delete_one({"_id": hall_id}).deleted_count > 0
+
+    def get_hall_version(self, hall_id) -> int:
+        """
+        Read the write version of a hall, bumped by every optimistic booking committed on it.
+
+        Args:
+            hall_id (str): The ID of the hall.
+
+        Returns:
+            int: The current version, 0 if the hall has never been written optimistically.
+        """
+        document = self.hall_versions.find_one({"_id": hall_id})
+        return document["version"] if document else 0
+
+    def get_hall_versions(self, hall_ids) -> dict:
+        """
+        Read the write versions of several halls in one round-trip.
+
+        Args:
+            hall_ids (iterable): The IDs of the halls.
+
+        Returns:
+            dict: The version of every requested hall, 0 for halls never written optimistically.
+        """
+        hall_ids = list(hall_ids)
+        versions = dict.fromkeys(hall_ids, 0)
+        for document in self.hall_versions.find({"_id": {"$in": hall_ids}}):
+            versions[document["_id"]] = document["version"]
+        return versions
+
+    def bump_hall_version(self, hall_id, version) -> bool:
+        """
+        Increment the write version of a hall if it still equals the version read earlier.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            version (int): The version read before the write being committed.
+
+        Returns:
+            bool: True if the version was bumped, False if another write committed in between.
+        """
+        try:
+            result = self.hall_versions.update_one(
+                {"_id": hall_id, "version": version}, {"$inc": {"version": 1}}, upsert=(version == 0))
+        except DuplicateKeyError:
+            # another writer created the version document first
+            return False
+        return result.modified_count > 0 or result.upserted_id is not None
+
+    def find_idempotent_result(self, key) -> dict:
+        """
+        Read the stored result of a request sent with an idempotency key.
+
+        Args:
+            key (str): The idempotency key.
+
+        Returns:
+            dict: The document with the request's fingerprint, result and expires_at, or None if the key is unused.
+        """
+        return self.idempotency_keys.find_one({"_id": key})
+
+    def save_idempotent_result(self, key, fingerprint, result, expires_at) -> bool:
+        """
+        Store the result of a request sent with an idempotency key, unless the key is stored already.
+
+        Args:
+            key (str): The idempotency key.
+            fingerprint (str): Identifies the request the key was used with.
+            result (str): The result message of the request.
+            expires_at (datetime): When the TTL index removes the result.
+
+        Returns:
+            bool: True if the result was stored, False if another process stored the key first.
+        """
+        try:
+            self.idempotency_keys.insert_one(
+                {"_id": key, "fingerprint": fingerprint, "result": result, "expires_at": expires_at})
+        except DuplicateKeyError:
+            return False
+        return True
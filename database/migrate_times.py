@@ -0,0 +1,55 @@
+import argparse
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+from database.db_module import BookingDatabase
+from models.booking import to_datetime
+
+
+def migrate(db, batch_size=1000, dry_run=False) -> dict:
+    """
+    Convert the ISO string start_time/end_time of stored bookings to native BSON datetimes.
+
+    Each update is guarded on the string values it read, so a booking changed concurrently by
+    the application is left alone and picked up by the next run. Running it again is a no-op.
+
+    Args:
+        db (BookingDatabase): The database to migrate.
+        batch_size (int, optional): Number of updates sent per bulk_write. Default is 1000.
+        dry_run (bool, optional): Only count the bookings which would be converted. Default is False.
+
+    Returns:
+        dict: Number of legacy bookings found, converted and skipped as invalid.
+    """
+    legacy_query = {"$or": [{"start_time": {"$type": "string"}}, {"end_time": {"$type": "string"}}]}
+    summary = {"found": 0, "converted": 0, "invalid": 0}
+    batch = []
+
+    def flush():
+        if batch and not dry_run:
+            summary["converted"] += db.bookings.bulk_write(batch, ordered=False).modified_count
+        batch.clear()
+
+    for booking in db.bookings.find(legacy_query, {"start_time": 1, "end_time": 1}):
+        summary["found"] += 1
+        try:
+            start_time = to_datetime(booking["start_time"])
+            end_time = to_datetime(booking["end_time"])
+        except (KeyError, TypeError, ValueError):
+            summary["invalid"] += 1
+            continue
+        guard = {"_id": booking["_id"], "start_time": booking["start_time"], "end_time": booking["end_time"]}
+        batch.append(UpdateOne(guard, {"$set": {"start_time": start_time, "end_time": end_time}}))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return summary
+
+
+if __name__ == '__main__':
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Convert booking times stored as ISO strings to BSON datetimes")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    print(migrate(BookingDatabase(), args.batch_size, args.dry_run))
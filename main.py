@@ -26,6 +26,44 @@ class BookingSystemCLI:
             print("enter data in correct form")
 
 
+    def find_free_slots(self):
+        """
+        Prompt the user to input a slot length, capacity and search window to find the earliest free slots.
+
+        This function expects a JSON string input from the user and prints the earliest free (hall, start) slots.
+        """
+        print("enter the slot length in minutes, capacity, search window and number of slots")
+        print('eg- {"duration_minutes":90,"capacity":50,"start_time":"2024-07-30T08:00:00","end_time":"2024-08-02T18:00:00","limit":5}')
+        data = input("Enter JSON string: ").strip()
+        try:
+            data = json.loads(data)
+            slots = self.controller.find_free_slots(data['duration_minutes'], data['capacity'], data['start_time'], data['end_time'],
+                                                    data.get('limit', 5))
+            print("Free slots:", slots)
+        except:
+            print("enter data in correct form")
+
+
+    def calendar(self):
+        """
+        Prompt the user to input a date range and print the free/busy calendar of every hall.
+        """
+        print("enter start date, end date and minutes per character")
+        print('eg- {"start_date":"2024-07-29","end_date":"2024-08-02","granularity":60}')
+        data = input("Enter JSON string: ").strip()
+        try:
+            data = json.loads(data)
+            result = self.controller.calendar(data['start_date'], data['end_date'], data.get('granularity', 15))
+            if isinstance(result, str):
+                print(result)
+                return
+            for hall_id, days in result["halls"].items():
+                for day, bitmap in days.items():
+                    print(f"{hall_id:>6} {day} {bitmap.replace('0', '.').replace('1', '#')}")
+        except:
+            print("enter data in correct form")
+
+
     def book_hall(self):
         """
         Prompt the user to input hall ID, start time, end time, and capacity to book a hall.
@@ -68,21 +106,42 @@ class BookingSystemCLI:
 
         This function expects a JSON string input containing a list of bookings and attempts to book multiple halls based on the provided data.
         """
-        print("enter hall_id, start time and end time for each booking")
+        print("enter hall_id, start time and end time for each booking, set atomic to book all or none")
         print('''eg- {"bookings":[
         {"hall_id": "A", "start_time": "2024-08-01T10:00:00", "end_time": "2024-08-01T12:00:00","capacity":50},
         {"hall_id": "C", "start_time": "2024-08-01T16:00:00", "end_time": "2024-08-01T18:00:00","capacity":50}
-        ]}''')
+        ], "atomic": false}''')
         data = input("Enter data as JSON string: ")
         try:
             data = json.loads(data)
-            for booking_data in data['bookings']:
-                result = self.controller.book_hall(booking_data['hall_id'], booking_data['start_time'], booking_data['end_time'], booking_data['capacity'])
+            for result in self.controller.book_many(data['bookings'], atomic=data.get('atomic', False)):
                 print(result)
         except Exception as e:
             print("enter data in correct form ",e)
 
 
+    def book_recurring(self):
+        """
+        Prompt the user to input a recurring booking.
+
+        This function expects a JSON string input with the first occurrence and a recurrence rule and books every occurrence.
+        """
+        print("enter hall_id, the first occurrence and a rule (daily, weekly or custom dates, with count or until)")
+        print('''eg- {"hall_id": "B", "start_time": "2024-09-02T10:00:00", "end_time": "2024-09-02T12:00:00", "capacity": 50,
+        "rule": {"freq": "weekly", "byday": ["MO"], "until": "2024-12-20"}, "atomic": false}''')
+        data = input("Enter data as JSON string: ")
+        try:
+            data = json.loads(data)
+            series = self.controller.book_recurring(data['hall_id'], data['start_time'], data['end_time'], data['capacity'],
+                                                    data['rule'], atomic=data.get('atomic', False))
+            for occurrence, result in zip(series['occurrences'], series['results']):
+                print(occurrence['start_time'], result)
+            if not series['occurrences']:
+                print(series['results'][0])
+        except Exception as e:
+            print("enter data in correct form ",e)
+
+
     def cancel_booking(self):
         """
         Prompt the user to input a booking ID to cancel the booking.
@@ -122,6 +181,21 @@ class BookingSystemCLI:
             print("enter data in correct form")
 
 
+    def lock_contention(self):
+        """
+        Print the most contended halls and time windows of the slot locks.
+        """
+        report = self.controller.lock_service.contention()
+        print("Most contended halls:")
+        for hall in report["halls"]:
+            print(f'  {hall["hall_id"]}: waiting {hall["waiting"]}, timeouts {hall["timeouts"]}, '
+                  f'mean wait {hall["mean_wait_ms"]} ms (max {hall["max_wait_ms"]} ms), '
+                  f'mean hold {hall["mean_hold_ms"]} ms (max {hall["max_hold_ms"]} ms)')
+        print("Most contended time windows:")
+        for window in report["windows"]:
+            print(f'  {window["hall_id"]} {window["start_time"]} - {window["end_time"]}: {window["contended"]} contended')
+
+
     def run(self):
         """
         Run the CLI interface to handle user commands.
@@ -129,13 +203,19 @@ class BookingSystemCLI:
         This function continuously prompts the user for commands and calls the corresponding methods until 'exit' is entered.
         """
         while True:
-            user_input = input("Enter command (fetch, book, view, book_multiple, cancel, update, exit): ").strip()
+            user_input = input("Enter command (fetch, free, calendar, book, view, book_multiple, book_recurring, cancel, update, contention, exit): ").strip()
             if user_input == 'exit':
                 break
 
             if user_input == 'fetch':
                 self.fetch_halls()
 
+            elif user_input == 'free':
+                self.find_free_slots()
+
+            elif user_input == 'calendar':
+                self.calendar()
+
             elif user_input == 'book':
                 self.book_hall()
 
@@ -144,6 +224,9 @@ class BookingSystemCLI:
 
             elif user_input == 'book_multiple':
                 self.book_multiple_halls()
+
+            elif user_input == 'book_recurring':
+                self.book_recurring()
             
             elif user_input == 'cancel':
                 self.cancel_booking()
@@ -151,6 +234,9 @@ class BookingSystemCLI:
             elif user_input == 'update':
                 self.update_booking()
 
+            elif user_input == 'contention':
+                self.lock_contention()
+
     
 if __name__ == '__main__':
     cli = BookingSystemCLI()
@@ -1,7 +1,44 @@
+from datetime import datetime, timezone
+
+
+def to_datetime(value) -> datetime:
+    """
+    Convert a booking time to the form stored in Mongo: a naive datetime in UTC.
+
+    Args:
+        value (str | datetime): An ISO 8601 string (as sent by clients and stored by older
+            versions) or a datetime.
+
+    Returns:
+        datetime: The naive UTC datetime.
+
+    Raises:
+        ValueError: If the string is not valid ISO 8601.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def to_iso(value) -> str:
+    """
+    Format a stored booking time as ISO 8601, accepting both datetimes and the ISO strings of
+    bookings which have not been migrated yet.
+
+    Args:
+        value (str | datetime): The stored time.
+
+    Returns:
+        str: The ISO 8601 formatted time.
+    """
+    return to_datetime(value).isoformat()
+
 
 class Booking:
     def __init__(self, hall_id, start_time, end_time, capacity):
         self.hall_id = hall_id
-        self.start_time = start_time
-        self.end_time = end_time
+        self.start_time = to_datetime(start_time)
+        self.end_time = to_datetime(end_time)
         self.seats_booked = capacity
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+from models.booking import to_datetime
+
+
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+# upper bound of the occurrences of one series, ten years of weekly bookings
+MAX_OCCURRENCES = 520
+
+
+def parse_rule(rule) -> dict:
+    """
+    Normalise a recurrence rule.
+
+    Args:
+        rule (dict | str): Either a dict such as {"freq": "weekly", "byday": ["MO"], "count": 15}
+            or an RRULE-like string such as "FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=2024-12-20".
+
+    Returns:
+        dict: The rule with lower case keys, and byday and exdate as lists.
+    """
+    if isinstance(rule, str):
+        text = rule.strip()
+        if text.upper().startswith("RRULE:"):
+            text = text[len("RRULE:"):]
+        rule = dict(part.split("=", 1) for part in text.split(";") if part)
+    rule = {key.lower(): value for key, value in rule.items()}
+    for key in ("byday", "exdate", "dates"):
+        if isinstance(rule.get(key), str):
+            rule[key] = rule[key].split(",")
+    return rule
+
+
+def _until(value):
+    """
+    Parse the inclusive end of a series. A date without a time includes that whole day.
+    """
+    if value is None:
+        return None
+    until = to_datetime(value)
+    if isinstance(value, str) and "T" not in value and " " not in value.strip():
+        until += timedelta(days=1) - timedelta(microseconds=1)
+    return until
+
+
+def _candidates(start, rule):
+    """
+    Generate the start times of a daily or weekly series, unbounded.
+    """
+    freq = str(rule.get("freq", "")).lower()
+    interval = int(rule.get("interval", 1))
+    if interval < 1:
+        raise ValueError("interval must be at least 1")
+
+    if freq == "daily":
+        step = timedelta(days=interval)
+        occurrence = start
+        while True:
+            yield occurrence
+            occurrence += step
+    elif freq == "weekly":
+        weekdays = sorted({WEEKDAYS[day.strip().upper()] for day in rule.get("byday") or []}) or [start.weekday()]
+        week = start - timedelta(days=start.weekday())
+        while True:
+            for weekday in weekdays:
+                occurrence = week + timedelta(days=weekday)
+                if occurrence >= start:
+                    yield occurrence
+            week += timedelta(weeks=interval)
+    else:
+        raise ValueError(f"Unknown frequency: {rule.get('freq')}")
+
+
+def expand(start_time, end_time, rule) -> list[tuple[datetime, datetime]]:
+    """
+    Expand a recurring booking into its occurrences.
+
+    The first occurrence is the given slot (or, for weekly rules with byday, the first matching
+    day on or after it). Every occurrence has the duration of the given slot. Supported rule keys:
+    freq ("daily", "weekly" or "custom"), interval, byday (weekly: "MO" ... "SU"), count or until
+    (one of them is required, until is inclusive), exdate (dates to skip, e.g. holidays) and, for
+    custom series, dates (the start times of every occurrence).
+
+    Args:
+        start_time (str | datetime): Start of the first occurrence.
+        end_time (str | datetime): End of the first occurrence.
+        rule (dict | str): The recurrence rule, see parse_rule.
+
+    Returns:
+        list[tuple[datetime, datetime]]: Start and end of every occurrence, as stored in Mongo.
+
+    Raises:
+        ValueError: If the rule is invalid or yields more than MAX_OCCURRENCES occurrences.
+    """
+    rule = parse_rule(rule)
+    start = datetime.fromisoformat(start_time) if isinstance(start_time, str) else start_time
+    end = datetime.fromisoformat(end_time) if isinstance(end_time, str) else end_time
+    duration = end - start
+    if duration <= timedelta(0):
+        raise ValueError("end time must be after start time")
+    excluded = {to_datetime(value).date() for value in rule.get("exdate") or []}
+
+    if str(rule.get("freq", "")).lower() == "custom":
+        starts = sorted(datetime.fromisoformat(value) if isinstance(value, str) else value for value in rule.get("dates") or [])
+        if not starts:
+            raise ValueError("a custom series needs dates")
+        if len(starts) > MAX_OCCURRENCES:
+            raise ValueError(f"a series may have at most {MAX_OCCURRENCES} occurrences")
+    else:
+        count = int(rule["count"]) if rule.get("count") is not None else None
+        until = _until(rule.get("until"))
+        if count is None and until is None:
+            raise ValueError("a recurrence needs a count or an until date")
+        if count is not None and count > MAX_OCCURRENCES:
+            raise ValueError(f"a series may have at most {MAX_OCCURRENCES} occurrences")
+
+        starts = []
+        for occurrence in _candidates(start, rule):
+            if (count is not None and len(starts) >= count) or (until is not None and to_datetime(occurrence) > until):
+                break
+            if len(starts) >= MAX_OCCURRENCES:
+                raise ValueError(f"a series may have at most {MAX_OCCURRENCES} occurrences")
+            starts.append(occurrence)
+
+    return [(to_datetime(occurrence), to_datetime(occurrence + duration))
+            for occurrence in starts if to_datetime(occurrence).date() not in excluded]
@@ -0,0 +1,117 @@
+import unittest
+import logging
+import time
+from datetime import datetime
+from bson.objectid import ObjectId
+from utils.booking_cache import BookingCache
+
+
+class ListDatabase:
+    """
+    Just enough of BookingDatabase for the cache: find over an in-memory list of bookings.
+    """
+
+    def __init__(self, bookings):
+        self.bookings = bookings
+
+    def find(self, query, projection=None):
+        return [booking for booking in self.bookings
+                if "hall_id" not in query or booking["hall_id"] == query["hall_id"]]
+
+
+def booking(hall_id, start_hour, end_hour) -> dict:
+    return {"_id": ObjectId(), "hall_id": hall_id,
+            "start_time": datetime(2030, 1, 1, start_hour), "end_time": datetime(2030, 1, 1, end_hour)}
+
+
+class TestBookingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.stored = [booking("A", 10, 12), booking("B", 9, 10)]
+        self.db = ListDatabase(self.stored)
+        self.cache = BookingCache(self.db, logging.getLogger("booking_cache_test"))
+        self.cache.reload()
+
+    def test_01_conflicts_from_loaded_bookings(self):
+        self.assertTrue(self.cache.has_conflict("A", datetime(2030, 1, 1, 11), datetime(2030, 1, 1, 13)))
+        self.assertFalse(self.cache.has_conflict("A", datetime(2030, 1, 1, 12), datetime(2030, 1, 1, 13)))
+        self.assertFalse(self.cache.has_conflict("C", datetime(2030, 1, 1, 11), datetime(2030, 1, 1, 13)))
+        self.assertFalse(self.cache.has_conflict("A", datetime(2030, 1, 1, 11), datetime(2030, 1, 1, 13), self.stored[0]["_id"]))
+
+    def test_02_booked_halls(self):
+        self.assertEqual(self.cache.booked_halls(datetime(2030, 1, 1, 9), datetime(2030, 1, 1, 11)), {"A", "B"})
+        self.assertEqual(self.cache.booked_halls(datetime(2030, 1, 1, 12), datetime(2030, 1, 1, 13)), set())
+
+    def test_03_write_through(self):
+        new = booking("C", 8, 9)
+        self.cache.add(new["hall_id"], new["start_time"], new["end_time"], new["_id"])
+        self.assertTrue(self.cache.has_conflict("C", datetime(2030, 1, 1, 8), datetime(2030, 1, 1, 9)))
+
+        old = self.stored[0]
+        self.cache.move("A", old["start_time"], old["end_time"], datetime(2030, 1, 1, 14), datetime(2030, 1, 1, 15), old["_id"])
+        self.assertFalse(self.cache.has_conflict("A", datetime(2030, 1, 1, 10), datetime(2030, 1, 1, 12)))
+        self.assertTrue(self.cache.has_conflict("A", datetime(2030, 1, 1, 14), datetime(2030, 1, 1, 15)))
+
+        self.cache.remove("A", datetime(2030, 1, 1, 14), datetime(2030, 1, 1, 15), old["_id"])
+        self.assertFalse(self.cache.has_conflict("A", datetime(2030, 1, 1, 14), datetime(2030, 1, 1, 15)))
+
+    def test_04_drift_reloads_the_hall(self):
+        # written by another process, the cache does not know about it yet
+        self.stored.append(booking("A", 13, 14))
+        self.assertFalse(self.cache.has_conflict("A", datetime(2030, 1, 1, 13), datetime(2030, 1, 1, 14)))
+        self.cache.report_drift("A")
+        self.assertTrue(self.cache.has_conflict("A", datetime(2030, 1, 1, 13), datetime(2030, 1, 1, 14)))
+
+    def test_05_overlapping_stored_bookings_fall_back_to_db(self):
+        self.stored.append(booking("A", 11, 13))
+        self.cache.reload()
+        self.assertIsNone(self.cache.has_conflict("A", datetime(2030, 1, 1, 11), datetime(2030, 1, 1, 13)))
+        self.assertIsNone(self.cache.booked_halls(datetime(2030, 1, 1, 11), datetime(2030, 1, 1, 13)))
+        self.assertFalse(self.cache.has_conflict("B", datetime(2030, 1, 1, 11), datetime(2030, 1, 1, 13)))
+        self.assertIsNone(self.cache.busy_intervals(["A", "B"], datetime(2030, 1, 1, 8), datetime(2030, 1, 1, 18)))
+
+    def test_06_busy_intervals(self):
+        self.stored.append(booking("A", 14, 15))
+        self.cache.reload()
+        busy = self.cache.busy_intervals(["A", "B", "C"], datetime(2030, 1, 1, 11), datetime(2030, 1, 1, 18))
+        self.assertEqual(busy, {"A": [(datetime(2030, 1, 1, 10), datetime(2030, 1, 1, 12)), (datetime(2030, 1, 1, 14), datetime(2030, 1, 1, 15))],
+                                "B": []})
+
+    def test_07_locate(self):
+        first = self.stored[0]
+        self.assertEqual(self.cache.locate(first["_id"]), ("A", first["start_time"], first["end_time"]))
+        self.cache.move("A", first["start_time"], first["end_time"], datetime(2030, 1, 1, 14), datetime(2030, 1, 1, 15), first["_id"])
+        self.assertEqual(self.cache.locate(first["_id"]), ("A", datetime(2030, 1, 1, 14), datetime(2030, 1, 1, 15)))
+        self.cache.remove("A", datetime(2030, 1, 1, 14), datetime(2030, 1, 1, 15), first["_id"])
+        self.assertIsNone(self.cache.locate(first["_id"]))
+        self.assertIsNone(self.cache.locate(ObjectId()))
+
+    def test_08_move_removes_the_recorded_slot(self):
+        first = self.stored[0]
+        # the caller's idea of the old slot is out of date
+        self.cache.move("A", datetime(2030, 1, 1, 8), datetime(2030, 1, 1, 9), datetime(2030, 1, 1, 14), datetime(2030, 1, 1, 15), first["_id"])
+        self.assertFalse(self.cache.has_conflict("A", datetime(2030, 1, 1, 10), datetime(2030, 1, 1, 12)))
+        self.assertEqual(len(self.cache.halls["A"]), 1)
+        self.assertEqual(self.cache.locate(first["_id"]), ("A", datetime(2030, 1, 1, 14), datetime(2030, 1, 1, 15)))
+        # adding a booking already recorded elsewhere moves it
+        self.cache.add("A", datetime(2030, 1, 1, 16), datetime(2030, 1, 1, 17), first["_id"])
+        self.assertFalse(self.cache.has_conflict("A", datetime(2030, 1, 1, 14), datetime(2030, 1, 1, 15)))
+        self.assertEqual(len(self.cache.halls["A"]), 1)
+
+    def test_09_refresh_runs_in_the_background(self):
+        self.cache.refresh_interval = 0
+        self.stored.append(booking("A", 13, 14))
+        # answered from the current indexes while the reload runs
+        with self.cache.reload_lock:
+            self.assertFalse(self.cache.has_conflict("A", datetime(2030, 1, 1, 13), datetime(2030, 1, 1, 14)))
+            self.assertTrue(self.cache.refreshing)
+        for _ in range(100):
+            if not self.cache.refreshing:
+                break
+            time.sleep(0.01)
+        self.cache.refresh_interval = 60
+        self.assertTrue(self.cache.has_conflict("A", datetime(2030, 1, 1, 13), datetime(2030, 1, 1, 14)))
+
+
+if __name__ == "__main__":
+    unittest.main()
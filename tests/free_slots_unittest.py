@@ -0,0 +1,48 @@
+import unittest
+from datetime import datetime, timedelta
+from utils.free_slots import free_gaps, earliest_free_slots
+
+
+def at(hour, minute=0):
+    return datetime(2024, 8, 1, hour, minute)
+
+
+HOUR = timedelta(hours=1)
+
+
+class TestFreeSlots(unittest.TestCase):
+
+    def test_01_gaps_of_one_hall(self):
+        busy = [(at(12), at(13)), (at(9), at(10)), (at(10, 30), at(11))]
+        self.assertEqual(list(free_gaps(busy, at(8), at(18), HOUR)), [at(8), at(11), at(13)])
+        self.assertEqual(list(free_gaps(busy, at(9), at(18), HOUR)), [at(11), at(13)])
+        self.assertEqual(list(free_gaps([], at(8), at(9), HOUR)), [at(8)])
+        self.assertEqual(list(free_gaps([], at(8), at(8, 30), HOUR)), [])
+
+    def test_02_overlapping_and_outside_bookings(self):
+        # bookings overlapping each other or starting before the window
+        busy = [(at(7), at(9)), (at(8), at(10)), (at(9, 30), at(11)), (at(17, 30), at(20))]
+        self.assertEqual(list(free_gaps(busy, at(8), at(18), HOUR)), [at(11)])
+        self.assertEqual(list(free_gaps(busy, at(8), at(18), 7 * HOUR)), [])
+
+    def test_03_earliest_across_halls(self):
+        halls = [("A", 50), ("B", 100), ("C", 200)]
+        busy = {"A": [(at(8), at(12))], "B": [(at(8), at(9)), (at(10), at(11))]}
+        slots = earliest_free_slots(halls, busy, at(8), at(18), HOUR, 4)
+        self.assertEqual(slots, [(at(8), 200, "C"), (at(9), 100, "B"), (at(11), 100, "B"), (at(12), 50, "A")])
+
+    def test_04_equal_starts_prefer_small_halls(self):
+        halls = [("big", 1000), ("small", 10), ("mid", 100)]
+        slots = earliest_free_slots(halls, {}, at(8), at(18), HOUR, 2)
+        self.assertEqual([hall_id for _, _, hall_id in slots], ["small", "mid"])
+
+    def test_05_many_bookings(self):
+        # a hall booked every other half hour for a year never has a free hour
+        busy = [(at(0) + timedelta(hours=i), at(0) + timedelta(hours=i, minutes=30)) for i in range(24 * 365)]
+        end = at(0) + timedelta(days=365)
+        self.assertEqual(earliest_free_slots([("A", 10)], {"A": busy}, at(0), end, HOUR, 3), [])
+        self.assertEqual(len(earliest_free_slots([("A", 10)], {"A": busy}, at(0), end, timedelta(minutes=30), 3)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
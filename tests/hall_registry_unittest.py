@@ -0,0 +1,88 @@
+import unittest
+import logging
+import time
+from utils.hall_registry import HallRegistry
+
+
+class DictDatabase:
+    """
+    Just enough of BookingDatabase for the registry: the hall catalog in a dict.
+    """
+
+    def __init__(self, halls=None):
+        self.halls = dict(halls or {})
+        self.reads = 0
+        self.seeds = 0
+
+    def find_halls(self):
+        self.reads += 1
+        return [{"_id": hall_id, "capacity": capacity} for hall_id, capacity in self.halls.items()]
+
+    def seed_halls(self, defaults):
+        self.seeds += 1
+        if not self.halls:
+            self.halls.update(defaults)
+
+    def save_hall(self, hall_id, capacity):
+        self.halls[hall_id] = capacity
+
+    def delete_hall(self, hall_id):
+        return self.halls.pop(hall_id, None) is not None
+
+
+class TestHallRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DictDatabase()
+        self.registry = HallRegistry(self.db, logging.getLogger("hall_registry_test"))
+
+    def test_01_seeds_the_default_halls(self):
+        self.assertEqual(self.registry.reload(), 6)
+        self.assertEqual(self.registry.capacity("A"), 50)
+        self.assertEqual(self.registry.capacity("F"), 1000)
+        self.assertIsNone(self.registry.capacity("Z"))
+
+        # later reloads neither query for seeding nor refill a catalog emptied on purpose
+        self.db.halls.clear()
+        self.assertEqual(self.registry.reload(), 0)
+        self.assertEqual(self.db.seeds, 1)
+
+    def test_02_capacity_filter(self):
+        self.db.halls = {"small": 10, "mid-1": 100, "mid-2": 100, "big": 1000}
+        self.assertEqual(self.registry.with_capacity(100), [("mid-1", 100), ("mid-2", 100), ("big", 1000)])
+        self.assertEqual(self.registry.with_capacity(101), [("big", 1000)])
+        self.assertEqual(self.registry.with_capacity(0)[0], ("small", 10))
+        self.assertEqual(self.registry.with_capacity(5000), [])
+
+    def test_03_save_and_remove(self):
+        self.registry.reload()
+        self.registry.save("G", 75)
+        self.registry.save("A", 60)
+        self.assertEqual(self.registry.capacity("G"), 75)
+        self.assertEqual(self.registry.with_capacity(60)[:2], [("A", 60), ("G", 75)])
+        self.assertEqual(self.db.halls["G"], 75)
+
+        self.assertTrue(self.registry.remove("G"))
+        self.assertFalse(self.registry.remove("G"))
+        self.assertIsNone(self.registry.capacity("G"))
+
+    def test_04_reloads_after_refresh_interval(self):
+        self.registry.refresh_interval = 0.05
+        self.registry.reload()
+        self.db.halls["H"] = 20
+        self.assertIsNone(self.registry.capacity("H"))
+        time.sleep(0.06)
+        self.assertEqual(self.registry.capacity("H"), 20)
+
+    def test_05_scales_to_many_halls(self):
+        self.db.halls = {f"hall-{i}": i % 2000 + 1 for i in range(20000)}
+        self.registry.reload()
+        reads = self.db.reads
+        halls = self.registry.with_capacity(1999)
+        self.assertEqual(len(halls), 20)
+        self.assertTrue(all(capacity >= 1999 for _, capacity in halls))
+        self.assertEqual(self.db.reads, reads)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from utils.idempotency import IdempotencyStore
+
+
+class FakeDatabase:
+    """
+    The idempotency key methods of BookingDatabase, backed by a dict.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.reads = 0
+
+    def find_idempotent_result(self, key):
+        self.reads += 1
+        return self.documents.get(key)
+
+    def save_idempotent_result(self, key, fingerprint, result, expires_at):
+        if key in self.documents:
+            return False
+        # Mongo returns naive UTC datetimes
+        self.documents[key] = {"_id": key, "fingerprint": fingerprint, "result": result,
+                               "expires_at": expires_at.astimezone(timezone.utc).replace(tzinfo=None) if expires_at.tzinfo else expires_at}
+        return True
+
+
+def is_final(result):
+    return "lock" not in result
+
+
+class TestIdempotencyStore(unittest.TestCase):
+
+    def setUp(self):
+        self.db = FakeDatabase()
+        self.store = IdempotencyStore(self.db, logging.getLogger("idempotency_test"), ttl=60, max_entries=2)
+        self.runs = 0
+
+    def book(self, result="Booking successful"):
+        def run():
+            self.runs += 1
+            time.sleep(0.05)
+            return result
+        return run
+
+    def test_01_retry_returns_first_result(self):
+        first = self.store.run("k1", "book_hall", "request", self.book(), is_final)
+        second = self.store.run("k1", "book_hall", "request", self.book("Hall already booked for this slot"), is_final)
+        self.assertEqual(first, "Booking successful")
+        self.assertEqual(second, first)
+        self.assertEqual(self.runs, 1)
+        self.assertIn("k1", self.db.documents)
+
+    def test_02_key_reused_for_another_request(self):
+        self.store.run("k1", "book_hall", "request", self.book(), is_final)
+        result = self.store.run("k1", "book_hall", "other request", self.book(), is_final)
+        self.assertTrue(result.startswith("Error:"))
+        self.assertEqual(self.runs, 1)
+
+    def test_03_transient_results_are_not_stored(self):
+        self.store.run("k1", "book_hall", "request", self.book("Could not acquire lock"), is_final)
+        self.assertEqual(self.store.run("k1", "book_hall", "request", self.book(), is_final), "Booking successful")
+        self.assertEqual(self.runs, 2)
+
+    def test_04_results_are_read_back_from_the_database(self):
+        self.store.run("k1", "book_hall", "request", self.book(), is_final)
+        self.store.run("k2", "book_hall", "request", self.book(), is_final)
+        self.store.run("k3", "book_hall", "request", self.book(), is_final)
+        # k1 was evicted from memory, another process would not have it in memory either
+        reads = self.db.reads
+        self.assertEqual(self.store.run("k1", "book_hall", "request", self.book(), is_final), "Booking successful")
+        self.assertEqual(self.db.reads, reads + 1)
+        self.assertEqual(self.runs, 3)
+
+    def test_05_concurrent_retries_run_once(self):
+        results = []
+        barrier = threading.Barrier(10)
+
+        def worker():
+            barrier.wait()
+            results.append(self.store.run("k1", "book_hall", "request", self.book(), is_final))
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.runs, 1)
+        self.assertEqual(results, ["Booking successful"] * 10)
+
+    def test_06_key_stored_first_by_another_process(self):
+        later = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=60)
+        save = self.db.save_idempotent_result
+
+        def racing_save(key, fingerprint, result, expires_at):
+            # the other process stores its result between this one's lookup and its save
+            self.db.documents[key] = {"_id": key, "fingerprint": "request", "result": "Booking successful, ID 1", "expires_at": later}
+            return save(key, fingerprint, result, expires_at)
+
+        self.db.save_idempotent_result = racing_save
+        self.assertEqual(self.store.run("k1", "book_hall", "request", self.book("Booking successful, ID 2"), is_final),
+                         "Booking successful, ID 1")
+        self.assertEqual(self.store.run("k1", "book_hall", "request", self.book(), is_final), "Booking successful, ID 1")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from dotenv import load_dotenv
+from bson.objectid import ObjectId
+from datetime import date
+from controller.booking_controller import BookingController
+from models.booking import to_datetime
+
+
+load_dotenv()
+
+# plan stages reading an index, lookups by _id are planned as IDHACK or EXPRESS_IXSCAN instead of IXSCAN
+INDEX_STAGES = {"IXSCAN", "DISTINCT_SCAN", "IDHACK", "EXPRESS_IXSCAN"}
+
+def plan_stages(plan) -> list[str]:
+    """
+    Collect the stage names of every node of an explain plan tree.
+    """
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages += plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            stages += plan_stages(value)
+    return stages
+
+
+class TestBookingIndexes(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.controller = BookingController()
+        cls.db = cls.controller.db
+        cls.collection = cls.db.bookings.name
+        cls.db.ensure_indexes()
+
+    def assertIndexed(self, command):
+        explained = self.db.explain(command)
+        stages = plan_stages(explained["queryPlanner"]["winningPlan"])
+        self.assertNotIn("COLLSCAN", stages, f"{command} falls back to a collection scan: {stages}")
+        self.assertTrue(INDEX_STAGES & set(stages), f"{command} reads no index: {stages}")
+
+    def test_01_managed_indexes_exist(self):
+        indexes = self.db.bookings.index_information()
+        for name in self.db.BOOKING_INDEXES:
+            self.assertIn(name, indexes)
+
+    def test_02_book_hall_conflict_upsert(self):
+        query = self.controller._conflict_query("A", to_datetime("2024-08-01T10:00:00"), to_datetime("2024-08-01T12:00:00"))
+        self.assertIndexed({"update": self.collection, "updates": [
+            {"q": query, "u": {"$setOnInsert": {"hall_id": "A"}}, "upsert": True}]})
+
+    def test_03_update_booking_queries(self):
+        booking_id = ObjectId()
+        query = self.controller._conflict_query("A", to_datetime("2024-08-01T10:00:00"), to_datetime("2024-08-01T12:00:00"), booking_id)
+        self.assertIndexed({"find": self.collection, "filter": query, "limit": 1})
+        self.assertIndexed({"find": self.collection, "filter": {"_id": booking_id}, "limit": 1})
+        # the guarded write of the located booking
+        guard = {"_id": booking_id, "hall_id": "A", "start_time": to_datetime("2024-08-01T10:00:00"),
+                 "end_time": to_datetime("2024-08-01T12:00:00")}
+        self.assertIndexed({"findAndModify": self.collection, "query": guard,
+                            "update": {"$set": {"start_time": to_datetime("2024-08-01T11:00:00"), "seats_booked": 10}}})
+
+    def test_04_fetch_bookings(self):
+        query = self.controller._bookings_in_range_query(to_datetime("2024-08-01T00:00:00"), to_datetime("2024-08-02T23:59:59"))
+        self.assertIndexed({"find": self.collection, "filter": query})
+
+    def test_05_fetch_available_halls(self):
+        query = self.controller._overlap_query(to_datetime("2024-08-01T10:00:00"), to_datetime("2024-08-01T12:00:00"))
+        self.assertIndexed({"distinct": self.collection, "key": "hall_id", "query": query})
+
+    def test_06_fetch_bookings_page_needs_no_sort(self):
+        after = (to_datetime("2024-08-01T10:00:00"), ObjectId())
+        query = self.controller._bookings_in_range_query(to_datetime("2024-08-01T00:00:00"), to_datetime("2024-08-31T23:59:59"), after)
+        command = {"find": self.collection, "filter": query, "projection": self.controller.BOOKING_FIELDS,
+                   "sort": dict(self.controller.BOOKING_ORDER), "limit": 100}
+        self.assertIndexed(command)
+        stages = plan_stages(self.db.explain(command)["queryPlanner"]["winningPlan"])
+        self.assertNotIn("SORT", stages)
+
+    def test_07_cancel_booking(self):
+        self.assertIndexed({"findAndModify": self.collection, "query": {"_id": ObjectId()}, "remove": True})
+
+    def test_08_book_many_conflicts(self):
+        query = self.controller._spans_query({
+            "A": (to_datetime("2024-08-01T10:00:00"), to_datetime("2024-08-01T18:00:00")),
+            "B": (to_datetime("2024-08-02T09:00:00"), to_datetime("2024-08-02T10:00:00"))})
+        self.assertIndexed({"find": self.collection, "filter": query, "projection": {"hall_id": 1, "start_time": 1, "end_time": 1}})
+
+    def test_09_find_free_slots(self):
+        query = self.controller._halls_overlap_query(["A", "B", "C"], to_datetime("2024-08-01T08:00:00"), to_datetime("2024-08-05T18:00:00"))
+        self.assertIndexed({"find": self.collection, "filter": query, "projection": {"hall_id": 1, "start_time": 1, "end_time": 1}})
+
+    def test_10_calendar_load(self):
+        query = self.controller.occupancy.load_query([date(2024, 8, 1), date(2024, 8, 7)])
+        self.assertIndexed({"find": self.collection, "filter": query, "projection": {"hall_id": 1, "start_time": 1, "end_time": 1}})
+
+
+if __name__ == '__main__':
+    unittest.main()
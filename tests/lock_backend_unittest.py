@@ -0,0 +1,44 @@
+import unittest
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+from database.db_module import BookingDatabase
+from utils.lock_backends import MongoLeaseLockBackend
+
+
+load_dotenv()
+
+class TestMongoLeaseLockBackend(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.leases = BookingDatabase().leases
+        cls.leases.delete_many({"_id": {"$regex": "^lease-test"}})
+        # two backends stand in for two API processes sharing the collection
+        cls.first = MongoLeaseLockBackend(cls.leases)
+        cls.second = MongoLeaseLockBackend(cls.leases)
+
+    def test_01_overlapping_lease_is_exclusive_across_processes(self):
+        start, end = datetime(2030, 1, 1, 10), datetime(2030, 1, 1, 11)
+        self.assertTrue(self.first.acquire("lease-test-1", start, end, time.monotonic() + 1))
+        self.assertFalse(self.second.acquire("lease-test-1", datetime(2030, 1, 1, 10, 30), end, time.monotonic() + 0.1))
+        self.assertTrue(self.second.acquire("lease-test-1", end, datetime(2030, 1, 1, 12), time.monotonic() + 1))
+
+        self.assertTrue(self.first.release("lease-test-1", start, end))
+        self.assertTrue(self.second.acquire("lease-test-1", datetime(2030, 1, 1, 10, 30), end, time.monotonic() + 1))
+
+    def test_02_only_the_owner_releases(self):
+        start, end = datetime(2030, 1, 1, 10), datetime(2030, 1, 1, 11)
+        self.assertTrue(self.first.acquire("lease-test-2", start, end, time.monotonic() + 1))
+        self.assertFalse(self.second.release("lease-test-2", start, end))
+        self.assertTrue(self.first.release("lease-test-2", start, end))
+
+    def test_03_expired_lease_does_not_block(self):
+        short_lived = MongoLeaseLockBackend(self.leases, ttl=0.2)
+        start, end = datetime(2030, 1, 1, 10), datetime(2030, 1, 1, 11)
+        self.assertTrue(short_lived.acquire("lease-test-3", start, end, time.monotonic() + 1))
+        self.assertTrue(self.second.acquire("lease-test-3", start, end, time.monotonic() + 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
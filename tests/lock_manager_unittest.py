@@ -0,0 +1,218 @@
+import unittest
+import logging
+import tracemalloc
+import threading
+import time
+from utils.interval_index import IntervalIndex
+from utils.lock_manager import LockManager
+from benchmarks.lock_manager_soak import soak
+
+
+class TestIntervalIndex(unittest.TestCase):
+
+    def test_01_overlap_queries(self):
+        index = IntervalIndex()
+        index.add(10, 20, "a")
+        index.add(30, 40, "b")
+        index.add(20, 30, "c")
+
+        self.assertTrue(index.overlaps(15, 16))
+        self.assertTrue(index.overlaps(0, 100))
+        self.assertFalse(index.overlaps(0, 10))
+        self.assertFalse(index.overlaps(40, 50))
+        self.assertEqual([value for _, _, value in index.overlapping(19, 31)], ["a", "c", "b"])
+
+    def test_02_rejects_overlapping_insert(self):
+        index = IntervalIndex()
+        index.add(10, 20)
+        with self.assertRaises(ValueError):
+            index.add(15, 25)
+        with self.assertRaises(ValueError):
+            index.add(5, 5)
+
+    def test_03_remove(self):
+        index = IntervalIndex()
+        index.add(10, 20, "a")
+        with self.assertRaises(KeyError):
+            index.remove(10, 19)
+        self.assertEqual(index.remove(10, 20), "a")
+        self.assertEqual(len(index), 0)
+
+
+class TestLockManager(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.manager = LockManager()
+
+    def test_01_non_overlapping_slots(self):
+        hall_id = "lock-test-1"
+        self.assertTrue(self.manager.acquire_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00"))
+        self.assertTrue(self.manager.acquire_lock(hall_id, "2030-01-01T11:00", "2030-01-01T12:00"))
+        self.manager.release_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00")
+        self.manager.release_lock(hall_id, "2030-01-01T11:00", "2030-01-01T12:00")
+
+    def test_02_overlapping_slot_times_out(self):
+        hall_id = "lock-test-2"
+        self.assertTrue(self.manager.acquire_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00"))
+        self.assertFalse(self.manager.acquire_lock(hall_id, "2030-01-01T10:30", "2030-01-01T11:30", timeout=0.05))
+        self.manager.release_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00")
+        self.assertTrue(self.manager.acquire_lock(hall_id, "2030-01-01T10:30", "2030-01-01T11:30", timeout=0.05))
+        self.manager.release_lock(hall_id, "2030-01-01T10:30", "2030-01-01T11:30")
+
+    def test_03_concurrent_overlapping_requests_are_exclusive(self):
+        hall_id = "lock-test-3"
+        holders = 0
+        max_holders = 0
+        counter_lock = threading.Lock()
+
+        def worker():
+            nonlocal holders, max_holders
+            if self.manager.acquire_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00"):
+                with counter_lock:
+                    holders += 1
+                    max_holders = max(max_holders, holders)
+                with counter_lock:
+                    holders -= 1
+                self.manager.release_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00")
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(max_holders, 1)
+
+    def test_04_waiter_wakes_up_on_release(self):
+        hall_id = "lock-test-4"
+        self.assertTrue(self.manager.acquire_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00"))
+        threading.Timer(0.05, self.manager.release_lock, args=(hall_id, "2030-01-01T10:00", "2030-01-01T11:00")).start()
+
+        started = time.monotonic()
+        self.assertTrue(self.manager.acquire_lock(hall_id, "2030-01-01T10:30", "2030-01-01T11:30", timeout=5))
+        self.assertLess(time.monotonic() - started, 1)
+        self.manager.release_lock(hall_id, "2030-01-01T10:30", "2030-01-01T11:30")
+
+    def test_05_timeout_is_a_real_deadline(self):
+        hall_id = "lock-test-5"
+        self.assertTrue(self.manager.acquire_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00"))
+
+        started = time.monotonic()
+        self.assertFalse(self.manager.acquire_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00", timeout=0.2))
+        elapsed = time.monotonic() - started
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertLess(elapsed, 0.5)
+        self.manager.release_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00")
+
+    def test_06_stats_report_live_locks_and_waiters(self):
+        hall_id = "lock-test-6"
+        baseline = self.manager.stats()
+        self.assertTrue(self.manager.acquire_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00"))
+        waiter = threading.Thread(target=self.manager.acquire_lock, args=(hall_id, "2030-01-01T10:00", "2030-01-01T11:00", 0.5))
+        waiter.start()
+        time.sleep(0.1)
+
+        stats = self.manager.stats()
+        self.assertEqual(stats["locks"], baseline["locks"] + 1)
+        self.assertEqual(stats["waiters"], baseline["waiters"] + 1)
+        self.assertEqual(stats["halls"], baseline["halls"] + 1)
+
+        waiter.join()
+        self.manager.release_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00")
+        self.assertEqual(self.manager.stats(), baseline)
+
+    def test_07_soak_keeps_memory_flat(self):
+        logger = logging.getLogger("lock_manager.log")
+        level = logger.level
+        logger.setLevel(logging.ERROR)
+        try:
+            baseline = self.manager.stats()
+            soak(self.manager, 2000)
+
+            tracemalloc.start()
+            soak(self.manager, 2000)
+            warmed_up, _ = tracemalloc.get_traced_memory()
+            soak(self.manager, 10000)
+            finished, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            logger.setLevel(level)
+
+        self.assertEqual(self.manager.stats(), baseline)
+        self.assertLess(finished - warmed_up, 64 * 1024)
+
+    def test_08_contention_reports_waits_holds_and_timeouts(self):
+        hall_id = "lock-test-8"
+        self.assertTrue(self.manager.acquire_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00"))
+        waiter = threading.Thread(target=self.manager.acquire_lock, args=(hall_id, "2030-01-01T10:30", "2030-01-01T11:30", 1))
+        waiter.start()
+        time.sleep(0.1)
+
+        hall = next(hall for hall in self.manager.contention(100)["halls"] if hall["hall_id"] == hall_id)
+        self.assertEqual(hall["waiting"], 1)
+
+        self.assertFalse(self.manager.acquire_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00", timeout=0.05))
+        self.manager.release_lock(hall_id, "2030-01-01T10:00", "2030-01-01T11:00")
+        waiter.join()
+        self.manager.release_lock(hall_id, "2030-01-01T10:30", "2030-01-01T11:30")
+
+        report = self.manager.contention(100)
+        hall = next(hall for hall in report["halls"] if hall["hall_id"] == hall_id)
+        self.assertEqual(hall["waiting"], 0)
+        self.assertEqual(hall["acquired"], 2)
+        self.assertEqual(hall["timeouts"], 1)
+        self.assertEqual(hall["contended"], 2)
+        self.assertGreaterEqual(hall["max_wait_ms"], 100)
+        self.assertGreaterEqual(hall["max_hold_ms"], 100)
+        windows = {(window["hall_id"], window["start_time"]) for window in report["windows"]}
+        self.assertIn((hall_id, "2030-01-01T10:00:00"), windows)
+        self.assertIn((hall_id, "2030-01-01T10:30:00"), windows)
+
+    def test_09_acquire_locks_is_all_or_nothing(self):
+        baseline = self.manager.stats()
+        self.assertTrue(self.manager.acquire_lock("lock-test-9b", "2030-01-01T10:00", "2030-01-01T11:00"))
+        ranges = [("lock-test-9b", "2030-01-01T10:00", "2030-01-01T11:00"), ("lock-test-9a", "2030-01-01T10:00", "2030-01-01T11:00")]
+        self.assertFalse(self.manager.acquire_locks(ranges, timeout=0.05))
+        # the lock of the first hall was given back
+        self.assertTrue(self.manager.acquire_lock("lock-test-9a", "2030-01-01T10:00", "2030-01-01T11:00", timeout=0.05))
+        self.manager.release_lock("lock-test-9a", "2030-01-01T10:00", "2030-01-01T11:00")
+        self.manager.release_lock("lock-test-9b", "2030-01-01T10:00", "2030-01-01T11:00")
+
+        with self.manager.locked(ranges) as acquired:
+            self.assertTrue(acquired)
+            self.assertFalse(self.manager.acquire_lock("lock-test-9a", "2030-01-01T10:30", "2030-01-01T10:45", timeout=0.05))
+        self.assertEqual(self.manager.stats(), baseline)
+
+    def test_10_overlapping_ranges_are_merged(self):
+        hall_id = "lock-test-10"
+        ranges = [(hall_id, "2030-01-01T12:00", "2030-01-01T14:00"), (hall_id, "2030-01-01T10:00", "2030-01-01T13:00")]
+        with self.manager.locked(ranges, timeout=0.2) as acquired:
+            self.assertTrue(acquired)
+            self.assertFalse(self.manager.acquire_lock(hall_id, "2030-01-01T13:30", "2030-01-01T15:00", timeout=0.05))
+        self.assertTrue(self.manager.acquire_lock(hall_id, "2030-01-01T10:00", "2030-01-01T14:00", timeout=0.05))
+        self.manager.release_lock(hall_id, "2030-01-01T10:00", "2030-01-01T14:00")
+
+    def test_11_crossing_requests_do_not_deadlock(self):
+        first = [("lock-test-11a", "2030-01-01T10:00", "2030-01-01T11:00"), ("lock-test-11b", "2030-01-01T10:00", "2030-01-01T11:00")]
+        second = list(reversed(first))
+        acquired = []
+
+        def worker(ranges):
+            for _ in range(50):
+                with self.manager.locked(ranges, timeout=2) as held:
+                    acquired.append(held)
+
+        threads = [threading.Thread(target=worker, args=(ranges,)) for ranges in (first, second)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(acquired))
+        self.assertEqual(len(acquired), 100)
+        self.assertLess(time.monotonic() - started, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from benchmarks.log_workload import LogParser
+
+
+LOG = """\
+2024-08-21 12:50:28,000 - INFO - Received booking request: Hall A, Start: 2024-08-09T06:00, End: 2024-08-09T07:00, capacity: 40
+2024-08-21 12:50:28,005 - INFO - Booking successful for hall A. Booking ID: 220c9f
+2024-08-21 12:50:28,100 - INFO - Received booking request: Hall A, Start: 2024-08-09T06:30, End: 2024-08-09T07:00
+2024-08-21 12:50:28,102 - INFO - Booking Unsuccessful for hall A. Hall already booked!
+2024-08-21 12:50:28,200 - INFO - Received fetch available hall request: Start: 2024-08-09T06:00, End: 2024-08-09T07:00
+2024-08-21 12:50:28,300 - INFO - Received update request: Booking ID: 220c9f, New Start: 2024-09-09T16:00, New End: 2024-09-09T17:00
+2024-08-21 12:50:28,310 - ERROR - Update: Lock aquire failed, Booking ID: 220c9f, Start: 2024-09-09T16:00, End: 2024-09-09T17:00
+2024-08-21 12:50:28,400 - INFO - Received cancellation request: Booking ID: 220c9f
+2024-08-21 15:00:00,000 - INFO - Received fetch bookings request: Start: 2024-08-01, End: 2024-08-02
+2024-08-21 15:00:00,003 - INFO - Fetch bookings success: Start: 2024-08-01, End: 2024-08-02
+not a log line
+"""
+
+
+class TestLogParser(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = LogParser(max_gap=1.0)
+        for line in LOG.splitlines():
+            self.parser.feed(line)
+        self.events = self.parser.events
+
+    def test_01_requests_become_events(self):
+        self.assertEqual([event["op"] for event in self.events], ["book", "book", "fetch", "update", "cancel", "fetch_bookings"])
+        self.assertEqual(self.events[0]["capacity"], 40)
+        self.assertEqual(self.events[1]["capacity"], 1)
+        self.assertEqual(self.events[3]["start_time"], "2024-09-09T16:00")
+        self.assertEqual(self.events[4]["booking_id"], "220c9f")
+        self.assertEqual(self.events[5]["start_date"], "2024-08-01")
+
+    def test_02_results_are_matched_to_requests(self):
+        self.assertEqual(self.events[0]["recorded"], {"outcome": "success", "latency_ms": 5.0})
+        self.assertEqual(self.events[0]["booking_id"], "220c9f")
+        self.assertEqual(self.events[1]["recorded"]["outcome"], "conflict")
+        self.assertEqual(self.events[3]["recorded"], {"outcome": "lock_timeout", "latency_ms": 10.0})
+        self.assertEqual(self.events[5]["recorded"]["outcome"], "success")
+        self.assertNotIn("recorded", self.events[2])
+
+    def test_03_long_gaps_are_shortened(self):
+        self.assertAlmostEqual(self.events[4]["t"], 0.4)
+        self.assertAlmostEqual(self.events[5]["t"], 1.4)
+
+    def test_04_unmatched_requests_expire(self):
+        parser = LogParser(match_window=30)
+        parser.feed("2024-08-21 12:00:00,000 - INFO - Received booking request: Hall B, Start: 2024-08-09T06:00, End: 2024-08-09T07:00")
+        parser.feed("2024-08-21 12:10:00,000 - INFO - Received booking request: Hall B, Start: 2024-08-09T08:00, End: 2024-08-09T09:00")
+        parser.feed("2024-08-21 12:10:00,004 - INFO - Booking successful for hall B. Booking ID: 66d0")
+        self.assertNotIn("recorded", parser.events[0])
+        self.assertEqual(parser.events[1]["recorded"], {"outcome": "success", "latency_ms": 4.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import logging
+import os
+import tempfile
+import threading
+from utils import logger as logger_module
+from utils.logger import setup_logger, shutdown_logging, HOT_PATH
+
+
+class TestLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        shutdown_logging()
+        # forget the loggers of the temporary files, the application's own loggers stay
+        for name in [name for name in logger_module._file_handlers if name.startswith(self.directory.name)]:
+            logger_module._file_handlers.pop(name).close()
+            logging.getLogger(name).handlers.clear()
+        self.directory.cleanup()
+
+    def read(self, name) -> list[str]:
+        shutdown_logging()
+        with open(os.path.join(self.directory.name, name)) as log_file:
+            return log_file.read().splitlines()
+
+    def test_01_setup_is_idempotent(self):
+        path = os.path.join(self.directory.name, "idempotent.log")
+        logger = setup_logger(path)
+        self.assertIs(setup_logger(path), logger)
+        self.assertEqual(len(logger.handlers), 1)
+
+        logger.info("only once")
+        self.assertEqual(len(self.read("idempotent.log")), 1)
+
+    def test_02_records_go_to_their_own_file(self):
+        first = setup_logger(os.path.join(self.directory.name, "first.log"))
+        second = setup_logger(os.path.join(self.directory.name, "second.log"))
+        first.info("first message")
+        second.error("second message")
+
+        self.assertEqual(len(self.read("first.log")), 1)
+        self.assertIn("INFO - first message", self.read("first.log")[0])
+        self.assertEqual(len(self.read("second.log")), 1)
+        self.assertIn("ERROR - second message", self.read("second.log")[0])
+
+    def test_03_level_and_sampling(self):
+        logger = setup_logger(os.path.join(self.directory.name, "sampled.log"), level=logging.INFO, sample_rate=0)
+        logger.debug("below level")
+        logger.info("hot path", extra=HOT_PATH)
+        logger.info("regular")
+        logger.error("hot path error", extra=HOT_PATH)
+
+        lines = self.read("sampled.log")
+        self.assertEqual(len(lines), 2)
+        self.assertIn("regular", lines[0])
+        self.assertIn("hot path error", lines[1])
+
+    def test_04_concurrent_writers_keep_every_record(self):
+        logger = setup_logger(os.path.join(self.directory.name, "concurrent.log"))
+
+        def write(thread_id):
+            for i in range(500):
+                logger.info(f"thread {thread_id} record {i}")
+
+        threads = [threading.Thread(target=write, args=(thread_id,)) for thread_id in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.read("concurrent.log")), 4000)
+
+    def test_05_logging_after_shutdown_restarts_the_writer(self):
+        logger = setup_logger(os.path.join(self.directory.name, "restarted.log"))
+        logger.info("before shutdown")
+        shutdown_logging()
+        logger.info("after shutdown")
+
+        lines = self.read("restarted.log")
+        self.assertEqual(len(lines), 2)
+        self.assertIn("after shutdown", lines[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
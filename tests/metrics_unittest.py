@@ -0,0 +1,84 @@
+import unittest
+import threading
+from utils.metrics import Metrics
+from controller.booking_controller import booking_outcome
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_01_singleton(self):
+        self.assertIs(Metrics(), self.metrics)
+
+    def test_02_counters_add_up_across_threads(self):
+        def work():
+            for _ in range(1000):
+                self.metrics.inc("test_threads_total", endpoint="book_hall")
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        counters = self.metrics.snapshot()["counters"]
+        self.assertEqual(counters[("test_threads_total", (("endpoint", "book_hall"),))], 8000)
+
+    def test_03_render_counter(self):
+        self.metrics.describe("test_render_total", "counter", "Rendered counter.")
+        self.metrics.inc("test_render_total", outcome="success", operation="book_hall")
+        self.metrics.inc("test_render_total", 2, outcome="success", operation="book_hall")
+
+        output = self.metrics.render()
+        self.assertIn("# HELP test_render_total Rendered counter.\n", output)
+        self.assertIn("# TYPE test_render_total counter\n", output)
+        self.assertIn('test_render_total{operation="book_hall",outcome="success"} 3\n', output)
+
+    def test_04_render_histogram(self):
+        self.metrics.observe("test_latency_seconds", 0.003, endpoint="fetch_available")
+        self.metrics.observe("test_latency_seconds", 20, endpoint="fetch_available")
+        with self.metrics.timer("test_latency_seconds", endpoint="fetch_available"):
+            pass
+
+        output = self.metrics.render()
+        self.assertIn('test_latency_seconds_bucket{endpoint="fetch_available",le="0.0025"} 1\n', output)
+        self.assertIn('test_latency_seconds_bucket{endpoint="fetch_available",le="0.005"} 2\n', output)
+        self.assertIn('test_latency_seconds_bucket{endpoint="fetch_available",le="10.0"} 2\n', output)
+        self.assertIn('test_latency_seconds_bucket{endpoint="fetch_available",le="+Inf"} 3\n', output)
+        self.assertIn('test_latency_seconds_count{endpoint="fetch_available"} 3\n', output)
+
+    def test_05_label_values_are_escaped(self):
+        self.metrics.inc("test_escape_total", hall='A"\\')
+        self.assertIn('test_escape_total{hall="A\\"\\\\"} 1\n', self.metrics.render())
+
+    def test_06_booking_outcomes(self):
+        self.assertEqual(booking_outcome("Booking successful for hall A. Booking ID: 1"), "success")
+        self.assertEqual(booking_outcome("Booking with ID 1 has been updated successfully."), "success")
+        self.assertEqual(booking_outcome("Hall already booked for this slot"), "conflict")
+        self.assertEqual(booking_outcome("The new time slot is not available for the selected hall."), "conflict")
+        self.assertEqual(booking_outcome("Could not acquire lock for the given time slot"), "lock_timeout")
+        self.assertEqual(booking_outcome("Error: This hall does not have required capacity"), "invalid")
+        self.assertEqual(booking_outcome("Booking failed, please try again"), "error")
+
+    def test_07_ended_threads_leave_no_shards(self):
+        shards = len(self.metrics.shards)
+
+        def work():
+            self.metrics.inc("test_short_lived_total")
+            self.metrics.observe("test_short_lived_seconds", 0.01)
+
+        for _ in range(50):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+
+        self.assertLessEqual(len(self.metrics.shards), shards)
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["counters"][("test_short_lived_total", ())], 50)
+        self.assertEqual(snapshot["histograms"][("test_short_lived_seconds", ())][0], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
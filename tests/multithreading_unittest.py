@@ -107,6 +107,27 @@ class TestBookingConcurrency(unittest.TestCase):
         # self.assertTrue(True)  # If no exceptions were raised, the updates were successful
         self.assertEqual(successfull_update_count,1)
 
+    def test_04_crossing_updates_do_not_deadlock(self):
+        first = self.controller.book_hall("C", "2024-10-10T10:00", "2024-10-10T11:00", 100)[-24:]
+        second = self.controller.book_hall("C", "2024-10-10T12:00", "2024-10-10T13:00", 100)[-24:]
+        results = {}
+
+        def update_booking(booking_id, new_start_time, new_end_time):
+            results[booking_id] = self.controller.update_booking(booking_id, new_start_time, new_end_time, 100)
+
+        # each update needs its own slot and a slot overlapping the other booking
+        threads = [threading.Thread(target=update_booking, args=(first, "2024-10-10T12:30", "2024-10-10T13:30")),
+                   threading.Thread(target=update_booking, args=(second, "2024-10-10T10:30", "2024-10-10T11:30"))]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(results[first], "The new time slot is not available for the selected hall.")
+        self.assertEqual(results[second], "The new time slot is not available for the selected hall.")
+
 if __name__ == "__main__":
     service = BookingController()
     service.delete_all_bookings()
@@ -0,0 +1,80 @@
+import unittest
+import logging
+from datetime import date, datetime
+from utils.occupancy import OccupancyCalendar
+
+
+class RangeDatabase:
+    """
+    Just enough of BookingDatabase for the calendar: a time range find over an in-memory list of bookings.
+    """
+
+    def __init__(self, bookings):
+        self.bookings = bookings
+        self.queries = 0
+
+    def find(self, query, projection=None):
+        self.queries += 1
+        return [booking for booking in self.bookings
+                if booking["start_time"] < query["start_time"]["$lt"] and booking["end_time"] > query["end_time"]["$gt"]]
+
+
+def booking(hall_id, start, end) -> dict:
+    return {"hall_id": hall_id, "start_time": datetime.fromisoformat(start), "end_time": datetime.fromisoformat(end)}
+
+
+DAY = date(2030, 1, 1)
+NEXT_DAY = date(2030, 1, 2)
+
+
+class TestOccupancyCalendar(unittest.TestCase):
+
+    def setUp(self):
+        self.db = RangeDatabase([booking("A", "2030-01-01T10:00:00", "2030-01-01T12:00:00"),
+                                 booking("B", "2030-01-01T23:00:00", "2030-01-02T01:30:00")])
+        self.calendar = OccupancyCalendar(self.db, logging.getLogger("occupancy_test"))
+
+    def test_01_bitmaps_at_several_granularities(self):
+        hours = self.calendar.bitmaps(["A", "B", "C"], [DAY, NEXT_DAY], 60)
+        self.assertEqual(hours["A"]["2030-01-01"], "0" * 10 + "11" + "0" * 12)
+        self.assertEqual(hours["B"]["2030-01-01"], "0" * 23 + "1")
+        self.assertEqual(hours["B"]["2030-01-02"], "11" + "0" * 22)
+        self.assertEqual(hours["C"]["2030-01-02"], "0" * 24)
+        quarters = self.calendar.bitmaps(["B"], [NEXT_DAY], 15)
+        self.assertEqual(quarters["B"]["2030-01-02"], "1" * 6 + "0" * 90)
+        self.assertEqual(self.db.queries, 1)
+
+    def test_02_partial_slots_are_busy(self):
+        self.calendar.bitmaps(["A"], [DAY], 60)
+        self.calendar.add("A", datetime(2030, 1, 1, 14, 50), datetime(2030, 1, 1, 15, 10))
+        self.assertEqual(self.calendar.bitmaps(["A"], [DAY], 60)["A"]["2030-01-01"], "0" * 10 + "11" + "00" + "11" + "0" * 8)
+
+    def test_03_incremental_updates(self):
+        self.calendar.bitmaps(["A"], [DAY], 30)
+        # two bookings sharing the 12:00 slot, cancelling one keeps the slot busy
+        self.calendar.add("A", datetime(2030, 1, 1, 12, 0), datetime(2030, 1, 1, 12, 10))
+        self.calendar.remove("A", datetime(2030, 1, 1, 10), datetime(2030, 1, 1, 12))
+        self.assertEqual(self.calendar.bitmaps(["A"], [DAY], 30)["A"]["2030-01-01"], "0" * 24 + "1" + "0" * 23)
+        self.calendar.move("A", datetime(2030, 1, 1, 12, 0), datetime(2030, 1, 1, 12, 10), datetime(2030, 1, 1, 0), datetime(2030, 1, 1, 0, 30))
+        self.assertEqual(self.calendar.bitmaps(["A"], [DAY], 30)["A"]["2030-01-01"], "1" + "0" * 47)
+        self.assertEqual(self.db.queries, 1)
+
+    def test_04_stale_and_evicted_days_are_reloaded(self):
+        self.calendar.max_days = 1
+        self.calendar.bitmaps(["A"], [DAY], 60)
+        self.calendar.bitmaps(["A"], [NEXT_DAY], 60)
+        self.calendar.bitmaps(["A"], [DAY], 60)
+        self.assertEqual(self.db.queries, 3)
+        self.calendar.refresh_interval = -1
+        self.calendar.bitmaps(["A"], [DAY], 60)
+        self.assertEqual(self.db.queries, 4)
+
+    def test_05_invalid_granularity(self):
+        with self.assertRaises(ValueError):
+            self.calendar.bitmaps(["A"], [DAY], 7)
+        with self.assertRaises(ValueError):
+            self.calendar.bitmaps(["A"], [DAY], 25)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from datetime import datetime
+from models.recurrence import expand, parse_rule, MAX_OCCURRENCES
+
+
+class TestRecurrence(unittest.TestCase):
+
+    def test_01_parse_rrule_string(self):
+        rule = parse_rule("RRULE:FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=2024-12-20")
+        self.assertEqual(rule, {"freq": "WEEKLY", "byday": ["MO", "WE"], "until": "2024-12-20"})
+        self.assertEqual(parse_rule({"FREQ": "daily", "COUNT": 3}), {"freq": "daily", "count": 3})
+
+    def test_02_weekly_for_a_year(self):
+        occurrences = expand("2024-01-01T10:00:00", "2024-01-01T12:00:00", {"freq": "weekly", "count": 52})
+        self.assertEqual(len(occurrences), 52)
+        self.assertEqual(occurrences[0], (datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 12)))
+        self.assertEqual(occurrences[-1][0], datetime(2024, 12, 23, 10))
+        self.assertTrue(all(end - start == occurrences[0][1] - occurrences[0][0] for start, end in occurrences))
+
+    def test_03_byday_until_and_exdate(self):
+        # Mondays and Wednesdays of a semester, skipping a holiday, until is inclusive
+        occurrences = expand("2024-09-02T09:00:00", "2024-09-02T10:00:00",
+                             "FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=2024-09-18;EXDATE=2024-09-11")
+        self.assertEqual([start.day for start, _ in occurrences], [2, 4, 9, 16, 18])
+
+    def test_04_daily_interval(self):
+        occurrences = expand("2024-03-01T08:00:00", "2024-03-01T09:00:00", {"freq": "daily", "interval": 2, "count": 3})
+        self.assertEqual([start.day for start, _ in occurrences], [1, 3, 5])
+
+    def test_05_custom_dates(self):
+        occurrences = expand("2024-05-01T18:00:00", "2024-05-01T20:00:00",
+                             {"freq": "custom", "dates": ["2024-05-20T18:00:00", "2024-05-06T18:00:00"]})
+        self.assertEqual(occurrences, [(datetime(2024, 5, 6, 18), datetime(2024, 5, 6, 20)),
+                                       (datetime(2024, 5, 20, 18), datetime(2024, 5, 20, 20))])
+
+    def test_06_invalid_rules(self):
+        with self.assertRaises(ValueError):
+            expand("2024-01-01T10:00:00", "2024-01-01T12:00:00", {"freq": "weekly"})
+        with self.assertRaises(ValueError):
+            expand("2024-01-01T10:00:00", "2024-01-01T12:00:00", {"freq": "monthly", "count": 2})
+        with self.assertRaises(ValueError):
+            expand("2024-01-01T12:00:00", "2024-01-01T10:00:00", {"freq": "daily", "count": 2})
+        with self.assertRaises(ValueError):
+            expand("2024-01-01T10:00:00", "2024-01-01T12:00:00", {"freq": "daily", "until": "2099-01-01"})
+        with self.assertRaises(ValueError):
+            expand("2024-01-01T10:00:00", "2024-01-01T12:00:00", {"freq": "daily", "count": MAX_OCCURRENCES + 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
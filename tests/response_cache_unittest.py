@@ -0,0 +1,142 @@
+import unittest
+import itertools
+import logging
+import time
+from datetime import datetime
+from bson.objectid import ObjectId
+from controller.booking_controller import BookingController
+from utils.booking_cache import BookingCache
+from utils.metrics import Metrics
+from utils.occupancy import OccupancyCalendar
+from utils.response_cache import ResponseCache, MISS
+
+
+class EmptyDatabase:
+    """
+    Just enough of BookingDatabase for the booking cache and the occupancy maps: no bookings stored.
+    """
+
+    def find(self, query, projection=None):
+        return []
+
+
+class FixedHalls:
+    """
+    Just enough of HallRegistry for fetch_available_halls.
+    """
+
+    def __init__(self, halls):
+        self.halls = halls
+
+    def with_capacity(self, capacity):
+        return [(hall_id, seats) for hall_id, seats in self.halls if seats >= capacity]
+
+
+def offline_controller() -> BookingController:
+    """
+    A controller answering fetch_available_halls from its caches, without Mongo.
+    """
+    controller = object.__new__(BookingController)
+    controller.logger = logging.getLogger("response_cache_test")
+    controller.metrics = Metrics()
+    controller.db = EmptyDatabase()
+    controller.hall_registry = FixedHalls([("A", 50), ("B", 100)])
+    controller.booking_cache = BookingCache(controller.db, controller.logger)
+    controller.booking_cache.reload()
+    controller.occupancy = OccupancyCalendar(controller.db, controller.logger)
+    controller.response_cache = ResponseCache(ttl=60)
+    controller.single_flight = None
+    controller.write_counter = itertools.count(1)
+    controller.write_sequence = 0
+    return controller
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(max_entries=3, ttl=60)
+        self.halls = ["A", "B", "C"]
+
+    def store(self, key, value, halls=None):
+        halls = halls or self.halls
+        self.cache.put(key, self.cache.snapshot(halls), value)
+
+    def test_01_hit_and_miss(self):
+        self.assertIs(self.cache.get("morning", self.halls), MISS)
+        self.store("morning", [])
+        self.assertEqual(self.cache.get("morning", self.halls), [])
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_02_writes_invalidate_dependent_entries(self):
+        self.store("all halls", ["A"])
+        self.store("big halls", ["C"], ["C"])
+        self.cache.bump("A")
+        self.assertIs(self.cache.get("all halls", self.halls), MISS)
+        self.assertEqual(self.cache.get("big halls", ["C"]), ["C"])
+        self.assertEqual(self.cache.stats()["stale"], 1)
+
+        self.cache.bump()
+        self.assertIs(self.cache.get("big halls", ["C"]), MISS)
+
+    def test_03_write_during_computation(self):
+        # the snapshot is taken before reading, the entry never becomes servable
+        snapshot = self.cache.snapshot(self.halls)
+        self.cache.bump("B")
+        self.cache.put("racing", snapshot, ["B"])
+        self.assertIs(self.cache.get("racing", self.halls), MISS)
+
+    def test_04_changed_halls_invalidate(self):
+        self.store("window", ["A"])
+        self.assertIs(self.cache.get("window", ["A", "B", "C", "D"]), MISS)
+
+    def test_05_bounded_lru(self):
+        for key in ("a", "b", "c"):
+            self.store(key, key)
+        self.cache.get("a", self.halls)
+        self.store("d", "d")
+        self.assertIs(self.cache.get("b", self.halls), MISS)
+        self.assertEqual(self.cache.get("a", self.halls), "a")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.assertEqual(self.cache.stats()["size"], 3)
+
+    def test_06_ttl(self):
+        self.cache.ttl = 0.05
+        self.store("window", ["A"])
+        time.sleep(0.06)
+        self.assertIs(self.cache.get("window", self.halls), MISS)
+        self.assertEqual(self.cache.stats()["expired"], 1)
+
+
+class TestFetchAvailableInvalidation(unittest.TestCase):
+
+    def test_01_reads_racing_a_write_are_not_served_after_it(self):
+        controller = offline_controller()
+        start, end = datetime(2030, 1, 1, 10), datetime(2030, 1, 1, 11)
+
+        def read():
+            return [hall["hall_id"] for hall in controller.fetch_available_halls(start.isoformat(), end.isoformat(), 10)]
+
+        self.assertEqual(read(), ["A", "B"])
+        # a concurrent read at every step of the write: before the booking cache has it, and
+        # between the booking cache update and the invalidation
+        add = controller.booking_cache.add
+        invalidate = controller._invalidate_responses
+
+        def add_after_read(*args):
+            read()
+            add(*args)
+
+        def invalidate_after_read(*args):
+            read()
+            invalidate(*args)
+
+        controller.booking_cache.add = add_after_read
+        controller._invalidate_responses = invalidate_after_read
+        controller._on_booked("A", start, end, ObjectId())
+        self.assertEqual(read(), ["B"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 from dotenv import load_dotenv
 import os
+from datetime import datetime
+from bson.objectid import ObjectId
 from controller.booking_controller import BookingController
 
 
@@ -46,6 +48,114 @@ class TestBookingcontroller(unittest.TestCase):
         result = self.controller.cancel_booking(self.__class__.test_booking_id)
         self.assertIn("cancelled successfully", result)
 
+    def test_07_book_many(self):
+        bookings = [
+            {"hall_id": "D", "start_time": "2024-10-01T10:00:00", "end_time": "2024-10-01T12:00:00","capacity":300},
+            {"hall_id": "D", "start_time": "2024-10-01T11:00:00", "end_time": "2024-10-01T13:00:00","capacity":300},
+            {"hall_id": "E", "start_time": "2024-10-01T10:00:00", "end_time": "2024-10-01T12:00:00","capacity":300}
+        ]
+        # the two D bookings overlap, so an atomic batch stores nothing
+        results = self.controller.book_many(bookings, atomic=True)
+        self.assertFalse(any("successful" in result for result in results))
+
+        results = self.controller.book_many(bookings)
+        self.assertIn("successful", results[0])
+        self.assertIn("already booked", results[1])
+        self.assertIn("successful", results[2])
+
+    def test_08_fetch_bookings_pages(self):
+        all_bookings = self.controller.fetch_bookings("2024-07-01", "2024-12-31")
+        paged = []
+        cursor = None
+        while True:
+            page = self.controller.fetch_bookings_page("2024-07-01", "2024-12-31", limit=2, cursor=cursor)
+            paged += page["bookings"]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(sorted(booking["_id"] for booking in paged), sorted(booking["_id"] for booking in all_bookings))
+        self.assertEqual(paged, sorted(paged, key=lambda booking: (booking["start_time"], booking["_id"])))
+        self.assertIn("Error", self.controller.fetch_bookings_page("2024-07-01", "2024-12-31", limit=0))
+        self.assertIn("Error", self.controller.fetch_bookings_page("2024-07-01", "2024-12-31", limit=-5))
+
+    def test_09_hall_catalog(self):
+        self.assertIn("saved", self.controller.save_hall("test-hall", 2000))
+        available = self.controller.fetch_available_halls("2024-11-01T10:00:00", "2024-11-01T11:00:00", 1500)
+        self.assertEqual([hall["hall_id"] for hall in available], ["test-hall"])
+        self.assertIn("successful", self.controller.book_hall("test-hall", "2024-11-01T10:00:00", "2024-11-01T11:00:00", 1500))
+
+        self.assertIn("removed", self.controller.remove_hall("test-hall"))
+        self.assertEqual(self.controller.fetch_available_halls("2024-11-01T12:00:00", "2024-11-01T13:00:00", 1500), [])
+
+    def test_10_book_recurring(self):
+        self.assertIn("successful", self.controller.book_hall("C", "2025-01-13T10:00:00", "2025-01-13T11:00:00", 100))
+        rule = {"freq": "weekly", "byday": ["MO"], "count": 4}
+        # the second Monday is taken, an atomic series books nothing
+        series = self.controller.book_recurring("C", "2025-01-06T10:00:00", "2025-01-06T12:00:00", 100, rule, atomic=True)
+        self.assertEqual(len(series["results"]), 4)
+        self.assertFalse(any("successful" in result for result in series["results"]))
+        self.assertEqual(series["occurrences"][1], {"start_time": "2025-01-13T10:00:00", "end_time": "2025-01-13T12:00:00"})
+
+        results = self.controller.book_recurring("C", "2025-01-06T10:00:00", "2025-01-06T12:00:00", 100, rule)["results"]
+        self.assertIn("successful", results[0])
+        self.assertIn("already booked", results[1])
+        self.assertIn("successful", results[2])
+        self.assertIn("successful", results[3])
+        self.assertEqual(len(self.controller.fetch_bookings("2025-01-06", "2025-01-27")), 4)
+
+    def test_11_find_free_slots(self):
+        self.assertIn("successful", self.controller.book_hall("F", "2025-02-03T08:00:00", "2025-02-03T10:00:00", 900))
+        self.assertIn("successful", self.controller.book_hall("F", "2025-02-03T10:30:00", "2025-02-03T12:00:00", 900))
+        # the half hour between the bookings is too short, the afternoon is one free gap
+        slots = self.controller.find_free_slots(60, 900, "2025-02-03T08:00:00", "2025-02-03T18:00:00", limit=2)
+        self.assertEqual(slots, [{"hall_id": "F", "capacity": 1000, "start_time": "2025-02-03T12:00:00", "end_time": "2025-02-03T13:00:00"}])
+        slots = self.controller.find_free_slots(30, 900, "2025-02-03T08:00:00", "2025-02-03T18:00:00")
+        self.assertEqual([slot["start_time"] for slot in slots], ["2025-02-03T10:00:00", "2025-02-03T12:00:00"])
+
+    def test_12_calendar(self):
+        calendar = self.controller.calendar("2025-03-03", "2025-03-04", 60)
+        self.assertEqual(calendar["halls"]["E"]["2025-03-03"], "0" * 24)
+        result = self.controller.book_hall("E", "2025-03-03T09:30:00", "2025-03-03T11:00:00", 100)
+        self.assertIn("successful", result)
+        # updated in place by the booking, the day is not read again
+        calendar = self.controller.calendar("2025-03-03", "2025-03-04", 60)
+        self.assertEqual(calendar["halls"]["E"]["2025-03-03"], "0" * 9 + "11" + "0" * 13)
+        self.assertEqual(calendar["halls"]["E"]["2025-03-04"], "0" * 24)
+        self.assertIn("cancelled successfully", self.controller.cancel_booking(result[-24:]))
+        self.assertEqual(self.controller.calendar("2025-03-03", "2025-03-03", 60)["halls"]["E"]["2025-03-03"], "0" * 24)
+
+    def test_13_update_paths(self):
+        booking_id = self.controller.book_hall("D", "2025-04-01T10:00:00", "2025-04-01T12:00:00", 100)[-24:]
+        self.assertIn("successful", self.controller.book_hall("D", "2025-04-01T13:00:00", "2025-04-01T14:00:00", 100))
+        # shrinking needs no conflict check, growing into the next booking is refused
+        self.assertIn("updated successfully", self.controller.update_booking(booking_id, "2025-04-01T10:30:00", "2025-04-01T11:30:00", 100))
+        self.assertIn("not available", self.controller.update_booking(booking_id, "2025-04-01T10:30:00", "2025-04-01T13:30:00", 100))
+        self.assertIn("updated successfully", self.controller.update_booking(booking_id, "2025-04-01T11:00:00", "2025-04-01T13:00:00", 100))
+        self.assertIn("same updates", self.controller.update_booking(booking_id, "2025-04-01T11:00:00", "2025-04-01T13:00:00", 100))
+        # the cached location is out of date once another process moved the booking
+        self.controller.db.update_one({"_id": ObjectId(booking_id)}, {"$set": {"start_time": datetime(2025, 4, 2, 9), "end_time": datetime(2025, 4, 2, 10)}})
+        self.assertIn("updated successfully", self.controller.update_booking(booking_id, "2025-04-03T09:00:00", "2025-04-03T10:00:00", 100))
+        self.assertEqual([booking["start_time"] for booking in self.controller.fetch_bookings("2025-04-02", "2025-04-03")], ["2025-04-03T09:00:00"])
+        self.assertIn("not found", self.controller.update_booking("0" * 24, "2025-04-03T09:00:00", "2025-04-03T10:00:00", 100))
+
+    def test_14_fetch_available_cache(self):
+        hits = self.controller.response_cache_stats()["hits"]
+        first = self.controller.fetch_available_halls("2025-05-01T10:00:00", "2025-05-01T11:00:00", 400)
+        self.assertEqual(self.controller.fetch_available_halls("2025-05-01T10:00:00", "2025-05-01T11:00:00", 400), first)
+        self.assertEqual(self.controller.response_cache_stats()["hits"], hits + 1)
+        # booking one of the halls invalidates the cached answer
+        self.assertIn("successful", self.controller.book_hall(first[0]["hall_id"], "2025-05-01T10:30:00", "2025-05-01T12:00:00", 400))
+        after = self.controller.fetch_available_halls("2025-05-01T10:00:00", "2025-05-01T11:00:00", 400)
+        self.assertEqual(after, first[1:])
+
+    def test_15_idempotency_key(self):
+        first = self.controller.book_hall("A", "2025-06-01T10:00:00", "2025-06-01T11:00:00", 50, idempotency_key="retry-1")
+        self.assertIn("successful", first)
+        # the retry gets the original booking instead of a conflict with it
+        self.assertEqual(self.controller.book_hall("A", "2025-06-01T10:00:00", "2025-06-01T11:00:00", 50, idempotency_key="retry-1"), first)
+        self.assertIn("different request", self.controller.book_hall("A", "2025-06-01T12:00:00", "2025-06-01T13:00:00", 50, idempotency_key="retry-1"))
+        self.assertIn("already booked", self.controller.book_hall("A", "2025-06-01T10:00:00", "2025-06-01T11:00:00", 50))
+
 if __name__ == '__main__':
     controller = BookingController()
     controller.delete_all_bookings()
@@ -0,0 +1,179 @@
+import unittest
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime
+from bson.objectid import ObjectId
+from controller.booking_controller import BookingController
+from utils.booking_cache import BookingCache
+from utils.metrics import Metrics
+from utils.occupancy import OccupancyCalendar
+from utils.single_flight import SingleFlight
+
+
+class EmptyDatabase:
+    """
+    Just enough of BookingDatabase for the booking cache and the occupancy maps: no bookings stored.
+    """
+
+    def find(self, query, projection=None):
+        return []
+
+
+class FixedHalls:
+    """
+    Just enough of HallRegistry for fetch_available_halls.
+    """
+
+    def __init__(self, halls):
+        self.halls = halls
+
+    def with_capacity(self, capacity):
+        return [(hall_id, seats) for hall_id, seats in self.halls if seats >= capacity]
+
+
+def offline_controller() -> BookingController:
+    """
+    A controller coalescing fetch_available_halls reads over its booking cache, without Mongo.
+    """
+    controller = object.__new__(BookingController)
+    controller.logger = logging.getLogger("single_flight_test")
+    controller.metrics = Metrics()
+    controller.db = EmptyDatabase()
+    controller.hall_registry = FixedHalls([("A", 50), ("B", 100)])
+    controller.booking_cache = BookingCache(controller.db, controller.logger)
+    controller.booking_cache.reload()
+    controller.occupancy = OccupancyCalendar(controller.db, controller.logger)
+    controller.response_cache = None
+    controller.single_flight = SingleFlight()
+    controller.write_counter = itertools.count(1)
+    controller.write_sequence = 0
+    return controller
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.runs = 0
+
+    def slow_query(self):
+        self.runs += 1
+        time.sleep(0.1)
+        return ["result"]
+
+    def test_01_concurrent_calls_share_one_run(self):
+        results = []
+        barrier = threading.Barrier(20)
+
+        def worker():
+            barrier.wait()
+            results.append(self.flight.do(("fetch", 1), self.slow_query))
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.runs, 1)
+        self.assertEqual(len(results), 20)
+        self.assertTrue(all(result is results[0][0] for result, _ in results))
+        self.assertEqual(sum(shared for _, shared in results), 19)
+        self.assertEqual(self.flight.stats(), {"executed": 1, "coalesced": 19, "in_flight": 0})
+
+    def test_02_different_keys_and_later_calls_run_again(self):
+        self.flight.do("a", self.slow_query)
+        self.flight.do("a", self.slow_query)
+        self.flight.do("b", self.slow_query)
+        self.assertEqual(self.runs, 3)
+
+    def test_03_errors_reach_every_waiter(self):
+        errors = []
+        barrier = threading.Barrier(5)
+
+        def failing():
+            time.sleep(0.1)
+            raise RuntimeError("db down")
+
+        def worker():
+            barrier.wait()
+            try:
+                self.flight.do("key", failing)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, ["db down"] * 5)
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+
+class TestCoalescedReadsAfterWrites(unittest.TestCase):
+
+    def test_01_follow_up_read_sees_its_own_write(self):
+        controller = offline_controller()
+        start, end = datetime(2030, 1, 1, 10), datetime(2030, 1, 1, 11)
+        results = {}
+
+        def read(name):
+            results[name] = [hall["hall_id"] for hall in controller.fetch_available_halls(start.isoformat(), end.isoformat(), 10)]
+
+        # concurrent reads see the booking cache as it is when they start, then stay in flight until
+        # the writer's follow-up read has started, like a slow query
+        entered, release = threading.Semaphore(0), threading.Event()
+        booked_halls = controller.booking_cache.booked_halls
+
+        def held_booked_halls(*args):
+            booked = booked_halls(*args)
+            if threading.current_thread().name.startswith("concurrent"):
+                entered.release()
+                release.wait(5)
+            return booked
+
+        controller.booking_cache.booked_halls = held_booked_halls
+
+        # a concurrent read starts at every step of the write
+        readers = []
+        add = controller.booking_cache.add
+        invalidate = controller._invalidate_responses
+
+        def start_reader():
+            name = f"concurrent {len(readers)}"
+            reader = threading.Thread(target=read, args=(name,), name=name)
+            coalesced = controller.single_flight.stats()["coalesced"]
+            readers.append(reader)
+            reader.start()
+            # in flight once it reads the booking cache, or once it joined a read already in flight
+            while not entered.acquire(timeout=0.01) and controller.single_flight.stats()["coalesced"] == coalesced:
+                pass
+
+        def add_after_read(*args):
+            start_reader()
+            add(*args)
+
+        def invalidate_after_read(*args):
+            start_reader()
+            invalidate(*args)
+
+        controller.booking_cache.add = add_after_read
+        controller._invalidate_responses = invalidate_after_read
+        controller._on_booked("A", start, end, ObjectId())
+
+        follow_up = threading.Thread(target=read, args=("follow-up",))
+        follow_up.start()
+        time.sleep(0.1)
+        release.set()
+        follow_up.join()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(results["follow-up"], ["B"])
+
+
+if __name__ == '__main__':
+    unittest.main()
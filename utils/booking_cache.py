@@ -0,0 +1,314 @@
+from threading import Lock, Thread
+from utils.interval_index import IntervalIndex
+import time
+
+
+class BookingCache:
+    """
+    Write-through cache of the stored bookings: one sorted interval index per hall.
+
+    Mongo stays the source of truth. The cache is loaded from BookingDatabase, updated by the
+    controller after every successful book, update and cancel, and rebuilt when the database
+    disagrees with it or when it is older than the refresh interval (bookings written by other
+    processes only become visible then). Periodic rebuilds run on a background thread while the
+    current indexes keep answering.
+    """
+
+    def __init__(self, db, logger, refresh_interval=60):
+        """
+        Args:
+            db (BookingDatabase): The database the cache mirrors.
+            logger (Logger): Logger for reloads and detected drift.
+            refresh_interval (float, optional): Seconds after which the whole cache is reloaded. Default is 60.
+        """
+        self.db = db
+        self.logger = logger
+        self.refresh_interval = refresh_interval
+        self.lock = Lock()
+        self.reload_lock = Lock()
+        self.halls = {}
+        # booking ID -> (hall_id, start_time, end_time) of every indexed booking
+        self.by_id = {}
+        # halls whose stored bookings overlap each other, the DB is asked for those instead
+        self.untrusted = set()
+        self.loaded_at = None
+        self.refreshing = False
+        # writes seen while a reload is reading the DB, replayed on the fresh indexes
+        self.journal = None
+
+
+    def _build(self, bookings) -> tuple[dict, dict, set]:
+        """
+        Build per-hall indexes from booking documents.
+
+        Args:
+            bookings (iterable): Documents with _id, hall_id, start_time and end_time.
+
+        Returns:
+            tuple[dict, dict, set]: The indexes by hall, the bookings by ID and the halls with overlapping bookings.
+        """
+        halls = {}
+        by_id = {}
+        untrusted = set()
+        for booking in bookings:
+            index = halls.setdefault(booking["hall_id"], IntervalIndex())
+            try:
+                index.add(booking["start_time"], booking["end_time"], booking["_id"])
+                by_id[booking["_id"]] = (booking["hall_id"], booking["start_time"], booking["end_time"])
+            except (ValueError, TypeError):
+                untrusted.add(booking["hall_id"])
+        return halls, by_id, untrusted
+
+
+    def reload(self, hall_id=None) -> None:
+        """
+        Rebuild the cache, or a single hall of it, from the database.
+
+        Args:
+            hall_id (str, optional): Only reload this hall. Default reloads every hall.
+        """
+        with self.reload_lock:
+            self._reload(hall_id)
+
+
+    def _reload(self, hall_id) -> None:
+        query = {"pending_update": {"$exists": False}}
+        if hall_id is not None:
+            query["hall_id"] = hall_id
+        with self.lock:
+            self.journal = []
+
+        try:
+            bookings = self.db.find(query, {"hall_id": 1, "start_time": 1, "end_time": 1})
+            halls, by_id, untrusted = self._build(bookings)
+        except Exception:
+            with self.lock:
+                self.journal = None
+            raise
+
+        with self.lock:
+            if hall_id is None:
+                self.halls = halls
+                self.by_id = by_id
+                self.untrusted = untrusted
+                self.loaded_at = time.monotonic()
+            else:
+                self.halls[hall_id] = halls.get(hall_id, IntervalIndex())
+                self.by_id = {booking_id: slot for booking_id, slot in self.by_id.items() if slot[0] != hall_id}
+                self.by_id.update(by_id)
+                self.untrusted.discard(hall_id)
+                self.untrusted |= untrusted
+            for operation, args in self.journal:
+                if hall_id is None or args[0] == hall_id:
+                    operation(*args)
+            self.journal = None
+
+        self.logger.info(f"Booking cache reloaded, hall: {hall_id or 'all'}")
+
+
+    def _is_stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > self.refresh_interval
+
+
+    def _ensure_fresh(self) -> None:
+        if self.loaded_at is None:
+            # nothing to answer from yet
+            with self.reload_lock:
+                # another thread may have loaded while this one waited
+                if self.loaded_at is None:
+                    self._reload(None)
+        elif self._is_stale():
+            with self.lock:
+                if self.refreshing:
+                    return
+                self.refreshing = True
+            Thread(target=self._refresh, name="booking-cache-refresh", daemon=True).start()
+
+
+    def _refresh(self) -> None:
+        try:
+            with self.reload_lock:
+                if self._is_stale():
+                    self._reload(None)
+        except Exception as e:
+            # retried by the next request
+            self.logger.error(f"Refreshing booking cache failed: {e}")
+        finally:
+            with self.lock:
+                self.refreshing = False
+
+
+    def _discard(self, hall_id, start_time, end_time, booking_id) -> None:
+        # only the interval recorded for this booking, never another booking's at the same times
+        index = self.halls.get(hall_id)
+        if index is not None and (start_time, end_time, booking_id) in index.overlapping(start_time, end_time):
+            index.remove(start_time, end_time)
+
+
+    def _add(self, hall_id, start_time, end_time, booking_id) -> None:
+        slot = self.by_id.get(booking_id)
+        if slot == (hall_id, start_time, end_time):
+            return
+        if slot is not None:
+            # recorded somewhere else, e.g. moved by another process and picked up by a reload
+            self._discard(*slot, booking_id)
+            del self.by_id[booking_id]
+        index = self.halls.setdefault(hall_id, IntervalIndex())
+        try:
+            index.add(start_time, end_time, booking_id)
+            self.by_id[booking_id] = (hall_id, start_time, end_time)
+        except ValueError:
+            self.untrusted.add(hall_id)
+
+
+    def _remove(self, hall_id, start_time, end_time, booking_id) -> None:
+        # the caller's times may be out of date, the recorded slot is the one in the index
+        slot = self.by_id.pop(booking_id, None)
+        self._discard(*(slot or (hall_id, start_time, end_time)), booking_id)
+
+
+    def _apply(self, operation, *args) -> None:
+        with self.lock:
+            if self.journal is not None:
+                self.journal.append((operation, args))
+            operation(*args)
+
+
+    def add(self, hall_id, start_time, end_time, booking_id) -> None:
+        """
+        Record a booking stored in the database.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the booking.
+            end_time (datetime): The end of the booking.
+            booking_id (ObjectId): The ID of the stored booking.
+        """
+        self._apply(self._add, hall_id, start_time, end_time, booking_id)
+
+
+    def remove(self, hall_id, start_time, end_time, booking_id) -> None:
+        """
+        Forget a booking deleted from the database.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the booking.
+            end_time (datetime): The end of the booking.
+            booking_id (ObjectId): The ID of the deleted booking.
+        """
+        self._apply(self._remove, hall_id, start_time, end_time, booking_id)
+
+
+    def move(self, hall_id, old_start_time, old_end_time, new_start_time, new_end_time, booking_id) -> None:
+        """
+        Record an update of a booking's time range.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            old_start_time (datetime): The previous start of the booking.
+            old_end_time (datetime): The previous end of the booking.
+            new_start_time (datetime): The new start of the booking.
+            new_end_time (datetime): The new end of the booking.
+            booking_id (ObjectId): The ID of the booking.
+        """
+        with self.lock:
+            for operation, args in ((self._remove, (hall_id, old_start_time, old_end_time, booking_id)),
+                                    (self._add, (hall_id, new_start_time, new_end_time, booking_id))):
+                if self.journal is not None:
+                    self.journal.append((operation, args))
+                operation(*args)
+
+
+    def has_conflict(self, hall_id, start_time, end_time, exclude_id=None):
+        """
+        Check the cache for bookings of a hall overlapping a time range.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the range.
+            end_time (datetime): The end of the range.
+            exclude_id (ObjectId, optional): A booking to ignore, e.g. the one being updated.
+
+        Returns:
+            bool: True or False, or None when the cache cannot answer for this hall.
+        """
+        self._ensure_fresh()
+        with self.lock:
+            if hall_id in self.untrusted:
+                return None
+            index = self.halls.get(hall_id)
+            if index is None:
+                return False
+            return any(value != exclude_id for _, _, value in index.overlapping(start_time, end_time))
+
+
+    def locate(self, booking_id):
+        """
+        Look up the hall and time range of a booking.
+
+        Args:
+            booking_id (ObjectId): The ID of the booking.
+
+        Returns:
+            tuple[str, datetime, datetime]: The hall and range, or None when the cache does not know the booking.
+        """
+        self._ensure_fresh()
+        with self.lock:
+            slot = self.by_id.get(booking_id)
+            if slot is None or slot[0] in self.untrusted:
+                return None
+            return slot
+
+
+    def booked_halls(self, start_time, end_time):
+        """
+        List the halls with at least one booking overlapping a time range.
+
+        Args:
+            start_time (datetime): The start of the range.
+            end_time (datetime): The end of the range.
+
+        Returns:
+            set: The booked hall IDs, or None when the cache cannot answer.
+        """
+        self._ensure_fresh()
+        with self.lock:
+            if self.untrusted:
+                return None
+            return {hall_id for hall_id, index in self.halls.items() if index.overlaps(start_time, end_time)}
+
+
+    def busy_intervals(self, hall_ids, start_time, end_time):
+        """
+        List the bookings of some halls overlapping a time range.
+
+        Args:
+            hall_ids (iterable): The IDs of the halls.
+            start_time (datetime): The start of the range.
+            end_time (datetime): The end of the range.
+
+        Returns:
+            dict: (start, end) pairs ordered by start time, by hall ID, or None when the cache cannot answer.
+        """
+        self._ensure_fresh()
+        with self.lock:
+            busy = {}
+            for hall_id in hall_ids:
+                if hall_id in self.untrusted:
+                    return None
+                index = self.halls.get(hall_id)
+                if index is not None:
+                    busy[hall_id] = [(start, end) for start, end, _ in index.overlapping(start_time, end_time)]
+            return busy
+
+
+    def report_drift(self, hall_id) -> None:
+        """
+        Rebuild a hall after the database contradicted the cache.
+
+        Args:
+            hall_id (str): The ID of the hall.
+        """
+        self.logger.warning(f"Booking cache drift detected on hall {hall_id}, reloading it")
+        self.reload(hall_id)
@@ -0,0 +1,57 @@
+from heapq import merge
+from itertools import islice
+
+
+def free_gaps(busy, window_start, window_end, duration):
+    """
+    Sweep the bookings of one hall and yield the start of every gap long enough for the duration.
+
+    Args:
+        busy (iterable): (start, end) pairs of the hall's bookings, in any order and possibly overlapping.
+        window_start: The earliest allowed start.
+        window_end: The latest allowed end.
+        duration: The length of the slot.
+
+    Yields:
+        The earliest start within every free gap, in chronological order.
+    """
+    cursor = window_start
+    for start, end in sorted(busy):
+        if end <= cursor:
+            continue
+        if start - cursor >= duration:
+            if cursor + duration > window_end:
+                return
+            yield cursor
+        cursor = max(cursor, end)
+        if cursor + duration > window_end:
+            return
+    if cursor + duration <= window_end:
+        yield cursor
+
+
+def earliest_free_slots(halls, busy, window_start, window_end, duration, limit) -> list[tuple]:
+    """
+    Find the earliest free slots of a given length across halls.
+
+    Every hall is swept once over its sorted bookings and the per-hall gaps are merged by start
+    time, so the cost is O(b log b) for b bookings plus O(limit log h) for h halls. Each free gap
+    yields one candidate, starting as early as possible. Candidates starting at the same time
+    are ordered by capacity, so the smallest hall that fits comes first.
+
+    Args:
+        halls (list[tuple[str, int]]): (hall_id, capacity) pairs of the eligible halls.
+        busy (dict): (start, end) pairs of the bookings by hall ID, halls without bookings may be missing.
+        window_start: The earliest allowed start.
+        window_end: The latest allowed end.
+        duration: The length of the slot.
+        limit (int): The maximum number of candidates.
+
+    Returns:
+        list[tuple]: (start, capacity, hall_id) candidates ordered by start time.
+    """
+    def candidates(hall_id, capacity):
+        for start in free_gaps(busy.get(hall_id, ()), window_start, window_end, duration):
+            yield start, capacity, hall_id
+
+    return list(islice(merge(*(candidates(hall_id, capacity) for hall_id, capacity in halls)), limit))
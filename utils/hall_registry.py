@@ -0,0 +1,148 @@
+from threading import Lock
+from bisect import bisect_left
+from models.halls import halls
+import time
+
+
+class HallCatalog:
+    """
+    Immutable snapshot of the halls, ordered by capacity then hall ID.
+    """
+
+    __slots__ = ("capacities", "hall_ids", "by_id")
+
+    def __init__(self, documents):
+        """
+        Args:
+            documents (iterable): Hall documents with _id and capacity.
+        """
+        ordered = sorted((int(document["capacity"]), document["_id"]) for document in documents)
+        self.capacities = [capacity for capacity, _ in ordered]
+        self.hall_ids = [hall_id for _, hall_id in ordered]
+        self.by_id = {hall_id: capacity for capacity, hall_id in ordered}
+
+
+class HallRegistry:
+    """
+    The bookable halls, stored in Mongo and cached in memory.
+
+    Readers use an immutable HallCatalog which reloads and edits replace as a whole, so lookups
+    never take a lock. Capacity filters bisect the capacity-ordered list, O(log n + k). The
+    catalog is reloaded when it is older than the refresh interval, which picks up halls added
+    or removed by other processes, or on demand through reload(). An empty collection is seeded
+    with the halls Enum on the first load only, so a catalog emptied on purpose stays empty.
+    """
+
+    def __init__(self, db, logger, refresh_interval=60):
+        """
+        Args:
+            db (BookingDatabase): The database storing the halls.
+            logger (Logger): Logger for reloads.
+            refresh_interval (float, optional): Seconds after which the catalog is reloaded. Default is 60.
+        """
+        self.db = db
+        self.logger = logger
+        self.refresh_interval = refresh_interval
+        self.reload_lock = Lock()
+        self.catalog = HallCatalog([])
+        self.loaded_at = None
+        self.seeded = False
+
+
+    def reload(self) -> int:
+        """
+        Load the catalog from the database, seeding the default halls into an empty collection on the first load.
+
+        Returns:
+            int: The number of halls loaded.
+        """
+        with self.reload_lock:
+            return self._reload()
+
+
+    def _reload(self) -> int:
+        if not self.seeded:
+            self.db.seed_halls({hall.name: hall.value for hall in halls})
+            self.seeded = True
+        self.catalog = HallCatalog(self.db.find_halls())
+        self.loaded_at = time.monotonic()
+        self.logger.info(f"Hall registry reloaded, {len(self.catalog.hall_ids)} halls")
+        return len(self.catalog.hall_ids)
+
+
+    def _is_stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > self.refresh_interval
+
+
+    def _current(self) -> HallCatalog:
+        if self._is_stale():
+            # only the first load makes readers wait, later ones keep serving the previous catalog
+            if self.reload_lock.acquire(blocking=self.loaded_at is None):
+                try:
+                    if self._is_stale():
+                        self._reload()
+                except Exception as e:
+                    # the next lookup tries again
+                    self.logger.error(f"Reloading hall registry failed: {e}")
+                finally:
+                    self.reload_lock.release()
+        return self.catalog
+
+
+    def capacity(self, hall_id):
+        """
+        Look up the capacity of a hall.
+
+        Args:
+            hall_id (str): The ID of the hall.
+
+        Returns:
+            int: The capacity, or None if the hall does not exist.
+        """
+        return self._current().by_id.get(hall_id)
+
+
+    def with_capacity(self, capacity) -> list[tuple[str, int]]:
+        """
+        List the halls with at least the given capacity.
+
+        Args:
+            capacity (int): The minimum capacity.
+
+        Returns:
+            list[tuple[str, int]]: (hall_id, capacity) pairs ordered by capacity.
+        """
+        catalog = self._current()
+        position = bisect_left(catalog.capacities, capacity)
+        return list(zip(catalog.hall_ids[position:], catalog.capacities[position:]))
+
+
+    def save(self, hall_id, capacity) -> None:
+        """
+        Add a hall or change its capacity.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            capacity (int): The number of seats.
+        """
+        self.db.save_hall(hall_id, capacity)
+        with self.reload_lock:
+            documents = [{"_id": other, "capacity": seats} for other, seats in self.catalog.by_id.items() if other != hall_id]
+            self.catalog = HallCatalog(documents + [{"_id": hall_id, "capacity": capacity}])
+
+
+    def remove(self, hall_id) -> bool:
+        """
+        Remove a hall from the catalog. Its existing bookings are kept.
+
+        Args:
+            hall_id (str): The ID of the hall.
+
+        Returns:
+            bool: True if the hall existed.
+        """
+        removed = self.db.delete_hall(hall_id)
+        with self.reload_lock:
+            self.catalog = HallCatalog([{"_id": other, "capacity": seats}
+                                        for other, seats in self.catalog.by_id.items() if other != hall_id])
+        return removed
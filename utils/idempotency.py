@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from threading import Lock
+from utils.metrics import Metrics
+from utils.single_flight import SingleFlight
+from models.booking import to_datetime
+from datetime import datetime, timedelta, timezone
+import time
+
+
+class IdempotencyStore:
+    """
+    Results of requests sent with an idempotency key, so a retried request gets the original
+    result instead of running again.
+
+    Results are stored in Mongo, where a TTL index removes them after ttl seconds, and the most
+    recent ones are kept in memory so most retries need no round-trip at all. A key is bound to
+    the request it was first used with; reusing it for a different request is an error. Retries
+    arriving while the original request still runs wait for it. Only final results are stored,
+    e.g. a lock timeout is not, so retrying it runs the request again.
+    """
+
+    def __init__(self, db, logger, ttl=86400, max_entries=10000):
+        """
+        Args:
+            db (BookingDatabase): The database storing the results.
+            logger (Logger): Logger for replays and failures.
+            ttl (float, optional): Seconds a result is kept. Default is 86400.
+            max_entries (int, optional): The maximum number of results kept in memory. Default is 10000.
+        """
+        self.db = db
+        self.logger = logger
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = Lock()
+        # key -> (expiry on the monotonic clock, fingerprint, result)
+        self.recent = OrderedDict()
+        self.in_flight = SingleFlight()
+        self.metrics = Metrics()
+        self.metrics.describe("idempotent_replays_total", "counter", "Requests answered with the stored result of their idempotency key.")
+
+
+    def _remember(self, key, fingerprint, result, ttl) -> None:
+        with self.lock:
+            self.recent[key] = (time.monotonic() + ttl, fingerprint, result)
+            self.recent.move_to_end(key)
+            while len(self.recent) > self.max_entries:
+                self.recent.popitem(last=False)
+
+
+    def _lookup(self, key):
+        """
+        Find the stored fingerprint and result of a key, in memory first.
+
+        Returns:
+            tuple[str, str]: The fingerprint and result, or None if the key is unused.
+        """
+        with self.lock:
+            entry = self.recent.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self.recent.move_to_end(key)
+                    return entry[1], entry[2]
+                del self.recent[key]
+        document = self.db.find_idempotent_result(key)
+        if document is None:
+            return None
+        # Mongo removes expired documents about once a minute, not on the dot; it returns naive UTC times
+        ttl = (to_datetime(document["expires_at"]) - self._now()).total_seconds()
+        if ttl <= 0:
+            return None
+        self._remember(key, document["fingerprint"], document["result"], ttl)
+        return document["fingerprint"], document["result"]
+
+
+    def _now(self) -> datetime:
+        return to_datetime(datetime.now(timezone.utc))
+
+
+    def _replay(self, key, fingerprint, stored, operation) -> str:
+        stored_fingerprint, result = stored
+        if stored_fingerprint != fingerprint:
+            self.logger.info(f"Idempotency key reused for a different request: {key}")
+            return f"Error: Idempotency key {key} was already used for a different request"
+        self.metrics.inc("idempotent_replays_total", operation=operation)
+        self.logger.info(f"Idempotent replay: {operation}, key: {key}")
+        return result
+
+
+    def run(self, key, operation, fingerprint, function, is_final):
+        """
+        Run a request once per idempotency key.
+
+        Args:
+            key (str): The idempotency key sent by the client.
+            operation (str): The operation, e.g. "book_hall".
+            fingerprint (str): Identifies the request, a key is only replayed for the same fingerprint.
+            function (callable): Runs the request and returns its result message.
+            is_final (callable): Tells whether a result is final and may be stored.
+
+        Returns:
+            str: The result of the request, or the stored result of its first run.
+        """
+        stored = self._lookup(key)
+        if stored is not None:
+            return self._replay(key, fingerprint, stored, operation)
+
+        def first_run():
+            # a retry may have finished while this one waited for the key
+            stored = self._lookup(key)
+            if stored is not None:
+                return stored[0], stored[1], True
+            result = function()
+            if is_final(result):
+                expires_at = self._now() + timedelta(seconds=self.ttl)
+                try:
+                    if not self.db.save_idempotent_result(key, fingerprint, result, expires_at):
+                        # another process stored the key first, retries get its result so this one must too
+                        stored = self._lookup(key)
+                        if stored is not None:
+                            return stored[0], stored[1], True
+                    else:
+                        self._remember(key, fingerprint, result, self.ttl)
+                except Exception as e:
+                    # the request itself succeeded, only a later retry would run it again
+                    self.logger.error(f"Storing idempotency key {key} failed: {e}")
+            return fingerprint, result, False
+
+        (stored_fingerprint, result, replayed), shared = self.in_flight.do(key, first_run)
+        if replayed or shared:
+            return self._replay(key, fingerprint, (stored_fingerprint, result), operation)
+        return result
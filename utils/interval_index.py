@@ -0,0 +1,120 @@
+from bisect import bisect_left, bisect_right
+
+
+class IntervalIndex:
+    """
+    Sorted index of non-overlapping half-open [start, end) intervals.
+
+    Slot locks held on a hall and bookings stored for a hall never overlap each other, so
+    the intervals can be kept ordered by start time, which also keeps them ordered by end
+    time. Overlap queries then reduce to two binary searches, O(log n + k).
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+        self._values = []
+
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+
+    def __iter__(self):
+        return iter(zip(self._starts, self._ends, self._values))
+
+
+    def _overlap_bounds(self, start, end) -> tuple[int, int]:
+        """
+        Find the slice of stored intervals overlapping [start, end).
+
+        Args:
+            start: The start of the queried range.
+            end: The end of the queried range.
+
+        Returns:
+            tuple[int, int]: The lower (inclusive) and upper (exclusive) positions of the overlapping intervals.
+        """
+        low = bisect_right(self._ends, start)
+        high = bisect_left(self._starts, end, lo=low)
+        return low, high
+
+
+    def overlaps(self, start, end) -> bool:
+        """
+        Check whether any stored interval overlaps [start, end).
+
+        Args:
+            start: The start of the queried range.
+            end: The end of the queried range.
+
+        Returns:
+            bool: True if at least one stored interval overlaps the range, False otherwise.
+        """
+        low, high = self._overlap_bounds(start, end)
+        return low < high
+
+
+    def overlapping(self, start, end) -> list[tuple]:
+        """
+        List all stored intervals overlapping [start, end).
+
+        Args:
+            start: The start of the queried range.
+            end: The end of the queried range.
+
+        Returns:
+            list[tuple]: (start, end, value) tuples ordered by start time.
+        """
+        low, high = self._overlap_bounds(start, end)
+        return list(zip(self._starts[low:high], self._ends[low:high], self._values[low:high]))
+
+
+    def add(self, start, end, value=None) -> None:
+        """
+        Insert an interval into the index.
+
+        Args:
+            start: The start of the interval.
+            end: The end of the interval.
+            value: Optional payload stored alongside the interval.
+
+        Raises:
+            ValueError: If the interval is empty or overlaps a stored interval.
+        """
+        if not end > start:
+            raise ValueError(f"empty interval: {start} - {end}")
+        low, high = self._overlap_bounds(start, end)
+        if low < high:
+            raise ValueError(f"interval {start} - {end} overlaps an existing interval")
+        self._starts.insert(low, start)
+        self._ends.insert(low, end)
+        self._values.insert(low, value)
+
+
+    def remove(self, start, end):
+        """
+        Remove the interval exactly matching [start, end).
+
+        Args:
+            start: The start of the interval.
+            end: The end of the interval.
+
+        Returns:
+            The payload stored with the removed interval.
+
+        Raises:
+            KeyError: If no stored interval matches the bounds exactly.
+        """
+        position = bisect_left(self._starts, start)
+        if position < len(self._starts) and self._starts[position] == start and self._ends[position] == end:
+            del self._starts[position]
+            del self._ends[position]
+            return self._values.pop(position)
+        raise KeyError((start, end))
+
+
+    def clear(self) -> None:
+        self._starts.clear()
+        self._ends.clear()
+        self._values.clear()
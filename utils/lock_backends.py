@@ -0,0 +1,326 @@
+from threading import Lock, Condition, get_ident
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from pymongo.errors import DuplicateKeyError
+from utils.interval_index import IntervalIndex
+import time
+
+
+def is_time_conflict(existing_start, existing_end, new_start, new_end) -> bool:
+    """
+    Determine if there is a time conflict between two time ranges.
+
+    Args:
+        existing_start (datetime): The start time of the existing booking.
+        existing_end (datetime): The end time of the existing booking.
+        new_start (datetime): The start time of the new booking.
+        new_end (datetime): The end time of the new booking.
+
+    Returns:
+        bool: True if there is a time conflict, False otherwise.
+    """
+    return not (new_end <= existing_start or new_start >= existing_end)
+
+
+class HallLocks:
+    """
+    Lock table of a single hall: the held slots, the slots being waited on and the condition
+    both are guarded by.
+    """
+
+    __slots__ = ("condition", "locks", "waiters", "users")
+
+    def __init__(self):
+        self.condition = Condition()
+        self.locks = IntervalIndex()
+        self.waiters = Counter()
+        # threads currently working on this table, it may only be dropped when this is zero
+        self.users = 0
+
+
+class InMemoryLockBackend:
+    """
+    Slot locks held in process memory. Only safe when a single process serves all bookings.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self.halls = {}
+        # guards the hall table and the user counts, each hall's held slots and waiters are
+        # only touched while holding that hall's condition
+        self.table_lock = Lock()
+
+
+    def _checkout(self, hall_id, create=True) -> HallLocks:
+        """
+        Get the lock table of a hall and register the calling thread as one of its users.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            create (bool, optional): Create the table if the hall has none. Default is True.
+
+        Returns:
+            HallLocks: The hall's lock table, or None if it does not exist and create is False.
+        """
+        with self.table_lock:
+            hall = self.halls.get(hall_id)
+            if hall is None:
+                if not create:
+                    return None
+                hall = self.halls[hall_id] = HallLocks()
+            hall.users += 1
+            return hall
+
+
+    def _checkin(self, hall_id, hall) -> None:
+        """
+        Unregister the calling thread as a user of a hall's lock table, dropping the table once
+        nobody holds, waits on or is working with it.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            hall (HallLocks): The table returned by _checkout.
+        """
+        with self.table_lock:
+            hall.users -= 1
+            if not hall.users and not len(hall.locks):
+                del self.halls[hall_id]
+
+
+    def acquire(self, hall_id, start_time, end_time, deadline) -> bool:
+        """
+        Block on the hall's condition until no held lock overlaps the slot or the deadline passes.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the slot.
+            end_time (datetime): The end of the slot.
+            deadline (float): time.monotonic() value after which to give up.
+
+        Returns:
+            bool: True if the lock was acquired, False if the deadline passed.
+        """
+        slot = (start_time, end_time)
+        hall = self._checkout(hall_id)
+        try:
+            with hall.condition:
+                if hall.locks.overlaps(start_time, end_time):
+                    # register as a waiter so releases of overlapping slots wake this thread up
+                    hall.waiters[slot] += 1
+                    try:
+                        while hall.locks.overlaps(start_time, end_time):
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                break
+                            hall.condition.wait(remaining)
+                        acquired = not hall.locks.overlaps(start_time, end_time)
+                    finally:
+                        hall.waiters[slot] -= 1
+                        if not hall.waiters[slot]:
+                            del hall.waiters[slot]
+                else:
+                    acquired = True
+
+                if acquired:
+                    hall.locks.add(start_time, end_time)
+        finally:
+            self._checkin(hall_id, hall)
+        return acquired
+
+
+    def release(self, hall_id, start_time, end_time) -> bool:
+        """
+        Release a held slot, waking the hall's waiters only if one of them waits on an overlapping slot.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the slot.
+            end_time (datetime): The end of the slot.
+
+        Returns:
+            bool: True if the slot was held and has been released.
+        """
+        hall = self._checkout(hall_id, create=False)
+        if hall is None:
+            return False
+
+        try:
+            with hall.condition:
+                try:
+                    hall.locks.remove(start_time, end_time)
+                except KeyError:
+                    return False
+                if any(is_time_conflict(waiting_start, waiting_end, start_time, end_time)
+                       for (waiting_start, waiting_end) in hall.waiters):
+                    hall.condition.notify_all()
+        finally:
+            self._checkin(hall_id, hall)
+        return True
+
+
+    def stats(self) -> dict:
+        """
+        Report the size of the live lock bookkeeping.
+
+        Returns:
+            dict: Number of hall tables (one condition each), held locks and waiting threads.
+        """
+        with self.table_lock:
+            halls = list(self.halls.values())
+        return {
+            "halls": len(halls),
+            "conditions": len(halls),
+            "locks": sum(len(hall.locks) for hall in halls),
+            "waiters": sum(sum(hall.waiters.values()) for hall in halls),
+        }
+
+
+class MongoLeaseLockBackend:
+    """
+    Slot locks stored as leases in a Mongo collection so several processes can share them.
+
+    Every hall has one document holding its leases. A lease is taken with a single conditional
+    update which only matches when no unexpired lease overlaps the slot; when the hall has no
+    document yet the upsert inserts it, and a duplicate key error means another process won
+    the race. Leases expire after a TTL so a crashed process cannot block a slot forever, and
+    the document-level expires_at (the latest lease expiry) is TTL indexed so idle halls are
+    removed by mongod.
+    """
+
+    name = "mongo"
+
+    def __init__(self, collection, ttl=30, poll_interval=0.002, max_poll_interval=0.05):
+        """
+        Args:
+            collection (Collection): The collection storing the per-hall lease documents.
+            ttl (float, optional): Lease lifetime in seconds. Default is 30.
+            poll_interval (float, optional): First retry delay while a slot is taken. Default is 2 ms.
+            max_poll_interval (float, optional): Upper bound of the exponential retry delay. Default is 50 ms.
+        """
+        self.collection = collection
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.process_id = uuid4().hex
+        self.waiters = 0
+        self.waiters_lock = Lock()
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+
+    def _owner(self) -> str:
+        return f"{self.process_id}:{get_ident()}"
+
+
+    def _try_acquire(self, hall_id, start_time, end_time) -> bool:
+        """
+        Take a lease on the slot with one atomic conditional insert.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the slot.
+            end_time (datetime): The end of the slot.
+
+        Returns:
+            bool: True if the lease was taken.
+        """
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.ttl)
+        lease = {"start": start_time, "end": end_time, "owner": self._owner(), "expires_at": expires_at}
+        query = {
+            "_id": hall_id,
+            "leases": {"$not": {"$elemMatch": {
+                "start": {"$lt": end_time},
+                "end": {"$gt": start_time},
+                "expires_at": {"$gt": now},
+            }}},
+        }
+        try:
+            self.collection.update_one(query, {"$push": {"leases": lease}, "$max": {"expires_at": expires_at}}, upsert=True)
+            return True
+        except DuplicateKeyError:
+            # the hall document exists and holds an overlapping lease
+            return False
+
+
+    def _drop_expired(self, hall_id) -> None:
+        self.collection.update_one(
+            {"_id": hall_id},
+            {"$pull": {"leases": {"expires_at": {"$lte": datetime.now(timezone.utc)}}}})
+
+
+    def acquire(self, hall_id, start_time, end_time, deadline) -> bool:
+        """
+        Retry taking a lease with exponential backoff until it succeeds or the deadline passes.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the slot.
+            end_time (datetime): The end of the slot.
+            deadline (float): time.monotonic() value after which to give up.
+
+        Returns:
+            bool: True if the lease was taken, False if the deadline passed.
+        """
+        if self._try_acquire(hall_id, start_time, end_time):
+            return True
+
+        with self.waiters_lock:
+            self.waiters += 1
+        try:
+            self._drop_expired(hall_id)
+            delay = self.poll_interval
+            while True:
+                if self._try_acquire(hall_id, start_time, end_time):
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, self.max_poll_interval)
+        finally:
+            with self.waiters_lock:
+                self.waiters -= 1
+
+
+    def release(self, hall_id, start_time, end_time) -> bool:
+        """
+        Drop the calling thread's lease on the slot.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the slot.
+            end_time (datetime): The end of the slot.
+
+        Returns:
+            bool: True if a lease was removed.
+        """
+        result = self.collection.update_one(
+            {"_id": hall_id},
+            {"$pull": {"leases": {"start": start_time, "end": end_time, "owner": self._owner()}}})
+        return result.modified_count > 0
+
+
+    def stats(self) -> dict:
+        """
+        Report the leases currently live across all processes and this process's waiters.
+
+        Returns:
+            dict: Number of halls with leases, unexpired leases and locally waiting threads.
+        """
+        now = datetime.now(timezone.utc)
+        result = list(self.collection.aggregate([
+            {"$match": {"expires_at": {"$gt": now}}},
+            {"$project": {"live": {"$size": {"$filter": {
+                "input": "$leases", "cond": {"$gt": ["$$this.expires_at", now]}}}}}},
+            {"$match": {"live": {"$gt": 0}}},
+            {"$group": {"_id": None, "halls": {"$sum": 1}, "locks": {"$sum": "$live"}}},
+        ]))
+        totals = result[0] if result else {"halls": 0, "locks": 0}
+        return {
+            "halls": totals["halls"],
+            "conditions": 0,
+            "locks": totals["locks"],
+            "waiters": self.waiters,
+        }
@@ -0,0 +1,180 @@
+from threading import Lock
+from collections import Counter
+from datetime import datetime
+
+
+class HallContention:
+    """
+    Lock statistics of a single hall.
+    """
+
+    __slots__ = ("lock", "acquired", "contended", "timeouts", "waiting", "wait_seconds", "max_wait", "held", "hold_seconds", "max_hold")
+
+    def __init__(self):
+        # per hall, so lock operations on different halls never wait for each other here
+        self.lock = Lock()
+        self.acquired = 0
+        # acquisitions which waited longer than the contention threshold, and failed ones
+        self.contended = 0
+        self.timeouts = 0
+        # threads currently inside acquire_lock for this hall
+        self.waiting = 0
+        self.wait_seconds = 0.0
+        self.max_wait = 0.0
+        self.held = 0
+        self.hold_seconds = 0.0
+        self.max_hold = 0.0
+
+
+    def report(self, hall_id) -> dict:
+        attempts = self.acquired + self.timeouts
+        return {
+            "hall_id": hall_id,
+            "acquired": self.acquired,
+            "contended": self.contended,
+            "timeouts": self.timeouts,
+            "waiting": self.waiting,
+            "wait_seconds": round(self.wait_seconds, 6),
+            "mean_wait_ms": round(self.wait_seconds / attempts * 1000, 3) if attempts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "hold_seconds": round(self.hold_seconds, 6),
+            "mean_hold_ms": round(self.hold_seconds / self.held * 1000, 3) if self.held else 0.0,
+            "max_hold_ms": round(self.max_hold * 1000, 3),
+        }
+
+
+class LockContentionStats:
+    """
+    Wait and hold times of slot locks, aggregated per hall and per contended time window.
+
+    Every update is a handful of additions under the short lock of its hall, nothing is recorded
+    per request. The shared lock is only taken to register a hall on first use and to count a
+    contended window, which is kept in a bounded counter: when it grows past max_windows the
+    least contended half is dropped.
+    """
+
+    def __init__(self, contention_threshold=0.001, max_windows=1000):
+        """
+        Args:
+            contention_threshold (float, optional): Seconds an acquisition has to wait to count as contended. Default is 1 ms.
+            max_windows (int, optional): Number of contended windows remembered. Default is 1000.
+        """
+        self.contention_threshold = contention_threshold
+        self.max_windows = max_windows
+        self.lock = Lock()
+        self.halls = {}
+        # (hall_id, start_time, end_time) -> contended acquisitions and timeouts
+        self.windows = Counter()
+
+
+    def _hall(self, hall_id) -> HallContention:
+        hall = self.halls.get(hall_id)
+        if hall is None:
+            with self.lock:
+                hall = self.halls.setdefault(hall_id, HallContention())
+        return hall
+
+
+    def waiting(self, hall_id) -> None:
+        """
+        Record a thread starting to acquire a lock of a hall.
+
+        Args:
+            hall_id (str): The ID of the hall.
+        """
+        hall = self._hall(hall_id)
+        with hall.lock:
+            hall.waiting += 1
+
+
+    def abandoned(self, hall_id) -> None:
+        """
+        Record a lock acquisition which ended with an error.
+
+        Args:
+            hall_id (str): The ID of the hall.
+        """
+        hall = self._hall(hall_id)
+        with hall.lock:
+            hall.waiting -= 1
+
+
+    def acquired(self, hall_id, start_time, end_time, waited, acquired) -> None:
+        """
+        Record the end of a lock acquisition.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the slot.
+            end_time (datetime): The end of the slot.
+            waited (float): Seconds spent acquiring.
+            acquired (bool): Whether the lock was acquired or timed out.
+        """
+        contended = not acquired or waited > self.contention_threshold
+        hall = self._hall(hall_id)
+        with hall.lock:
+            hall.waiting -= 1
+            hall.wait_seconds += waited
+            hall.max_wait = max(hall.max_wait, waited)
+            if acquired:
+                hall.acquired += 1
+            else:
+                hall.timeouts += 1
+            if contended:
+                hall.contended += 1
+        if contended:
+            # this acquisition already waited, one more short lock does not matter
+            with self.lock:
+                self.windows[(hall_id, start_time, end_time)] += 1
+                if len(self.windows) > self.max_windows:
+                    self.windows = Counter(dict(self.windows.most_common(self.max_windows // 2)))
+
+
+    def released(self, hall_id, held) -> None:
+        """
+        Record the release of a lock.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            held (float): Seconds the lock was held.
+        """
+        hall = self._hall(hall_id)
+        with hall.lock:
+            hall.held += 1
+            hall.hold_seconds += held
+            hall.max_hold = max(hall.max_hold, held)
+
+
+    def hottest(self, limit=10) -> dict:
+        """
+        List the most contended halls and time windows.
+
+        Args:
+            limit (int, optional): Number of halls and of windows returned. Default is 10.
+
+        Returns:
+            dict: "halls" ordered by total wait time and "windows" ordered by contended acquisitions.
+        """
+        with self.lock:
+            entries = list(self.halls.items())
+            windows = self.windows.most_common(limit)
+        halls = []
+        for hall_id, hall in entries:
+            with hall.lock:
+                halls.append(hall.report(hall_id))
+        halls.sort(key=lambda hall: (hall["wait_seconds"], hall["timeouts"], hall["waiting"]), reverse=True)
+        return {
+            "halls": halls[:limit],
+            "windows": [{"hall_id": hall_id, "start_time": _format(start_time), "end_time": _format(end_time), "contended": count}
+                        for (hall_id, start_time, end_time), count in windows],
+        }
+
+
+    def reset(self) -> None:
+        with self.lock:
+            self.halls = {}
+            self.windows = Counter()
+
+
+def _format(value):
+    return value.isoformat() if isinstance(value, datetime) else value
@@ -1,7 +1,11 @@
-from threading import Lock, Condition
-from collections import defaultdict, deque
-from datetime import datetime
-from utils.logger import setup_logger
+from threading import Lock
+from contextlib import contextmanager
+from models.booking import to_datetime
+from utils.logger import setup_logger, HOT_PATH
+from utils.lock_backends import InMemoryLockBackend, MongoLeaseLockBackend
+from utils.lock_contention import LockContentionStats
+from utils.metrics import Metrics
+import os
 import time
 
 
@@ -33,85 +37,107 @@ class LockManager:
         """
         Initialize the LockManager instance.
 
-        Sets up the data structures for managing locks and conditions, and initializes the logger.
+        Initializes the logger, the lock backend holding the slot locks and the contention statistics.
         """
-        self.locks = defaultdict(dict)
-        self.conditions = defaultdict(dict)
         self.logger = setup_logger("lock_manager.log")
+        self.backend = self._create_backend(os.getenv("LOCK_BACKEND", "memory"))
+        self.contention_stats = LockContentionStats(float(os.getenv("LOCK_CONTENTION_THRESHOLD_MS", "1")) / 1000)
+        # (hall_id, start_time, end_time) -> time.monotonic() when the lock was acquired
+        self.held_since = {}
+        self.metrics = Metrics()
+        self.metrics.describe("lock_wait_seconds", "histogram", "Time spent acquiring slot locks, by hall.")
+        self.metrics.describe("lock_hold_seconds", "histogram", "Time slot locks were held, by hall.")
+        self.metrics.describe("lock_timeouts_total", "counter", "Slot lock acquisitions which timed out, by hall.")
 
 
-    def _is_time_conflict(self, existing_start, existing_end, new_start, new_end) -> bool:
+    def _create_backend(self, name):
         """
-        Determine if there is a time conflict between two time ranges.
+        Create the lock backend selected by the LOCK_BACKEND environment variable.
 
         Args:
-            existing_start (datetime): The start time of the existing booking.
-            existing_end (datetime): The end time of the existing booking.
-            new_start (datetime): The start time of the new booking.
-            new_end (datetime): The end time of the new booking.
+            name (str): "memory" (default) for in-process locks or "mongo" for leases shared
+                by every process using the same database.
 
         Returns:
-            bool: True if there is a time conflict, False otherwise.
+            The lock backend instance.
+
+        Raises:
+            ValueError: If the backend name is unknown.
+        """
+        if name == "memory":
+            return InMemoryLockBackend()
+        if name == "mongo":
+            # imported here so the in-memory backend does not need a database connection
+            from database.db_module import BookingDatabase
+            ttl = float(os.getenv("LOCK_LEASE_TTL", "30"))
+            return MongoLeaseLockBackend(BookingDatabase().leases, ttl=ttl)
+        raise ValueError(f"Unknown lock backend: {name}")
+
+
+    def stats(self) -> dict:
+        """
+        Report the size of the live lock bookkeeping.
+
+        Returns:
+            dict: Number of halls with locks, conditions, held locks and waiting threads.
+        """
+        return {"backend": self.backend.name, **self.backend.stats()}
+
+
+    def contention(self, limit=10) -> dict:
+        """
+        Report the most contended halls and time windows since startup.
+
+        Args:
+            limit (int, optional): Number of halls and of windows returned. Default is 10.
+
+        Returns:
+            dict: "halls" with their acquisition, timeout, waiter, wait and hold statistics, ordered
+                by total wait time, and "windows" ordered by contended acquisitions.
         """
-        return not (new_end <= existing_start or new_start >= existing_end)
+        return self.contention_stats.hottest(limit)
+
 
-        
     def acquire_lock(self, hall_id, start_time, end_time, timeout=5) -> bool:
         """
         Attempt to acquire a lock for a specific time slot for a hall.
 
+        Blocks until every overlapping lock has been released or the timeout expires.
+
         Args:
             hall_id (str): The ID of the hall for which the lock is being requested.
-            start_time (str): The start time of the booking (ISO format).
-            end_time (str): The end time of the booking (ISO format).
-            timeout (int, optional): The maximum time (in seconds) to wait for acquiring the lock. Default is 10.
+            start_time (str | datetime): The start time of the booking (ISO format or datetime).
+            end_time (str | datetime): The end time of the booking (ISO format or datetime).
+            timeout (float, optional): The maximum time (in seconds) to wait for acquiring the lock. Default is 5.
 
         Returns:
             bool: True if the lock was successfully acquired, False otherwise.
         """
-        retry_interval = 0.0001  
-        waited_time = 0
-
-        self.logger.info(f'Lock request received, Hall id: {hall_id}, start: {start_time}, end: {end_time}')
-        start_time = datetime.fromisoformat(start_time)
-        end_time = datetime.fromisoformat(end_time)
-
-        if hall_id not in self.locks:
-            self.locks[hall_id] = {}
-            self.conditions[hall_id] = {}
-
-        # Ensure condition variable for the time slot
-        if (start_time, end_time) not in self.conditions[hall_id]:
-            self.conditions[hall_id][(start_time, end_time)] = Condition()
-
-        with self.conditions[hall_id][(start_time, end_time)]:
-            while waited_time < timeout:
-                try:
-                    # Checking for any existing locks on the given time slot
-                    conflict = False
-                    for (existing_start, existing_end) in self.locks[hall_id]:
-                        if self._is_time_conflict(existing_start, existing_end, start_time, end_time):
-                            conflict = True
-                            time.sleep(retry_interval)
-                            waited_time += retry_interval
-                            continue
-
-                    if not conflict:
-                        # No existing locks, acquiring lock
-                        self.locks[hall_id][(start_time, end_time)] = Lock()
-                        res = self.locks[hall_id][(start_time, end_time)].acquire()
-                        self.logger.info(f'Lock Aquired, Hall id: {hall_id}, start: {start_time}, end: {end_time}')
-                        return True
-                    
-                except Exception as e:
-                    # some error, wait and retry to aquire lock
-                    conflict = True
-                    time.sleep(retry_interval)
-                    waited_time += retry_interval
-                    continue
-
+        deadline = time.monotonic() + timeout
+
+        self.logger.info(f'Lock request received, Hall id: {hall_id}, start: {start_time}, end: {end_time}', extra=HOT_PATH)
+        start_time = to_datetime(start_time)
+        end_time = to_datetime(end_time)
+        self.contention_stats.waiting(hall_id)
+        started = time.monotonic()
+        try:
+            acquired = self.backend.acquire(hall_id, start_time, end_time, deadline)
+        except Exception:
+            self.contention_stats.abandoned(hall_id)
+            raise
+        acquired_at = time.monotonic()
+        waited = acquired_at - started
+        self.contention_stats.acquired(hall_id, start_time, end_time, waited, acquired)
+        self.metrics.observe("lock_wait_seconds", waited, hall=hall_id)
+
+        if acquired:
+            self.held_since[(hall_id, start_time, end_time)] = acquired_at
+            self.logger.info(f'Lock Aquired, Hall id: {hall_id}, start: {start_time}, end: {end_time}', extra=HOT_PATH)
+        else:
+            self.metrics.inc("lock_timeouts_total", hall=hall_id)
             self.logger.error(f"lock aquire failed Hall id: {hall_id}, start: {start_time}, end: {end_time}")
-                            
+        return acquired
+
 
     def release_lock(self, hall_id, start_time, end_time):
         """
@@ -119,19 +145,108 @@ class LockManager:
 
         Args:
             hall_id (str): The ID of the hall for which the lock is being released.
-            start_time (str): The start time of the booking (ISO format).
-            end_time (str): The end time of the booking (ISO format).
+            start_time (str | datetime): The start time of the booking (ISO format or datetime).
+            end_time (str | datetime): The end time of the booking (ISO format or datetime).
 
         Returns:
             None
         """
-        start_time = datetime.fromisoformat(start_time)
-        end_time = datetime.fromisoformat(end_time)
+        start_time = to_datetime(start_time)
+        end_time = to_datetime(end_time)
+
+        # taken before the release, once released the slot may be acquired again by another thread
+        acquired_at = self.held_since.pop((hall_id, start_time, end_time), None)
+        if not self.backend.release(hall_id, start_time, end_time):
+            return
+
+        if acquired_at is not None:
+            held = time.monotonic() - acquired_at
+            self.contention_stats.released(hall_id, held)
+            self.metrics.observe("lock_hold_seconds", held, hall=hall_id)
+
+        # lock released
+        self.logger.info(f'Lock Released, Hall id: {hall_id}, start: {start_time}, end: {end_time}', extra=HOT_PATH)
+
+
+    def _canonical(self, ranges) -> list[tuple]:
+        """
+        Put lock ranges in the order every multi-range acquisition uses: by hall, then start time.
+        Overlapping ranges of the same hall are merged, a thread would otherwise wait for itself.
+
+        Args:
+            ranges (iterable): (hall_id, start_time, end_time) ranges, times as ISO strings or datetimes.
+
+        Returns:
+            list[tuple]: The merged (hall_id, start_time, end_time) ranges in canonical order.
+        """
+        merged = []
+        for hall_id, start_time, end_time in sorted((hall_id, to_datetime(start_time), to_datetime(end_time))
+                                                    for hall_id, start_time, end_time in ranges):
+            if merged and merged[-1][0] == hall_id and start_time < merged[-1][2]:
+                merged[-1] = (hall_id, merged[-1][1], max(merged[-1][2], end_time))
+            else:
+                merged.append((hall_id, start_time, end_time))
+        return merged
+
+
+    def acquire_locks(self, ranges, timeout=5) -> bool:
+        """
+        Acquire the locks of several time slots, all of them or none.
+
+        The slots are locked in canonical order against a single deadline, so two requests
+        locking overlapping sets of slots never hold one lock each while waiting for the other.
+        If any slot cannot be locked in time the locks already taken are released.
+
+        Args:
+            ranges (iterable): (hall_id, start_time, end_time) ranges to lock.
+            timeout (float, optional): The maximum time (in seconds) to wait for all locks together. Default is 5.
+
+        Returns:
+            bool: True if every lock was acquired, False if none is held.
+        """
+        deadline = time.monotonic() + timeout
+        held = []
+        try:
+            for hall_id, start_time, end_time in self._canonical(ranges):
+                if not self.acquire_lock(hall_id, start_time, end_time, timeout=max(0, deadline - time.monotonic())):
+                    break
+                held.append((hall_id, start_time, end_time))
+            else:
+                return True
+        except Exception:
+            self.release_locks(held)
+            raise
+        self.release_locks(held)
+        return False
+
+
+    def release_locks(self, ranges) -> None:
+        """
+        Release the locks taken by acquire_locks for the same ranges.
+
+        Args:
+            ranges (iterable): The (hall_id, start_time, end_time) ranges passed to acquire_locks.
+        """
+        for hall_id, start_time, end_time in self._canonical(ranges):
+            self.release_lock(hall_id, start_time, end_time)
+
+
+    @contextmanager
+    def locked(self, ranges, timeout=5):
+        """
+        Hold the locks of several time slots for the duration of a with block, see acquire_locks.
 
-        if hall_id in self.locks and (start_time, end_time) in self.locks[hall_id]:
-            self.locks[hall_id][(start_time, end_time)].release()
-            self.logger.info(f'Lock Released, Hall id: {hall_id}, start: {start_time}, end: {end_time}')
-            # lock released
-            del self.locks[hall_id][(start_time, end_time)]
+        Args:
+            ranges (iterable): (hall_id, start_time, end_time) ranges to lock.
+            timeout (float, optional): The maximum time (in seconds) to wait for all locks together. Default is 5.
 
-               
\ No newline at end of file
+        Yields:
+            bool: True if every lock is held inside the block, False if none is.
+        """
+        ranges = list(ranges)
+        acquired = self.acquire_locks(ranges, timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release_locks(ranges)
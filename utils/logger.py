@@ -1,22 +1,125 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
 
-def setup_logger(log_file_name):
+# pass as extra= on INFO lines written for every request, they are subject to LOG_SAMPLE_RATE
+HOT_PATH = {"hot_path": True}
+
+_queue = queue.SimpleQueue()
+_listener = None
+_file_handlers = {}
+_setup_lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of the INFO records marked as hot path, everything else passes.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record) -> bool:
+        if self.rate >= 1 or record.levelno != logging.INFO or not getattr(record, "hot_path", False):
+            return True
+        return random.random() < self.rate
+
+
+class LoggerNameFilter(logging.Filter):
+    """
+    Route records to the file handler of the logger which emitted them.
+    """
+
+    def filter(self, record) -> bool:
+        return record.name == self.name
+
+
+class RestartingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records for the writer thread, starting it again if it was shut down.
+    """
+
+    def enqueue(self, record) -> None:
+        super().enqueue(record)
+        if _listener is None:
+            with _setup_lock:
+                _ensure_listener()
+
+
+def _ensure_listener() -> logging.handlers.QueueListener:
+    """
+    Start the single writer thread which drains the log queue into the log files.
+    """
+    global _listener
+    if _listener is None:
+        _listener = logging.handlers.QueueListener(_queue, *_file_handlers.values(), respect_handler_level=True)
+        _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """
+    Write out every queued record and stop the writer thread. The next record logged restarts it.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in _file_handlers.values():
+            handler.flush()
+
+
+atexit.register(shutdown_logging)
+
+
+def setup_logger(log_file_name, level=None, sample_rate=None):
+    """
+    Get the logger writing to log_file_name, configuring it on first use.
+
+    Records are put on a queue on the calling thread and written to the file by a single
+    background thread, so request threads never wait on disk I/O. Calling this again for the
+    same file returns the same logger without adding handlers.
+
+    Args:
+        log_file_name (str): The file to log to, also used as the logger name.
+        level (str | int, optional): The logging level. Defaults to the LOG_LEVEL environment variable, or INFO.
+        sample_rate (float, optional): Fraction of hot path INFO records kept. Defaults to the
+            LOG_SAMPLE_RATE environment variable, or 1 (keep all).
+
+    Returns:
+        Logger: The configured logger.
+    """
     # Create a logger object
     logger = logging.getLogger(log_file_name)
-    
-    # Set the logging level (INFO, DEBUG, ERROR, etc.)
-    logger.setLevel(logging.INFO)
-    
-    # Create a file handler to log to the specified file
-    file_handler = logging.FileHandler(log_file_name)
-    
-    # Create a formatter for the logs
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    
-    # Add the formatter to the file handler
-    file_handler.setFormatter(formatter)
-    
-    # Add the file handler to the logger
-    logger.addHandler(file_handler)
-    
+
+    with _setup_lock:
+        if log_file_name in _file_handlers:
+            return logger
+
+        # Set the logging level (INFO, DEBUG, ERROR, etc.)
+        logger.setLevel(level or os.getenv("LOG_LEVEL", "INFO").upper())
+        logger.propagate = False
+
+        # Create a file handler to log to the specified file, written by the listener thread only
+        file_handler = logging.FileHandler(log_file_name)
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        file_handler.addFilter(LoggerNameFilter(log_file_name))
+        _file_handlers[log_file_name] = file_handler
+
+        # The logger itself only enqueues records
+        queue_handler = RestartingQueueHandler(_queue)
+        if sample_rate is None:
+            sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+        logger.addHandler(queue_handler)
+
+        listener = _ensure_listener()
+        listener.handlers = tuple(_file_handlers.values())
+
     return logger
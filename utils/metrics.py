@@ -0,0 +1,242 @@
+from threading import Lock, local
+import weakref
+from contextlib import contextmanager
+from bisect import bisect_left
+import time
+
+
+# upper bounds in seconds of the latency histogram buckets, +Inf is implied
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsShard:
+    """
+    Counters and histograms recorded by a single thread. Only the owning thread writes to it,
+    so recording never takes a lock; render() reads every shard and adds them up.
+    """
+
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        # (name, labels) -> value
+        self.counters = {}
+        # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self.histograms = {}
+
+
+class ShardOwner:
+    """
+    Holds a thread's shard in its thread-local storage. It is freed when the thread ends, which
+    tells the registry to fold the shard into the base shard.
+    """
+
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self, shard):
+        self.shard = shard
+
+
+def _merge(into, shard) -> None:
+    for key, value in shard.counters.items():
+        into.counters[key] = into.counters.get(key, 0) + value
+    for key, histogram in shard.histograms.items():
+        total = into.histograms.setdefault(key, [0] * len(histogram))
+        for position, value in enumerate(histogram):
+            total[position] += value
+
+
+class Metrics:
+    """
+    Process-wide metrics registry rendered in the Prometheus text exposition format.
+
+    Each thread records into its own shard, registered once under a lock on the thread's first
+    use. Recording is then a dict update on thread-local data; the cost of aggregation is paid
+    by the scrape instead of by the requests. When a thread ends its shard is added to a base
+    shard and dropped, so short-lived threads do not accumulate shards.
+    """
+
+    _instance = None
+    _lock = Lock()
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Ensure that only one instance of the Metrics class exists.
+
+        Returns:
+            Metrics: The singleton instance of the Metrics class.
+        """
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialize()
+        return cls._instance
+
+
+    def _initialize(self, buckets=DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.local = local()
+        self.shards = []
+        self.shards_lock = Lock()
+        # counts of the threads which ended, only written under shards_lock
+        self.base = MetricsShard()
+        # name -> (type, help text)
+        self.descriptions = {}
+
+
+    def _shard(self) -> MetricsShard:
+        owner = getattr(self.local, "owner", None)
+        if owner is None:
+            owner = self.local.owner = ShardOwner(MetricsShard())
+            with self.shards_lock:
+                self.shards.append(owner.shard)
+            weakref.finalize(owner, self._retire, owner.shard)
+        return owner.shard
+
+
+    def _retire(self, shard) -> None:
+        # the owning thread has ended, nothing writes to the shard any more
+        with self.shards_lock:
+            _merge(self.base, shard)
+            self.shards.remove(shard)
+
+
+    def describe(self, name, metric_type, help_text) -> None:
+        """
+        Register the TYPE and HELP lines of a metric.
+
+        Args:
+            name (str): The metric name.
+            metric_type (str): "counter" or "histogram".
+            help_text (str): One line describing the metric.
+        """
+        self.descriptions[name] = (metric_type, help_text)
+
+
+    def inc(self, name, value=1, **labels) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            name (str): The metric name.
+            value (float, optional): The increment. Default is 1.
+            **labels: The label values of the series.
+        """
+        counters = self._shard().counters
+        key = (name, tuple(sorted(labels.items())))
+        counters[key] = counters.get(key, 0) + value
+
+
+    def observe(self, name, seconds, **labels) -> None:
+        """
+        Record a duration in a histogram.
+
+        Args:
+            name (str): The metric name.
+            seconds (float): The observed duration in seconds.
+            **labels: The label values of the series.
+        """
+        histograms = self._shard().histograms
+        key = (name, tuple(sorted(labels.items())))
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [0] * (len(self.buckets) + 2)
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Time the enclosed block into a histogram, also when it raises.
+
+        Args:
+            name (str): The metric name.
+            **labels: The label values of the series.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+
+    def _collect(self) -> tuple[dict, dict]:
+        """
+        Add up the shards of every thread.
+
+        Returns:
+            tuple[dict, dict]: The counters and the histograms by (name, labels).
+        """
+        counters = {}
+        histograms = {}
+        with self.shards_lock:
+            # a shard is either still listed or already merged into the base, never both
+            shards = list(self.shards)
+            base = MetricsShard()
+            _merge(base, self.base)
+        shards.append(base)
+        for shard in shards:
+            # copies are taken in one step while the owning thread may keep writing
+            for key, value in shard.counters.copy().items():
+                counters[key] = counters.get(key, 0) + value
+            for key, histogram in shard.histograms.copy().items():
+                total = histograms.setdefault(key, [0] * len(histogram))
+                for position, value in enumerate(list(histogram)):
+                    total[position] += value
+        return counters, histograms
+
+
+    def snapshot(self) -> dict:
+        """
+        Report the counters and the histogram counts and sums as plain values.
+
+        Returns:
+            dict: {"counters": {(name, labels): value}, "histograms": {(name, labels): (count, sum)}}.
+        """
+        counters, histograms = self._collect()
+        return {
+            "counters": counters,
+            "histograms": {key: (sum(histogram[:-1]), histogram[-1]) for key, histogram in histograms.items()},
+        }
+
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The body of a /metrics response.
+        """
+        counters, histograms = self._collect()
+        series = {}
+        for (name, labels), value in counters.items():
+            series.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), histogram in histograms.items():
+            lines = series.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), histogram):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram[-1])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+        output = []
+        for name in sorted(series):
+            if name in self.descriptions:
+                metric_type, help_text = self.descriptions[name]
+                output.append(f"# HELP {name} {help_text}")
+                output.append(f"# TYPE {name} {metric_type}")
+            output.extend(series[name])
+        return "\n".join(output) + "\n"
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,225 @@
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock
+import time
+
+
+class OccupancyCalendar:
+    """
+    Per-day occupancy maps of the halls, used to answer free/busy calendar requests.
+
+    Every (day, hall) pair is an array with one counter per slot of slot_minutes, counting the
+    bookings touching that slot; a slot is busy while its counter is positive. Counting instead
+    of setting bits keeps cancels and updates exact when two bookings share a slot. Days are
+    loaded from the database on first use, all days missing from a request with one query, and
+    the controller keeps loaded days current after every book, cancel and update. Days older
+    than the refresh interval are reloaded to pick up writes from other processes, and the
+    least recently used days are dropped beyond max_days.
+    """
+
+    def __init__(self, db, logger, slot_minutes=5, refresh_interval=60, max_days=400):
+        """
+        Args:
+            db (BookingDatabase): The database storing the bookings.
+            logger (Logger): Logger for loads.
+            slot_minutes (int, optional): The finest granularity, must divide a day. Default is 5.
+            refresh_interval (float, optional): Seconds after which a day is reloaded. Default is 60.
+            max_days (int, optional): The maximum number of cached days. Default is 400.
+        """
+        if slot_minutes <= 0 or 1440 % slot_minutes:
+            raise ValueError(f"slot_minutes must divide a day: {slot_minutes}")
+        self.db = db
+        self.logger = logger
+        self.slot = timedelta(minutes=slot_minutes)
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = 1440 // slot_minutes
+        self.refresh_interval = refresh_interval
+        self.max_days = max_days
+        self.lock = Lock()
+        # date -> (loaded_at, {hall_id: array of slot counters})
+        self.days = OrderedDict()
+        # bumped by every write, loads racing with a write are not cached
+        self.writes = 0
+
+
+    def _spans(self, start_time, end_time):
+        """
+        Split a time range into the slots it touches on each day.
+
+        Yields:
+            tuple[date, int, int]: The day, and its first and last (exclusive) slot touched.
+        """
+        day = start_time.date()
+        while True:
+            day_start = datetime.combine(day, datetime.min.time())
+            first = max(0, (start_time - day_start) // self.slot)
+            last = min(self.slots_per_day, -(-(end_time - day_start) // self.slot))
+            if first < last:
+                yield day, first, last
+            day += timedelta(days=1)
+            if datetime.combine(day, datetime.min.time()) >= end_time:
+                return
+
+
+    def _count(self, halls, hall_id, first, last, delta) -> None:
+        counters = halls.setdefault(hall_id, array("H", bytes(2 * self.slots_per_day)))
+        for position in range(first, last):
+            counters[position] = max(0, counters[position] + delta)
+
+
+    def _apply(self, hall_id, start_time, end_time, delta) -> None:
+        for day, first, last in self._spans(start_time, end_time):
+            if day in self.days:
+                self._count(self.days[day][1], hall_id, first, last, delta)
+
+
+    def add(self, hall_id, start_time, end_time) -> None:
+        """
+        Record a booking stored in the database.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the booking.
+            end_time (datetime): The end of the booking.
+        """
+        with self.lock:
+            self.writes += 1
+            self._apply(hall_id, start_time, end_time, 1)
+
+
+    def remove(self, hall_id, start_time, end_time) -> None:
+        """
+        Forget a booking deleted from the database.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            start_time (datetime): The start of the booking.
+            end_time (datetime): The end of the booking.
+        """
+        with self.lock:
+            self.writes += 1
+            self._apply(hall_id, start_time, end_time, -1)
+
+
+    def move(self, hall_id, old_start_time, old_end_time, new_start_time, new_end_time) -> None:
+        """
+        Record an update of a booking's time range.
+
+        Args:
+            hall_id (str): The ID of the hall.
+            old_start_time (datetime): The previous start of the booking.
+            old_end_time (datetime): The previous end of the booking.
+            new_start_time (datetime): The new start of the booking.
+            new_end_time (datetime): The new end of the booking.
+        """
+        with self.lock:
+            self.writes += 1
+            self._apply(hall_id, old_start_time, old_end_time, -1)
+            self._apply(hall_id, new_start_time, new_end_time, 1)
+
+
+    def invalidate(self) -> None:
+        """
+        Drop every cached day, e.g. after the database contradicted the controller's view of a hall.
+        """
+        with self.lock:
+            self.writes += 1
+            self.days.clear()
+
+
+    def load_query(self, days) -> dict:
+        """
+        Build the query reading the bookings of some days.
+
+        Args:
+            days (list[date]): The days, loaded together from the first to the last.
+
+        Returns:
+            dict: The Mongo query.
+        """
+        start = datetime.combine(min(days), datetime.min.time())
+        end = datetime.combine(max(days), datetime.min.time()) + timedelta(days=1)
+        return {"pending_update": {"$exists": False}, "start_time": {"$lt": end}, "end_time": {"$gt": start}}
+
+
+    def _load(self, days) -> dict:
+        """
+        Build the maps of some days from the database with one range query.
+
+        Returns:
+            dict: {hall_id: counters} by day.
+        """
+        loaded = {day: {} for day in days}
+        for booking in self.db.find(self.load_query(days), {"hall_id": 1, "start_time": 1, "end_time": 1}):
+            for day, first, last in self._spans(booking["start_time"], booking["end_time"]):
+                if day in loaded:
+                    self._count(loaded[day], booking["hall_id"], first, last, 1)
+        return loaded
+
+
+    def _day_maps(self, days) -> dict:
+        """
+        Get the maps of some days, loading the missing and stale ones.
+        """
+        now = time.monotonic()
+        with self.lock:
+            maps = {}
+            for day in days:
+                cached = self.days.get(day)
+                if cached is not None and now - cached[0] <= self.refresh_interval:
+                    self.days.move_to_end(day)
+                    maps[day] = cached[1]
+            writes = self.writes
+        missing = [day for day in days if day not in maps]
+        if not missing:
+            return maps
+
+        loaded = self._load(missing)
+        self.logger.info(f"Occupancy loaded: {len(missing)} days from {min(missing)}")
+        with self.lock:
+            # a write between the query and now may be missing from the loaded maps, serve them once
+            if writes == self.writes:
+                for day in missing:
+                    self.days[day] = (now, loaded[day])
+                    self.days.move_to_end(day)
+                while len(self.days) > self.max_days:
+                    self.days.popitem(last=False)
+        maps.update(loaded)
+        return maps
+
+
+    def bitmaps(self, hall_ids, days, granularity_minutes) -> dict:
+        """
+        Render the free/busy bitmaps of some halls.
+
+        Args:
+            hall_ids (list[str]): The halls.
+            days (list[date]): The days.
+            granularity_minutes (int): Minutes per bit, a multiple of slot_minutes dividing a day.
+
+        Returns:
+            dict: {hall_id: {ISO date: bitmap}} where each bitmap is a string with one character per
+                period of the day, "1" when any booking touches it and "0" when it is free.
+
+        Raises:
+            ValueError: If the granularity does not fit the slots.
+        """
+        if granularity_minutes <= 0 or granularity_minutes % self.slot_minutes or 1440 % granularity_minutes:
+            raise ValueError(f"granularity must be a multiple of {self.slot_minutes} minutes dividing a day")
+        group = granularity_minutes // self.slot_minutes
+        free_day = "0" * (self.slots_per_day // group)
+        maps = self._day_maps(days)
+        calendar = {hall_id: {} for hall_id in hall_ids}
+        with self.lock:
+            for day in days:
+                halls = maps[day]
+                for hall_id in hall_ids:
+                    counters = halls.get(hall_id)
+                    if counters is None or not any(counters):
+                        calendar[hall_id][day.isoformat()] = free_day
+                    else:
+                        calendar[hall_id][day.isoformat()] = "".join(
+                            "1" if any(counters[position:position + group]) else "0"
+                            for position in range(0, self.slots_per_day, group))
+        return calendar
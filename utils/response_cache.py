@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from threading import Lock
+import time
+
+
+# returned by get() when there is no usable entry, a cached value may itself be empty
+MISS = object()
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of read responses, invalidated by per-hall version counters.
+
+    Every write to a hall bumps its version. An entry remembers the versions of the halls its
+    response depends on, taken before the response was computed, and is only served while they
+    are unchanged, so a response is never served after a write which could have changed it.
+    Entries also expire after the TTL, which bounds how long writes of other processes (which
+    bump no version here) can go unnoticed, and the least recently used entries are dropped
+    beyond max_entries.
+    """
+
+    def __init__(self, max_entries=1024, ttl=5):
+        """
+        Args:
+            max_entries (int, optional): The maximum number of cached responses. Default is 1024.
+            ttl (float, optional): Seconds a response is served at most. Default is 5.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = Lock()
+        self.entries = OrderedDict()
+        self.versions = {}
+        # bumped when every hall may have changed, e.g. after a reload
+        self.epoch = 0
+        self.counts = {"hits": 0, "misses": 0, "stale": 0, "expired": 0, "evictions": 0}
+
+
+    def snapshot(self, hall_ids) -> tuple:
+        """
+        Take the current versions of some halls, before computing a response depending on them.
+
+        Args:
+            hall_ids (list[str]): The halls the response depends on.
+
+        Returns:
+            tuple: The snapshot to pass to put().
+        """
+        with self.lock:
+            return self._snapshot(hall_ids)
+
+
+    def _snapshot(self, hall_ids) -> tuple:
+        return self.epoch, tuple(hall_ids), tuple(self.versions.get(hall_id, 0) for hall_id in hall_ids)
+
+
+    def get(self, key, hall_ids):
+        """
+        Look up a response.
+
+        Args:
+            key (hashable): The request, e.g. (start_time, end_time, capacity).
+            hall_ids (list[str]): The halls the response depends on now.
+
+        Returns:
+            The cached response, or MISS if there is none, it expired or a hall changed since.
+        """
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.counts["misses"] += 1
+                return MISS
+            stored_at, snapshot, value = entry
+            if now - stored_at > self.ttl:
+                del self.entries[key]
+                self.counts["expired"] += 1
+                self.counts["misses"] += 1
+                return MISS
+            if snapshot != self._snapshot(hall_ids):
+                del self.entries[key]
+                self.counts["stale"] += 1
+                self.counts["misses"] += 1
+                return MISS
+            self.entries.move_to_end(key)
+            self.counts["hits"] += 1
+            return value
+
+
+    def put(self, key, snapshot, value) -> None:
+        """
+        Store a response.
+
+        Args:
+            key (hashable): The request.
+            snapshot (tuple): The snapshot() taken before the response was computed.
+            value: The response.
+        """
+        with self.lock:
+            self.entries[key] = (time.monotonic(), snapshot, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counts["evictions"] += 1
+
+
+    def bump(self, hall_id=None) -> None:
+        """
+        Invalidate the responses depending on a hall.
+
+        Args:
+            hall_id (str, optional): The hall written to. Default invalidates every response.
+        """
+        with self.lock:
+            if hall_id is None:
+                self.epoch += 1
+                self.entries.clear()
+            else:
+                self.versions[hall_id] = self.versions.get(hall_id, 0) + 1
+
+
+    def stats(self) -> dict:
+        """
+        Report the cache size and hit rate since startup.
+
+        Returns:
+            dict: Hits, misses (with stale and expired entries among them), evictions, size and hit rate.
+        """
+        with self.lock:
+            lookups = self.counts["hits"] + self.counts["misses"]
+            return {**self.counts, "size": len(self.entries), "max_entries": self.max_entries, "ttl": self.ttl,
+                    "hit_rate": round(self.counts["hits"] / lookups, 4) if lookups else 0.0}
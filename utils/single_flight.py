@@ -0,0 +1,84 @@
+from threading import Event, Lock
+
+
+class _Call:
+    """
+    One in-flight call, shared by the caller running it and the callers waiting for it.
+    """
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls into one.
+
+    The first caller for a key runs the function; callers arriving with the same key while it
+    runs wait for it and get the same result, or the same exception. Nothing is cached: the
+    next call after it finished runs the function again. The shared result is the same object
+    for every caller and must not be modified.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.calls = {}
+        self.counts = {"executed": 0, "coalesced": 0}
+
+
+    def do(self, key, function):
+        """
+        Run a function, or wait for the identical call already running.
+
+        Args:
+            key (hashable): Identifies identical calls, e.g. the query parameters.
+            function (callable): Called without arguments by the first caller.
+
+        Returns:
+            tuple: The function's result and whether it was shared from another caller's run.
+
+        Raises:
+            Exception: Whatever the function raised, in every waiting caller too.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.counts["executed"] += 1
+            else:
+                call.waiters += 1
+                self.counts["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+
+    def stats(self) -> dict:
+        """
+        Report how many calls ran and how many were served by another caller's run.
+
+        Returns:
+            dict: Executed and coalesced calls since startup, and the calls in flight.
+        """
+        with self.lock:
+            return {**self.counts, "in_flight": len(self.calls)}